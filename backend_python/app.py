@@ -4,7 +4,7 @@ import os
 # Add current directory to Python path for module imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 import psycopg2
 from psycopg2 import pool
@@ -484,6 +484,26 @@ def ask_health_question():
         logger.error(f"Error in health question endpoint: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/insights/ask-question/stream', methods=['POST'])
+def stream_health_question():
+    """Answer a health question, streaming the validated answer text as it is generated"""
+    data = request.get_json()
+    user_id = data.get('user_id')
+    question = data.get('question')
+    context = data.get('context', {})
+    
+    if not user_id or not question:
+        return jsonify({'success': False, 'error': 'User ID and question required'}), 400
+    
+    return Response(
+        stream_with_context(insight_generator.stream_health_answer(
+            user_id=user_id,
+            question=question,
+            context=context
+        )),
+        mimetype='text/plain'
+    )
+
 @app.route('/api/insights/health-patterns', methods=['GET'])
 def get_health_patterns():
     """Get insights about health patterns and trends"""
@@ -507,6 +527,52 @@ def get_health_patterns():
         logger.error(f"Error in health patterns endpoint: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/insights/batch', methods=['POST'])
+def generate_batch_insights():
+    """Generate daily summaries / pattern insights for many users in one batch (non-interactive)"""
+    try:
+        data = request.get_json()
+        raw_requests = data.get('requests', [])
+        
+        if not raw_requests:
+            return jsonify({'success': False, 'error': 'At least one request required'}), 400
+        
+        insight_requests = [
+            InsightRequest(
+                user_id=item.get('user_id'),
+                insight_type=item.get('insight_type', 'daily_summary'),
+                air_quality_data=item.get('air_quality', {}),
+                user_profile=item.get('user_profile', {})
+            )
+            for item in raw_requests
+        ]
+        
+        responses = insight_generator.generate_batch_insights(insight_requests)
+        
+        results = []
+        today = datetime.now().strftime('%Y-%m-%d')
+        for insight_request, response in zip(insight_requests, responses):
+            result = {
+                'success': response.success,
+                'insight': response.insight_text,
+                'confidence_score': response.confidence_score,
+                'warnings': response.warnings,
+                'health_summary': response.health_metrics_summary,
+                'timestamp': response.timestamp.isoformat()
+            }
+            # Warm the daily summary cache so the interactive endpoint can reuse batch output
+            if response.success and insight_request.insight_type == 'daily_summary':
+                with cache_lock:
+                    query_cache[f"daily_summary:{insight_request.user_id}:{today}"] = result
+            results.append({'user_id': insight_request.user_id,
+                            'insight_type': insight_request.insight_type, **result})
+        
+        return jsonify({'success': True, 'results': results, 'count': len(results)})
+        
+    except Exception as e:
+        logger.error(f"Error in batch insights endpoint: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Serve visualization files
 @app.route('/pollution_heatmap_static.png')
 def serve_static_heatmap():
@@ -2,12 +2,22 @@
 Core service for Gemini API integration with health insights
 """
 import google.generativeai as genai
+import asyncio
 import os
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator
 import json
 import logging
 
 
+# Allow health/medical content through Gemini's safety filters
+SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
+]
+
+
 class GeminiHealthService:
     """Core service for Gemini API integration with health insights"""
     
@@ -32,26 +42,6 @@ class GeminiHealthService:
             Generated insight text with safety validation
         """
         try:
-            # Configure safety settings to allow health/medical content
-            safety_settings = [
-                {
-                    "category": "HARM_CATEGORY_HARASSMENT",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_HATE_SPEECH",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                    "threshold": "BLOCK_NONE"
-                }
-            ]
-            
             response = self.model.generate_content(
                 prompt,
                 generation_config=genai.types.GenerationConfig(
@@ -60,7 +50,7 @@ class GeminiHealthService:
                     top_k=40,
                     top_p=0.95,
                 ),
-                safety_settings=safety_settings
+                safety_settings=SAFETY_SETTINGS
             )
             
             # Workaround for Gemini text property bug
@@ -74,6 +64,82 @@ class GeminiHealthService:
             self.logger.error(f"Gemini API error: {str(e)}")
             return self._get_fallback_response()
     
+    def stream_health_insight(self, prompt: str, max_tokens: int = 8192) -> Iterator[str]:
+        """
+        Stream raw insight text chunks from Gemini as they are generated
+        
+        Chunks are not post-processed; pass them through
+        HealthInsightValidator.validate_stream before showing them to users.
+        """
+        try:
+            response = self.model.generate_content(
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    max_output_tokens=max_tokens,
+                    temperature=0.7,
+                    top_k=40,
+                    top_p=0.95,
+                ),
+                safety_settings=SAFETY_SETTINGS,
+                stream=True
+            )
+            for chunk in response:
+                chunk_text = self._extract_text_from_response(chunk)
+                if chunk_text and chunk_text != "Unable to extract text from response":
+                    yield chunk_text
+        except Exception as e:
+            self.logger.error(f"Gemini streaming error: {str(e)}")
+            yield self._get_fallback_response()
+    
+    def generate_health_insights_batch(self, prompts: Dict[str, str], max_tokens: int = 8192,
+                                       max_concurrency: int = 8) -> Dict[str, str]:
+        """
+        Generate insights for many prompts in one batched dispatch
+        
+        Args:
+            prompts: Mapping of custom_id to formatted prompt
+            max_tokens: Maximum response length per prompt
+            max_concurrency: Upper bound on in-flight Gemini requests
+            
+        Returns:
+            Mapping of custom_id to post-processed insight text
+        """
+        if not prompts:
+            return {}
+        return asyncio.run(self._generate_batch_async(prompts, max_tokens, max_concurrency))
+    
+    async def _generate_batch_async(self, prompts: Dict[str, str], max_tokens: int,
+                                    max_concurrency: int) -> Dict[str, str]:
+        """Fan out prompts with generate_content_async, bounded by a semaphore"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        generation_config = genai.types.GenerationConfig(
+            max_output_tokens=max_tokens,
+            temperature=0.7,
+            top_k=40,
+            top_p=0.95,
+        )
+        
+        async def generate_one(custom_id: str, prompt: str):
+            async with semaphore:
+                try:
+                    response = await self.model.generate_content_async(
+                        prompt,
+                        generation_config=generation_config,
+                        safety_settings=SAFETY_SETTINGS
+                    )
+                    response_text = self._extract_text_from_response(response)
+                    if response_text and response_text != "Unable to extract text from response":
+                        return custom_id, self._post_process_response(response_text)
+                    return custom_id, "Unable to generate insight at this time."
+                except Exception as e:
+                    self.logger.error(f"Gemini batch error for {custom_id}: {str(e)}")
+                    return custom_id, self._get_fallback_response()
+        
+        results = await asyncio.gather(
+            *(generate_one(custom_id, prompt) for custom_id, prompt in prompts.items())
+        )
+        return dict(results)
+    
     def _extract_text_from_response(self, response) -> str:
         """Workaround to extract text from Gemini response due to library bug"""
         try:
@@ -115,13 +181,7 @@ class GeminiHealthService:
     def test_connection(self) -> bool:
         """Test Gemini API connectivity"""
         try:
-            safety_settings = [
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
-            ]
-            test_response = self.model.generate_content("Generate a wellness tip about hydration", safety_settings=safety_settings)
+            test_response = self.model.generate_content("Generate a wellness tip about hydration", safety_settings=SAFETY_SETTINGS)
             response_text = self._extract_text_from_response(test_response)
             return response_text is not None and response_text != "Unable to extract text from response"
         except Exception:
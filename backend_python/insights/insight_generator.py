@@ -1,7 +1,7 @@
 """
 Main service for generating health insights
 """
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, Optional, List
 import logging
 from datetime import datetime
 
@@ -9,6 +9,7 @@ from insights.health_analyzer import HealthDataAnalyzer
 from insights.gemini_service import GeminiHealthService
 from insights.prompt_templates import PromptTemplateManager
 from insights.safety_validator import HealthInsightValidator
+from insights.response_cache import QAResponseCache
 from insights.models.insight_models import InsightRequest, InsightResponse
 
 
@@ -20,6 +21,7 @@ class HealthInsightGenerator:
         self.gemini_service = GeminiHealthService(gemini_api_key)
         self.prompt_manager = PromptTemplateManager()
         self.validator = HealthInsightValidator()
+        self.qa_cache = QAResponseCache()
         self.logger = logging.getLogger(__name__)
     
     def generate_daily_summary(self, user_id: str, air_quality_data: Dict,
@@ -156,6 +158,18 @@ class HealthInsightGenerator:
             # Analyze health data
             health_metrics = self.health_analyzer.analyze_user_health(user_id)
             
+            # Reuse a validated answer for an equivalent question and health state
+            cached_answer = self.qa_cache.get(user_id, processed_question, health_metrics, context)
+            if cached_answer:
+                return InsightResponse(
+                    success=True,
+                    insight_text=cached_answer['insight_text'],
+                    insight_type="health_qa",
+                    confidence_score=cached_answer['confidence_score'],
+                    warnings=cached_answer['warnings'],
+                    timestamp=datetime.now()
+                )
+            
             # Generate Q&A prompt
             prompt = self.prompt_manager.generate_qa_prompt(
                 health_metrics, processed_question, context
@@ -168,12 +182,21 @@ class HealthInsightGenerator:
             is_valid, validated_answer, warnings = self.validator.validate_insight(
                 raw_answer, "health_qa"
             )
+            confidence_score = 0.8 if is_valid else 0.6
+            
+            # Don't pin Gemini fallback messages in the cache
+            if not raw_answer.startswith("Unable to generate"):
+                self.qa_cache.put(user_id, processed_question, health_metrics, context, {
+                    'insight_text': validated_answer,
+                    'confidence_score': confidence_score,
+                    'warnings': warnings
+                })
             
             return InsightResponse(
                 success=True,
                 insight_text=validated_answer,
                 insight_type="health_qa",
-                confidence_score=0.8 if is_valid else 0.6,
+                confidence_score=confidence_score,
                 warnings=warnings,
                 timestamp=datetime.now()
             )
@@ -182,6 +205,135 @@ class HealthInsightGenerator:
             self.logger.error(f"Error answering health question: {str(e)}")
             return self._create_error_response("health_qa", str(e))
     
+    def stream_health_answer(self, user_id: str, question: str, context: Dict) -> Iterator[str]:
+        """
+        Answer a user question, yielding validated text fragments as Gemini
+        generates them
+        
+        Same flow as answer_health_question, but the model output is passed
+        through the validator chunk by chunk so the first words reach the user
+        without waiting for the whole answer. Cached answers arrive in one piece.
+        """
+        try:
+            is_valid_question, processed_question = self.validator.validate_user_question(question)
+            if not is_valid_question:
+                yield processed_question
+                return
+            
+            health_metrics = self.health_analyzer.analyze_user_health(user_id)
+            
+            cached_answer = self.qa_cache.get(user_id, processed_question, health_metrics, context)
+            if cached_answer:
+                yield cached_answer['insight_text']
+                return
+            
+            prompt = self.prompt_manager.generate_qa_prompt(
+                health_metrics, processed_question, context
+            )
+            
+            raw_parts = []
+            
+            def raw_chunks():
+                for chunk in self.gemini_service.stream_health_insight(prompt):
+                    raw_parts.append(chunk)
+                    yield chunk
+            
+            yield from self.validator.validate_stream(raw_chunks())
+            
+            # Cache only complete answers that pass validation on the whole text,
+            # never Gemini fallback messages
+            raw_answer = ''.join(raw_parts)
+            is_valid, validated_answer, warnings = self.validator.validate_insight(raw_answer)
+            if is_valid and not raw_answer.startswith("Unable to generate"):
+                self.qa_cache.put(user_id, processed_question, health_metrics, context, {
+                    'insight_text': validated_answer,
+                    'confidence_score': 0.8,
+                    'warnings': warnings
+                })
+                
+        except Exception as e:
+            self.logger.error(f"Error streaming health answer: {str(e)}")
+            yield self.validator.STREAM_FALLBACK
+    
+    def generate_batch_insights(self, requests: List[InsightRequest]) -> List[InsightResponse]:
+        """
+        Generate non-interactive insights (daily summaries, pattern insights)
+        for many users with a single batched Gemini dispatch
+        
+        Returns:
+            One InsightResponse per request, in request order
+        """
+        # Pattern insights look at a longer window than daily summaries
+        days_back_by_type = {'daily_summary': 7, 'pattern_insight': 14}
+        try:
+            # Analyze each (user, window) once, even if it backs several requests
+            analyzed = {}
+            health_metrics = []
+            for insight_request in requests:
+                days_back = days_back_by_type.get(insight_request.insight_type)
+                if days_back is None:
+                    health_metrics.append(None)
+                    continue
+                key = (insight_request.user_id, days_back)
+                if key not in analyzed:
+                    analyzed[key] = self.health_analyzer.analyze_user_health(
+                        insight_request.user_id, days_back=days_back
+                    )
+                health_metrics.append(analyzed[key])
+            
+            batch = self.prompt_manager.generate_prompts_batch(requests, health_metrics)
+            raw_insights = self.gemini_service.generate_health_insights_batch(
+                {item['custom_id']: item['prompt'] for item in batch}
+            )
+        except Exception as e:
+            self.logger.error(f"Error generating batch insights: {str(e)}")
+            return [self._create_error_response(r.insight_type, str(e)) for r in requests]
+        
+        insights_by_index = {
+            int(item['custom_id'].rsplit(':', 1)[1]): raw_insights.get(item['custom_id'])
+            for item in batch
+        }
+        
+        responses = []
+        for index, insight_request in enumerate(requests):
+            raw_insight = insights_by_index.get(index)
+            if raw_insight is None:
+                responses.append(self._create_error_response(
+                    insight_request.insight_type, "Insight type not supported in batch mode"
+                ))
+                continue
+            
+            is_valid, validated_insight, warnings = self.validator.validate_insight(
+                raw_insight, insight_request.insight_type
+            )
+            metrics = health_metrics[index]
+            
+            if insight_request.insight_type == 'daily_summary':
+                responses.append(InsightResponse(
+                    success=True,
+                    insight_text=validated_insight,
+                    insight_type="daily_summary",
+                    confidence_score=0.8 if is_valid else 0.6,
+                    warnings=warnings,
+                    timestamp=datetime.now(),
+                    health_metrics_summary={
+                        'recovery_score': metrics.hrv['recovery_score'],
+                        'activity_level': metrics.activity['activity_level'],
+                        'data_quality': metrics.heart_rate['data_quality']
+                    }
+                ))
+            else:
+                responses.append(InsightResponse(
+                    success=True,
+                    insight_text=validated_insight,
+                    insight_type="pattern_insight",
+                    confidence_score=0.7 if is_valid else 0.5,
+                    warnings=warnings,
+                    timestamp=datetime.now()
+                ))
+        
+        return responses
+    
     def _create_error_response(self, insight_type: str, error_message: str) -> InsightResponse:
         """Create standardized error response"""
         return InsightResponse(
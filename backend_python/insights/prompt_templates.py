@@ -1,41 +1,94 @@
 """
 Prompt template management for health insights generation
 """
-from typing import Dict, Any
+import functools
+import sys
+from typing import Dict, Any, List, Optional
 from insights.models.health_metrics import HealthMetrics
+from insights.models.insight_models import InsightRequest
+
+
+# Built once at import: stored unindented, stripped and interned so every
+# prompt embeds the same string object instead of re-reading a class attribute
+_BASE_SYSTEM_PROMPT = sys.intern("""
+You are a health and wellness data interpreter for a fitness app. Your role is to:
+
+1. Translate complex health metrics into clear, actionable insights
+2. Explain relationships between health patterns and environmental factors
+3. Provide activity recommendations based on current health status
+4. Always prioritize user safety and wellbeing
+
+CRITICAL SAFETY GUIDELINES:
+- Never provide medical diagnoses or replace professional medical advice
+- Always include disclaimers about consulting healthcare providers for medical concerns
+- Avoid recommending activities that could be harmful
+- Focus on general wellness and activity optimization, not medical treatment
+- If concerning patterns are detected, recommend consulting a healthcare provider
+
+COMMUNICATION STYLE:
+- Clear, conversational, and encouraging tone
+- Explain the 'why' behind recommendations using specific metrics
+- Use accessible language, avoid medical jargon
+- Acknowledge limitations when data is insufficient
+- Keep responses concise and actionable (2-3 sentences max)
+""".strip())
+
+
+# Activity prompt with the system prompt baked in; {activity_type} is filled
+# once per activity by _build_activity_template, the rest on every call
+_ACTIVITY_PROMPT_TEMPLATE = """
+        {base_system_prompt}
+        
+        The user is asking about: "{activity_type}"
+        
+        Analyze their current readiness and provide a recommendation:
+        
+        CURRENT HEALTH STATUS:
+        - Resting HR: {{current_resting}} bpm (trend: {{hr_trend}})
+        - HRV Recovery Score: {{recovery_score}}/100 (trend: {{hrv_trend}})
+        - Recent activity level: {{activity_level}}
+        - Heart rate recovery: {{recovery_time_minutes}} minutes average
+        
+        ENVIRONMENTAL CONDITIONS:
+        - Air Quality: {{aqi}} AQI
+        - Conditions: {{conditions}}
+        
+        USER CONSIDERATIONS:
+        - Health conditions: {{health_conditions}}
+        - Fitness level: {{fitness_level}}
+        
+        Provide a specific recommendation about whether to proceed with "{activity_type}" right now, including:
+        1. Yes/No/Modified recommendation with reasoning
+        2. Optimal timing if not recommended now
+        3. Any modifications to consider (intensity, duration, location)
+        
+        Base your recommendation on their recovery metrics and air quality impact.
+        """
+
+
+def _escape_braces(text: str) -> str:
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+@functools.lru_cache(maxsize=32)
+def _build_activity_template(activity_type: str) -> str:
+    """Specialize the activity prompt for one activity type (run, bike, yoga, ...)"""
+    return _ACTIVITY_PROMPT_TEMPLATE.format(
+        base_system_prompt=_escape_braces(_BASE_SYSTEM_PROMPT),
+        activity_type=_escape_braces(activity_type)
+    )
 
 
 class PromptTemplateManager:
     """Manages structured prompts for different insight types"""
     
-    BASE_SYSTEM_PROMPT = """
-    You are a health and wellness data interpreter for a fitness app. Your role is to:
-    
-    1. Translate complex health metrics into clear, actionable insights
-    2. Explain relationships between health patterns and environmental factors
-    3. Provide activity recommendations based on current health status
-    4. Always prioritize user safety and wellbeing
-    
-    CRITICAL SAFETY GUIDELINES:
-    - Never provide medical diagnoses or replace professional medical advice
-    - Always include disclaimers about consulting healthcare providers for medical concerns
-    - Avoid recommending activities that could be harmful
-    - Focus on general wellness and activity optimization, not medical treatment
-    - If concerning patterns are detected, recommend consulting a healthcare provider
-    
-    COMMUNICATION STYLE:
-    - Clear, conversational, and encouraging tone
-    - Explain the 'why' behind recommendations using specific metrics
-    - Use accessible language, avoid medical jargon
-    - Acknowledge limitations when data is insufficient
-    - Keep responses concise and actionable (2-3 sentences max)
-    """
+    BASE_SYSTEM_PROMPT = _BASE_SYSTEM_PROMPT
     
     def generate_daily_summary_prompt(self, health_metrics: HealthMetrics, 
                                     air_quality: Dict, user_profile: Dict) -> str:
         """Generate prompt for daily health summary"""
         return f"""
-        {self.BASE_SYSTEM_PROMPT}
+        {_BASE_SYSTEM_PROMPT}
         
         Based on this user's health data and environmental conditions, provide a personalized daily health summary:
         
@@ -76,40 +129,24 @@ class PromptTemplateManager:
                                               air_quality: Dict, activity_type: str,
                                               user_profile: Dict) -> str:
         """Generate prompt for specific activity recommendations"""
-        return f"""
-        {self.BASE_SYSTEM_PROMPT}
-        
-        The user is asking about: "{activity_type}"
-        
-        Analyze their current readiness and provide a recommendation:
-        
-        CURRENT HEALTH STATUS:
-        - Resting HR: {health_metrics.heart_rate['current_resting']} bpm (trend: {health_metrics.heart_rate['trend']})
-        - HRV Recovery Score: {health_metrics.hrv['recovery_score']}/100 (trend: {health_metrics.hrv['trend']})
-        - Recent activity level: {health_metrics.activity['activity_level']}
-        - Heart rate recovery: {health_metrics.heart_rate['recovery_time_minutes']} minutes average
-        
-        ENVIRONMENTAL CONDITIONS:
-        - Air Quality: {air_quality.get('aqi', 'unknown')} AQI
-        - Conditions: {air_quality.get('conditions', 'unknown')}
-        
-        USER CONSIDERATIONS:
-        - Health conditions: {', '.join(user_profile.get('health_conditions', [])) or 'None'}
-        - Fitness level: {user_profile.get('fitness_level', 'moderate')}
-        
-        Provide a specific recommendation about whether to proceed with "{activity_type}" right now, including:
-        1. Yes/No/Modified recommendation with reasoning
-        2. Optimal timing if not recommended now
-        3. Any modifications to consider (intensity, duration, location)
-        
-        Base your recommendation on their recovery metrics and air quality impact.
-        """
+        return _build_activity_template(activity_type).format(
+            current_resting=health_metrics.heart_rate['current_resting'],
+            hr_trend=health_metrics.heart_rate['trend'],
+            recovery_score=health_metrics.hrv['recovery_score'],
+            hrv_trend=health_metrics.hrv['trend'],
+            activity_level=health_metrics.activity['activity_level'],
+            recovery_time_minutes=health_metrics.heart_rate['recovery_time_minutes'],
+            aqi=air_quality.get('aqi', 'unknown'),
+            conditions=air_quality.get('conditions', 'unknown'),
+            health_conditions=', '.join(user_profile.get('health_conditions', [])) or 'None',
+            fitness_level=user_profile.get('fitness_level', 'moderate')
+        )
     
     def generate_pattern_insight_prompt(self, health_metrics: HealthMetrics,
                                       historical_patterns: Dict) -> str:
         """Generate prompt for health pattern analysis"""
         return f"""
-        {self.BASE_SYSTEM_PROMPT}
+        {_BASE_SYSTEM_PROMPT}
         
         Analyze this user's health patterns and provide insights:
         
@@ -132,11 +169,46 @@ class PromptTemplateManager:
         Keep the insight encouraging and focused on actionable improvements.
         """
     
+    def generate_prompts_batch(self, requests: List[InsightRequest],
+                               health_metrics: List[Optional[HealthMetrics]]) -> List[Dict]:
+        """
+        Build prompts for non-interactive insights in one pass
+        
+        Only daily summaries and pattern insights are batchable; interactive
+        types (activity recommendations, Q&A) are skipped.
+        
+        Args:
+            requests: Insight requests to build prompts for
+            health_metrics: Analyzed metrics aligned index-for-index with requests
+            
+        Returns:
+            List of {'custom_id', 'insight_type', 'prompt'} records
+        """
+        batch = []
+        for index, (insight_request, metrics) in enumerate(zip(requests, health_metrics)):
+            if insight_request.insight_type == 'daily_summary':
+                prompt = self.generate_daily_summary_prompt(
+                    metrics,
+                    insight_request.air_quality_data or {},
+                    insight_request.user_profile or {}
+                )
+            elif insight_request.insight_type == 'pattern_insight':
+                prompt = self.generate_pattern_insight_prompt(metrics, {})
+            else:
+                continue
+            
+            batch.append({
+                'custom_id': f"{insight_request.insight_type}:{insight_request.user_id}:{index}",
+                'insight_type': insight_request.insight_type,
+                'prompt': prompt
+            })
+        return batch
+    
     def generate_qa_prompt(self, health_metrics: HealthMetrics, user_question: str,
                           context: Dict) -> str:
         """Generate prompt for answering specific user questions"""
         return f"""
-        {self.BASE_SYSTEM_PROMPT}
+        {_BASE_SYSTEM_PROMPT}
         
         User Question: "{user_question}"
         
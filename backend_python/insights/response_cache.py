@@ -0,0 +1,99 @@
+"""
+Approximate response cache for health Q&A insights
+"""
+import re
+import threading
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from cachetools import TTLCache
+
+from insights.models.health_metrics import HealthMetrics
+
+
+class QAResponseCache:
+    """
+    Caches validated Q&A answers keyed on the user and a discretized health state.
+
+    Questions are compared by normalized word sets rather than exact text, so
+    rephrasings like "How is my recovery today?" and "how's my recovery
+    today" hit the same entry as long as the user's coarse health state
+    (HRV/HR/sleep/SpO2 buckets, AQI band, time of day, conditions) matches.
+    Entries are per user: answers are written from one user's full metrics and
+    are never served to anyone else.
+    """
+
+    STOPWORDS = frozenset({
+        'a', 'an', 'the', 'is', 'are', 'am', 'my', 'me', 'i', 'it', 'its',
+        'to', 'of', 'for', 'on', 'in', 'at', 'do', 'does', 'can', 'should',
+        'what', 'whats', 'how', 'hows', 'today', 'now', 'right', 'be', 'and'
+    })
+
+    # US EPA AQI band boundaries
+    AQI_BANDS = (50, 100, 150, 200, 300)
+
+    def __init__(self, maxsize: int = 500, ttl: int = 3600, similarity_threshold: float = 0.8):
+        self.similarity_threshold = similarity_threshold
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, question: str, health_metrics: HealthMetrics,
+            context: Dict) -> Optional[Dict]:
+        """Return this user's cached answer for an equivalent question and health state"""
+        tokens = self._normalize_question(question)
+        if not tokens:
+            return None
+
+        state = (user_id, self._bucket_health_state(health_metrics, context))
+        with self._lock:
+            entries = self._cache.get(state)
+            if not entries:
+                return None
+            best_match = None
+            best_score = self.similarity_threshold
+            for cached_tokens, answer in entries.items():
+                score = len(tokens & cached_tokens) / len(tokens | cached_tokens)
+                if score >= best_score:
+                    best_match, best_score = answer, score
+            return best_match
+
+    def put(self, user_id: str, question: str, health_metrics: HealthMetrics,
+            context: Dict, answer: Dict):
+        """Store a validated answer for this user, question and health state"""
+        tokens = self._normalize_question(question)
+        if not tokens:
+            return
+
+        state = (user_id, self._bucket_health_state(health_metrics, context))
+        with self._lock:
+            entries = self._cache.get(state)
+            if entries is None:
+                entries = {}
+            entries[tokens] = answer
+            # Reassign so the TTL restarts for this user and health state
+            self._cache[state] = entries
+
+    def _normalize_question(self, question: str) -> FrozenSet[str]:
+        """Reduce a question to its significant lowercase words"""
+        words = re.findall(r"[a-z0-9]+", question.lower().replace("'", ""))
+        return frozenset(word for word in words if word not in self.STOPWORDS)
+
+    def _bucket_health_state(self, health_metrics: HealthMetrics, context: Dict) -> Tuple:
+        """Discretize the metrics used by the Q&A prompt into coarse buckets"""
+        aqi = context.get('air_quality', {}).get('aqi')
+        if isinstance(aqi, (int, float)):
+            aqi_band = sum(1 for boundary in self.AQI_BANDS if aqi > boundary)
+        else:
+            aqi_band = None
+
+        conditions = context.get('user_profile', {}).get('health_conditions', [])
+
+        return (
+            int(health_metrics.hrv['recovery_score'] // 10),
+            int(health_metrics.heart_rate['current_resting'] // 5),
+            health_metrics.activity['activity_level'],
+            int(health_metrics.spo2['recent_average']),
+            int(health_metrics.sleep['estimated_sleep_quality'] // 10),
+            aqi_band,
+            context.get('time_of_day'),
+            tuple(sorted(conditions)),
+        )
@@ -2,7 +2,7 @@
 Safety validation system for health insights
 """
 import re
-from typing import Tuple, List
+from typing import Tuple, List, Iterable, Iterator, Optional
 import logging
 
 
@@ -30,6 +30,37 @@ class HealthInsightValidator:
         'consult', 'medical professional', 'doctor'
     ]
     
+    # Single-pass prefilters; the per-term loops only run when one of these matches
+    _FORBIDDEN_PREFILTER = re.compile('|'.join(map(re.escape, FORBIDDEN_MEDICAL_TERMS)))
+    _CONCERNING_PREFILTER = re.compile('|'.join(map(re.escape, CONCERNING_PATTERNS)))
+    
+    # Definitive medical statements, matched against lowercased text
+    DEFINITIVE_PATTERNS = [
+        re.compile(r'you have \w+'),
+        re.compile(r'this indicates \w+ disease'),
+        re.compile(r'your condition is'),
+        re.compile(r'diagnosis of')
+    ]
+    
+    # Safer alternatives for problematic terms, applied by _sanitize_medical_language
+    MEDICAL_REPLACEMENTS = {
+        'diagnose': 'suggest',
+        'diagnosis': 'observation',
+        'disease': 'health pattern',
+        'disorder': 'variation',
+        'abnormal': 'outside typical range',
+        'you have': 'your data shows',
+        'suffering from': 'experiencing'
+    }
+    
+    # Matches a trailing piece of text that could still grow into a definitive
+    # statement or a phrase to sanitize; streaming holds it back until the next
+    # words rule it out (see _partial_match_source)
+    _PARTIAL_TAIL = None
+    
+    STREAM_FALLBACK = ("I can share general wellness insights, but please consult a healthcare "
+                       "provider for medical questions. This is wellness guidance, not medical advice.")
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
@@ -45,22 +76,26 @@ class HealthInsightValidator:
             Tuple of (is_valid, processed_insight, warnings)
         """
         warnings = []
+        # Lowercase once and only refresh it when the insight text changes
+        insight_lower = insight.lower()
         
         # Check for medical overreach
-        medical_issues = self._check_medical_overreach(insight)
+        medical_issues = self._check_medical_overreach(insight_lower)
         if medical_issues:
             warnings.extend(medical_issues)
             insight = self._sanitize_medical_language(insight)
+            insight_lower = insight.lower()
         
         # Check for concerning health patterns that need medical attention
-        concerning_issues = self._check_concerning_patterns(insight)
+        concerning_issues = self._check_concerning_patterns(insight_lower)
         if concerning_issues:
             warnings.extend(concerning_issues)
-            insight = self._add_medical_referral(insight)
+            insight = self._add_medical_referral(insight, insight_lower)
+            insight_lower = insight.lower()
         
         # Ensure appropriate disclaimers
-        if not self._has_appropriate_disclaimers(insight):
-            insight = self._add_safety_disclaimer(insight)
+        if not self._has_appropriate_disclaimers(insight_lower):
+            insight = self._add_safety_disclaimer(insight, insight_lower)
         
         # Check response length and readability
         insight = self._ensure_readability(insight)
@@ -70,74 +105,143 @@ class HealthInsightValidator:
         
         return is_safe, insight, warnings
     
-    def _check_medical_overreach(self, text: str) -> List[str]:
-        """Check for inappropriate medical language"""
-        issues = []
-        text_lower = text.lower()
+    def validate_stream(self, chunks: Iterable[str],
+                        warnings: Optional[List[str]] = None) -> Iterator[str]:
+        """
+        Validate streamed insight text incrementally
         
-        for term in self.FORBIDDEN_MEDICAL_TERMS:
-            if term in text_lower:
-                issues.append(f"Medical overreach detected: '{term}'")
+        The concatenated fragments are exactly the text validate_insight returns
+        for the whole stream. Sanitized text is yielded once no later chunk can
+        change it: the trailing word, and any trailing phrase that could still
+        become a definitive statement or a multi-word term, are held back. A
+        definitive medical statement (checked on the raw, unsanitized text)
+        stops the stream and yields a safe fallback instead.
         
-        # Check for definitive medical statements
-        definitive_patterns = [
-            r'you have \w+',
-            r'this indicates \w+ disease',
-            r'your condition is',
-            r'diagnosis of'
-        ]
+        Args:
+            chunks: Text chunks as they arrive from the model
+            warnings: Optional list that collects validation warnings
+            
+        Yields:
+            Sanitized text fragments
+        """
+        if warnings is None:
+            warnings = []
+        raw = ''
+        emitted = ''
         
-        for pattern in definitive_patterns:
-            if re.search(pattern, text_lower):
-                issues.append(f"CRITICAL: Definitive medical statement detected")
+        for chunk in chunks:
+            raw += chunk
+            raw_lower = raw.lower()
+            
+            issues = self._check_medical_overreach(raw_lower)
+            if any(issue.startswith('CRITICAL') for issue in issues):
+                warnings.extend(issues)
+                yield self.STREAM_FALLBACK
+                return
+            
+            stable = self._sanitize_medical_language(raw[:self._stable_prefix_end(raw_lower)])
+            # validate_insight strips the final text and cuts it at 750 characters
+            # when it runs long, so only emit within those bounds
+            text = stable[:750].lstrip().rstrip()
+            if len(text) > len(emitted):
+                yield text[len(emitted):]
+                emitted = text
         
-        return issues
+        # End of stream: the held-back tail, referral, disclaimer and readability
+        # fixes, exactly as validate_insight applies them to the whole text
+        is_safe, text, final_warnings = self.validate_insight(raw)
+        warnings.extend(final_warnings)
+        if not is_safe:
+            yield self.STREAM_FALLBACK
+        elif len(text) > len(emitted):
+            yield text[len(emitted):]
+    
+    def _stable_prefix_end(self, raw_lower: str) -> int:
+        """
+        End of the longest prefix of the streamed text that later chunks can no
+        longer change: it stops at a whitespace before the trailing (possibly
+        growing) word and before any partial definitive or sanitized phrase
+        """
+        end = len(raw_lower)
+        partial = self._partial_tail().search(raw_lower)
+        if partial:
+            end = partial.start()
+        last_space = max(raw_lower.rfind(' ', 0, end), raw_lower.rfind('\n', 0, end))
+        return max(last_space, 0)
+    
+    @classmethod
+    def _partial_tail(cls) -> 're.Pattern':
+        """Compiled _PARTIAL_TAIL, built on first use"""
+        if cls._PARTIAL_TAIL is None:
+            sources = [pattern.pattern for pattern in cls.DEFINITIVE_PATTERNS]
+            sources += [re.escape(term) for term in cls.MEDICAL_REPLACEMENTS]
+            cls._PARTIAL_TAIL = re.compile(
+                '(?:' + '|'.join(map(cls._partial_match_source, sources)) + r')\Z'
+            )
+        return cls._PARTIAL_TAIL
     
-    def _check_concerning_patterns(self, text: str) -> List[str]:
-        """Check for concerning health patterns that need medical attention"""
+    @staticmethod
+    def _partial_match_source(source: str) -> str:
+        """
+        Regex source matching any non-empty prefix of a match of source
+        
+        Handles the simple patterns used here: literal (or escaped) characters
+        and \\w+. Each token after the first is optional along with everything
+        after it, so 'ab' becomes 'a(?:b)?'.
+        """
+        tokens = re.findall(r'\\w\+|\\.|.', source)
+        partial = ''
+        for token in reversed(tokens[1:]):
+            partial = f'(?:{token}{partial})?'
+        return tokens[0] + partial
+    
+    def _check_medical_overreach(self, text_lower: str) -> List[str]:
+        """Check pre-lowercased text for inappropriate medical language"""
         issues = []
-        text_lower = text.lower()
         
-        for pattern in self.CONCERNING_PATTERNS:
-            if pattern in text_lower:
-                issues.append(f"Concerning health pattern mentioned: '{pattern}'")
+        if self._FORBIDDEN_PREFILTER.search(text_lower):
+            for term in self.FORBIDDEN_MEDICAL_TERMS:
+                if term in text_lower:
+                    issues.append(f"Medical overreach detected: '{term}'")
+        
+        # Check for definitive medical statements
+        for pattern in self.DEFINITIVE_PATTERNS:
+            if pattern.search(text_lower):
+                issues.append(f"CRITICAL: Definitive medical statement detected")
         
         return issues
     
-    def _has_appropriate_disclaimers(self, text: str) -> bool:
-        """Check if text has appropriate medical disclaimers"""
-        text_lower = text.lower()
+    def _check_concerning_patterns(self, text_lower: str) -> List[str]:
+        """Check pre-lowercased text for concerning health patterns that need medical attention"""
+        if not self._CONCERNING_PREFILTER.search(text_lower):
+            return []
+        
+        return [f"Concerning health pattern mentioned: '{pattern}'"
+                for pattern in self.CONCERNING_PATTERNS if pattern in text_lower]
+    
+    def _has_appropriate_disclaimers(self, text_lower: str) -> bool:
+        """Check if pre-lowercased text has appropriate medical disclaimers"""
         return any(disclaimer in text_lower for disclaimer in self.REQUIRED_DISCLAIMERS)
     
     def _sanitize_medical_language(self, text: str) -> str:
         """Remove or replace inappropriate medical language"""
         # Replace problematic terms with safer alternatives
-        replacements = {
-            'diagnose': 'suggest',
-            'diagnosis': 'observation',
-            'disease': 'health pattern',
-            'disorder': 'variation',
-            'abnormal': 'outside typical range',
-            'you have': 'your data shows',
-            'suffering from': 'experiencing'
-        }
-        
-        for original, replacement in replacements.items():
+        for original, replacement in self.MEDICAL_REPLACEMENTS.items():
             text = re.sub(r'\b' + original + r'\b', replacement, text, flags=re.IGNORECASE)
         
         return text
     
-    def _add_medical_referral(self, text: str) -> str:
+    def _add_medical_referral(self, text: str, text_lower: str) -> str:
         """Add medical referral for concerning patterns"""
-        if 'healthcare provider' not in text.lower():
+        if 'healthcare provider' not in text_lower:
             text += " Please consult a healthcare provider about these patterns."
         return text
     
-    def _add_safety_disclaimer(self, text: str) -> str:
+    def _add_safety_disclaimer(self, text: str, text_lower: str) -> str:
         """Add appropriate safety disclaimer"""
         disclaimer = "\n\nRemember: This is wellness guidance, not medical advice. Consult healthcare providers for medical concerns."
         
-        if not any(phrase in text.lower() for phrase in ['wellness guidance', 'not medical advice']):
+        if not any(phrase in text_lower for phrase in ['wellness guidance', 'not medical advice']):
             text += disclaimer
         
         return text
@@ -2,11 +2,12 @@
 """
 Load CSV health data into PostgreSQL database
 """
+import asyncio
+import numpy as np
 import pandas as pd
-import psycopg2
-from psycopg2.extras import execute_values
+import asyncpg
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Database configuration
 DB_CONFIG = {
@@ -17,11 +18,11 @@ DB_CONFIG = {
     'port': 5432
 }
 
-def create_tables(conn):
+async def create_tables(conn):
     """Create database tables if they don't exist"""
-    with conn.cursor() as cursor:
+    async with conn.transaction():
         # Create users table
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 id SERIAL PRIMARY KEY,
                 fitbit_user_id VARCHAR(50) UNIQUE NOT NULL,
@@ -31,7 +32,7 @@ def create_tables(conn):
         """)
         
         # Create heart_rate_data table
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS heart_rate_data (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER REFERENCES users(id),
@@ -42,7 +43,7 @@ def create_tables(conn):
         """)
         
         # Create activity_data table
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS activity_data (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER REFERENCES users(id),
@@ -55,7 +56,7 @@ def create_tables(conn):
         """)
         
         # Create spo2_data table
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS spo2_data (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER REFERENCES users(id),
@@ -66,7 +67,7 @@ def create_tables(conn):
         """)
         
         # Create hrv_data table
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS hrv_data (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER REFERENCES users(id),
@@ -79,7 +80,7 @@ def create_tables(conn):
         """)
         
         # Create breathing_rate_data table
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS breathing_rate_data (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER REFERENCES users(id),
@@ -91,35 +92,61 @@ def create_tables(conn):
                 UNIQUE(user_id, date)
             );
         """)
-        
-        conn.commit()
-        print("✓ Database tables created successfully")
+    
+    print("✓ Database tables created successfully")
 
-def create_user(conn, fitbit_user_id='user_001', email='test@example.com'):
+async def create_user(conn, fitbit_user_id='user_001', email='test@example.com'):
     """Create a user and return user_id"""
-    with conn.cursor() as cursor:
-        cursor.execute("""
-            INSERT INTO users (fitbit_user_id, email) 
-            VALUES (%s, %s) 
-            ON CONFLICT (fitbit_user_id) DO UPDATE SET email = EXCLUDED.email
-            RETURNING id
-        """, (fitbit_user_id, email))
-        
-        result = cursor.fetchone()
-        if result:
-            user_id = result[0]
-        else:
-            cursor.execute(
-                "SELECT id FROM users WHERE fitbit_user_id = %s", 
-                (fitbit_user_id,)
-            )
-            user_id = cursor.fetchone()[0]
-        
-        conn.commit()
-        print(f"✓ User created/updated with ID: {user_id}")
-        return user_id
+    user_id = await conn.fetchval("""
+        INSERT INTO users (fitbit_user_id, email) 
+        VALUES ($1, $2) 
+        ON CONFLICT (fitbit_user_id) DO UPDATE SET email = EXCLUDED.email
+        RETURNING id
+    """, fitbit_user_id, email)
+    
+    if user_id is None:
+        user_id = await conn.fetchval(
+            "SELECT id FROM users WHERE fitbit_user_id = $1", 
+            fitbit_user_id
+        )
+    
+    print(f"✓ User created/updated with ID: {user_id}")
+    return user_id
+
+def shift_to_recent(datetimes, days_back=29):
+    """
+    Shift timestamps so the earliest one lands `days_back` days ago.
+    
+    Works on the underlying datetime64 array (truncated to whole seconds,
+    matching the database precision) so no per-row Python objects are built.
+    """
+    values = pd.to_datetime(datetimes).values.astype('datetime64[s]')
+    base_date = np.datetime64(datetime.now() - timedelta(days=days_back), 's')
+    return values + (base_date - values.min())
 
-def load_csv_data(conn, user_id):
+async def copy_records(conn, table, columns, df, on_conflict):
+    """
+    Bulk load dataframe rows with the binary COPY protocol.
+    
+    COPY cannot resolve conflicts itself, so rows are copied into a
+    temporary staging table and merged with a single INSERT ... SELECT.
+    """
+    column_list = ', '.join(columns)
+    staging = f"{table}_staging"
+    records = df[columns].itertuples(index=False, name=None)
+    
+    async with conn.transaction():
+        await conn.execute(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {table} WITH NO DATA"
+        )
+        await conn.copy_records_to_table(staging, records=records, columns=columns)
+        await conn.execute(
+            f"INSERT INTO {table} ({column_list}) "
+            f"SELECT {column_list} FROM {staging} {on_conflict}"
+        )
+
+async def load_csv_data(conn, user_id):
     """Load all CSV files into database"""
     csv_files = {
         'heart_rate': 'processed_heart_rate_data.csv',
@@ -139,160 +166,111 @@ def load_csv_data(conn, user_id):
             
             # Load data based on type
             if data_type == 'heart_rate':
-                load_heart_rate_data(conn, df)
+                await load_heart_rate_data(conn, df)
             elif data_type == 'activity':
-                load_activity_data(conn, df)
+                await load_activity_data(conn, df)
             elif data_type == 'spo2':
-                load_spo2_data(conn, df)
+                await load_spo2_data(conn, df)
             elif data_type == 'hrv':
-                load_hrv_data(conn, df)
+                await load_hrv_data(conn, df)
             elif data_type == 'breathing_rate':
-                load_breathing_rate_data(conn, df)
+                await load_breathing_rate_data(conn, df)
                 
         else:
             print(f"⚠️  {filename} not found, skipping {data_type} data")
 
-def load_heart_rate_data(conn, df):
+async def load_heart_rate_data(conn, df):
     """Load heart rate data"""
     # Limit to recent data to avoid memory issues
     df_sample = df.head(10000).copy()  # Load first 10k records
     
     # Update dates to be recent (within last 30 days)
-    from datetime import datetime, timedelta
-    import pandas as pd
-    base_date = datetime.now() - timedelta(days=29)
-    df_sample['datetime'] = pd.to_datetime(df_sample['datetime'])
-    
-    # Calculate time offset from original data to recent dates
-    time_offset = base_date - df_sample['datetime'].min()
-    df_sample['datetime'] = df_sample['datetime'] + time_offset
-    
-    # Convert to string format for database insertion
-    df_sample['datetime'] = df_sample['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    df_sample['datetime'] = shift_to_recent(df_sample['datetime'])
     
-    records = df_sample[['user_id', 'datetime', 'heart_rate']].to_records(index=False)
-    
-    with conn.cursor() as cursor:
-        execute_values(
-            cursor,
-            """INSERT INTO heart_rate_data (user_id, datetime, heart_rate) 
-               VALUES %s ON CONFLICT (user_id, datetime) DO NOTHING""",
-            records.tolist(),
-            page_size=1000
-        )
-        conn.commit()
+    await copy_records(
+        conn, 'heart_rate_data', ['user_id', 'datetime', 'heart_rate'], df_sample,
+        "ON CONFLICT (user_id, datetime) DO NOTHING"
+    )
     print(f"✓ Loaded {len(df_sample)} heart rate records")
 
-def load_activity_data(conn, df):
+async def load_activity_data(conn, df):
     """Load activity data"""
     # Update dates to be recent (within last 30 days)
-    from datetime import datetime, timedelta
-    import pandas as pd
     df = df.copy()
-    base_date = datetime.now() - timedelta(days=29)
-    df['datetime'] = pd.to_datetime(df['datetime'])
-    
-    # Calculate time offset from original data to recent dates
-    time_offset = base_date - df['datetime'].min()
-    df['datetime'] = df['datetime'] + time_offset
-    
-    # Convert to string format for database insertion
-    df['datetime'] = df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    
-    records = df[['user_id', 'datetime', 'steps', 'distance', 'calories']].to_records(index=False)
+    df['datetime'] = shift_to_recent(df['datetime'])
     
-    with conn.cursor() as cursor:
-        execute_values(
-            cursor,
-            """INSERT INTO activity_data (user_id, datetime, steps, distance, calories) 
-               VALUES %s ON CONFLICT (user_id, datetime) DO NOTHING""",
-            records.tolist()
-        )
-        conn.commit()
+    await copy_records(
+        conn, 'activity_data', ['user_id', 'datetime', 'steps', 'distance', 'calories'], df,
+        "ON CONFLICT (user_id, datetime) DO NOTHING"
+    )
     print(f"✓ Loaded {len(df)} activity records")
 
-def load_spo2_data(conn, df):
+async def load_spo2_data(conn, df):
     """Load SpO2 data"""
     # Limit to recent data
-    df_sample = df.head(5000)  # Load first 5k records
-    records = df_sample[['user_id', 'datetime', 'spo2']].to_records(index=False)
+    df_sample = df.head(5000).copy()  # Load first 5k records
+    # Binary COPY needs real timestamps rather than CSV strings
+    df_sample['datetime'] = pd.to_datetime(df_sample['datetime'])
     
-    with conn.cursor() as cursor:
-        execute_values(
-            cursor,
-            """INSERT INTO spo2_data (user_id, datetime, spo2) 
-               VALUES %s ON CONFLICT (user_id, datetime) DO NOTHING""",
-            records.tolist(),
-            page_size=1000
-        )
-        conn.commit()
+    await copy_records(
+        conn, 'spo2_data', ['user_id', 'datetime', 'spo2'], df_sample,
+        "ON CONFLICT (user_id, datetime) DO NOTHING"
+    )
     print(f"✓ Loaded {len(df_sample)} SpO2 records")
 
-def load_hrv_data(conn, df):
+async def load_hrv_data(conn, df):
     """Load HRV data"""
     # Limit to recent data
-    df_sample = df.head(5000)  # Load first 5k records
-    records = df_sample[['user_id', 'datetime', 'rmssd', 'lf', 'hf']].to_records(index=False)
+    df_sample = df.head(5000).copy()  # Load first 5k records
+    df_sample['datetime'] = pd.to_datetime(df_sample['datetime'])
     
-    with conn.cursor() as cursor:
-        execute_values(
-            cursor,
-            """INSERT INTO hrv_data (user_id, datetime, rmssd, lf, hf) 
-               VALUES %s ON CONFLICT (user_id, datetime) DO NOTHING""",
-            records.tolist(),
-            page_size=1000
-        )
-        conn.commit()
+    await copy_records(
+        conn, 'hrv_data', ['user_id', 'datetime', 'rmssd', 'lf', 'hf'], df_sample,
+        "ON CONFLICT (user_id, datetime) DO NOTHING"
+    )
     print(f"✓ Loaded {len(df_sample)} HRV records")
 
-def load_breathing_rate_data(conn, df):
+async def load_breathing_rate_data(conn, df):
     """Load breathing rate data"""
-    records = df[['user_id', 'date', 'deep_sleep_br', 'rem_sleep_br', 
-                 'light_sleep_br', 'full_sleep_br']].to_records(index=False)
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date']).dt.date
     
-    with conn.cursor() as cursor:
-        execute_values(
-            cursor,
-            """INSERT INTO breathing_rate_data 
-               (user_id, date, deep_sleep_br, rem_sleep_br, light_sleep_br, full_sleep_br) 
-               VALUES %s ON CONFLICT (user_id, date) DO UPDATE SET
-               deep_sleep_br = EXCLUDED.deep_sleep_br,
-               rem_sleep_br = EXCLUDED.rem_sleep_br,
-               light_sleep_br = EXCLUDED.light_sleep_br,
-               full_sleep_br = EXCLUDED.full_sleep_br""",
-            records.tolist()
-        )
-        conn.commit()
+    await copy_records(
+        conn, 'breathing_rate_data',
+        ['user_id', 'date', 'deep_sleep_br', 'rem_sleep_br', 'light_sleep_br', 'full_sleep_br'], df,
+        """ON CONFLICT (user_id, date) DO UPDATE SET
+           deep_sleep_br = EXCLUDED.deep_sleep_br,
+           rem_sleep_br = EXCLUDED.rem_sleep_br,
+           light_sleep_br = EXCLUDED.light_sleep_br,
+           full_sleep_br = EXCLUDED.full_sleep_br"""
+    )
     print(f"✓ Loaded {len(df)} breathing rate records")
 
-def main():
-    """Main function to load data"""
+async def main_async():
+    """Main coroutine to load data"""
     try:
         # Connect to database
         print("Connecting to PostgreSQL database...")
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = await asyncpg.connect(**DB_CONFIG)
         print("✓ Database connection successful")
         
         # Create tables
-        create_tables(conn)
+        await create_tables(conn)
         
         # Create user
-        user_id = create_user(conn)
+        user_id = await create_user(conn)
         
         # Load CSV data
-        load_csv_data(conn, user_id)
+        await load_csv_data(conn, user_id)
         
         # Verify data
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) FROM heart_rate_data")
-            hr_count = cursor.fetchone()[0]
-            cursor.execute("SELECT COUNT(*) FROM activity_data")
-            activity_count = cursor.fetchone()[0]
-            print(f"\n✓ Data verification:")
-            print(f"  - Heart rate records: {hr_count}")
-            print(f"  - Activity records: {activity_count}")
+        hr_count = await conn.fetchval("SELECT COUNT(*) FROM heart_rate_data")
+        activity_count = await conn.fetchval("SELECT COUNT(*) FROM activity_data")
+        print(f"\n✓ Data verification:")
+        print(f"  - Heart rate records: {hr_count}")
+        print(f"  - Activity records: {activity_count}")
         
-        conn.close()
+        await conn.close()
         print("\n🎉 Database setup completed successfully!")
         
     except Exception as e:
@@ -301,5 +279,9 @@ def main():
     
     return True
 
+def main():
+    """Main function to load data"""
+    return asyncio.run(main_async())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
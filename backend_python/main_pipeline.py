@@ -1,7 +1,7 @@
 from fitbit_data_extractor import FitbitDataExtractor
 from data_processor import FitbitDataProcessor
 from database_manager import DatabaseManager, DB_CONFIG
-import json
+import orjson
 from datetime import datetime, timedelta
 import sys
 import os
@@ -112,4 +112,9 @@ if __name__ == "__main__":
     result = run_complete_pipeline("test@example.com", days_back=7)
     
     print("\n=== Final Results ===")
-    print(json.dumps(result, indent=2, default=str))
\ No newline at end of file
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(
+        result,
+        default=str,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+    ))
\ No newline at end of file
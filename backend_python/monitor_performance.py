@@ -4,11 +4,18 @@ Health Map AI Performance Monitor
 Monitors memory usage, database connections, and response times
 """
 
+import asyncio
 import psutil
 import time
 import logging
+import logging.handlers
+import queue
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
 import psycopg2
+from psycopg2 import pool
+import threading
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -29,22 +36,89 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', 5432))
 }
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+# Setup logging: the monitor loop only enqueues records, a QueueListener
+# thread does the file/console writes so slow disks don't stall sampling
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_file_handler = logging.FileHandler(LOG_FILE)
+_file_handler.setFormatter(_log_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, _file_handler, _stream_handler)
+log_listener.start()
+# Flush queued records on exit
+atexit.register(log_listener.stop)
+
+# Leave timestamp/level formatting to the listener's handlers
+_queue_handler = logging.handlers.QueueHandler(log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
+# Prime the system-wide CPU counter so later non-blocking reads have a baseline
+psutil.cpu_percent(interval=None)
+
+# Last (monotonic timestamp, value) CPU sample, reused by callers polling faster
+# than half the monitor interval
+_last_cpu_sample = None
+
+def get_cpu_percent():
+    """Non-blocking system CPU usage since the previous sample"""
+    global _last_cpu_sample
+    now = time.monotonic()
+    if _last_cpu_sample and now - _last_cpu_sample[0] < MONITOR_INTERVAL / 2:
+        return _last_cpu_sample[1]
+    
+    cpu_percent = psutil.cpu_percent(interval=None)
+    _last_cpu_sample = (now, cpu_percent)
+    return cpu_percent
+
+# Process handles keyed by pid, kept across ticks; None marks a non-Python pid
+# so its name is only read once
+_proc_cache = {}
+
+def get_python_processes():
+    """Sample Python processes, only building Process objects for new pids"""
+    pids = set(psutil.pids())
+    
+    # Drop processes that have exited since the last tick
+    for pid in _proc_cache.keys() - pids:
+        del _proc_cache[pid]
+    
+    for pid in pids - _proc_cache.keys():
+        try:
+            proc = psutil.Process(pid)
+            _proc_cache[pid] = proc if 'python' in proc.name().lower() else None
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            _proc_cache[pid] = None
+    
+    python_processes = []
+    for pid, proc in list(_proc_cache.items()):
+        if proc is None:
+            continue
+        try:
+            # oneshot() batches the underlying /proc reads for this process
+            with proc.oneshot():
+                python_processes.append({
+                    'pid': pid,
+                    'name': proc.name(),
+                    'memory_percent': proc.memory_percent(),
+                    'cpu_percent': proc.cpu_percent(interval=None)
+                })
+        except psutil.NoSuchProcess:
+            del _proc_cache[pid]
+        except psutil.AccessDenied:
+            pass
+    
+    return python_processes
+
 def get_system_metrics():
     """Get system performance metrics"""
     try:
         # CPU usage
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = get_cpu_percent()
         
         # Memory usage
         memory = psutil.virtual_memory()
@@ -53,13 +127,7 @@ def get_system_metrics():
         memory_total_gb = memory.total / (1024**3)
         
         # Find Python processes
-        python_processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'memory_percent', 'cpu_percent']):
-            try:
-                if 'python' in proc.info['name'].lower():
-                    python_processes.append(proc.info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
+        python_processes = get_python_processes()
         
         return {
             'cpu_percent': cpu_percent,
@@ -72,25 +140,60 @@ def get_system_metrics():
         logger.error(f"Error getting system metrics: {e}")
         return {}
 
+# One long-lived connection reused across ticks instead of reconnecting every interval
+db_pool = None
+db_pool_lock = threading.Lock()
+
+# Backend pids whose session already holds the prepared active-connections query
+_prepared_backends = set()
+
+def get_db_pool():
+    """Lazily create the monitor's connection pool"""
+    global db_pool
+    if db_pool is None:
+        with db_pool_lock:
+            if db_pool is None:
+                db_pool = psycopg2.pool.ThreadedConnectionPool(1, 2, **DB_CONFIG)
+    return db_pool
+
 def test_database_connection():
     """Test database connection and get connection count"""
+    conn = None
+    backend_pid = None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        connection_pool = get_db_pool()
+        conn = connection_pool.getconn()
+        # Autocommit keeps the pooled session out of an idle transaction between ticks
+        conn.autocommit = True
+        backend_pid = conn.get_backend_pid()
+        
         with conn.cursor() as cursor:
-            # Get active connection count
-            cursor.execute("""
-                SELECT count(*) 
-                FROM pg_stat_activity 
-                WHERE state = 'active' AND datname = %s
-            """, (DB_CONFIG['database'],))
+            if backend_pid not in _prepared_backends:
+                cursor.execute("""
+                    PREPARE active_connections AS
+                    SELECT count(*) 
+                    FROM pg_stat_activity 
+                    WHERE state = 'active' AND datname = $1
+                """)
+                _prepared_backends.add(backend_pid)
             
+            # Get active connection count
+            cursor.execute("EXECUTE active_connections (%s)", (DB_CONFIG['database'],))
             active_connections = cursor.fetchone()[0]
-            
-        conn.close()
+        
+        connection_pool.putconn(conn)
         return {'status': 'healthy', 'active_connections': active_connections}
     except Exception as e:
+        # Close a broken connection so the next tick transparently reopens it
+        if conn is not None:
+            _prepared_backends.discard(backend_pid)
+            db_pool.putconn(conn, close=True)
         return {'status': 'error', 'error': str(e)}
 
+# Keep-alive session so successive ticks reuse the same HTTP connection
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=2, pool_maxsize=2))
+
 def test_api_endpoints():
     """Test critical API endpoints"""
     endpoints = [
@@ -101,7 +204,8 @@ def test_api_endpoints():
     for endpoint in endpoints:
         try:
             start_time = time.time()
-            response = requests.get(f"{API_BASE_URL}{endpoint}", timeout=10)
+            # (connect, read) timeouts so a hung API can't stall the monitor on connect
+            response = session.get(f"{API_BASE_URL}{endpoint}", timeout=(1, 10))
             response_time = time.time() - start_time
             
             results[endpoint] = {
@@ -118,18 +222,27 @@ def test_api_endpoints():
     
     return results
 
-def main():
+async def collect_metrics():
+    """Run the independent probes concurrently so a tick takes max() rather than sum()"""
+    return await asyncio.gather(
+        asyncio.to_thread(get_system_metrics),
+        asyncio.to_thread(test_database_connection),
+        asyncio.to_thread(test_api_endpoints)
+    )
+
+async def main_async():
     """Main monitoring loop"""
     logger.info("Starting Health Map AI Performance Monitor")
     
+    # Fixed-period schedule: sleep until the next deadline so tick duration
+    # doesn't accumulate as drift
+    next_tick = time.monotonic()
     while True:
         try:
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
             # Get metrics
-            system_metrics = get_system_metrics()
-            db_status = test_database_connection()
-            api_status = test_api_endpoints()
+            system_metrics, db_status, api_status = await collect_metrics()
             
             # Log summary
             logger.info(f"=== Performance Report - {timestamp} ===")
@@ -170,7 +283,17 @@ def main():
         except Exception as e:
             logger.error(f"Monitoring error: {e}")
         
-        time.sleep(MONITOR_INTERVAL)
+        next_tick += MONITOR_INTERVAL
+        sleep_for = next_tick - time.monotonic()
+        if sleep_for > 0:
+            await asyncio.sleep(sleep_for)
+        else:
+            # Overran the interval: skip the missed ticks instead of queueing them
+            next_tick = time.monotonic()
+
+def main():
+    """Run the monitoring loop"""
+    asyncio.run(main_async())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
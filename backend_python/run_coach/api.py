@@ -2,27 +2,63 @@
 Flask API endpoints for Run Coach feature
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from typing import Dict, List, Tuple
 import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import orjson
 from datetime import datetime
 from .core.cache_manager import cache
 
-from .core.optimizer import RunCoachOptimizer
-from .core.pollution_grid import PollutionGrid
-from .core.health_risk import HealthRiskCalculator
-from .services.air_quality_service import AirQualityService
-from .services.route_generator import RouteGenerator
-from .services.time_optimizer import TimeWindowOptimizer
+# Service modules (scipy, sklearn, googlemaps, requests) are imported in
+# _initialize_services so booting Flask doesn't pay for them
 from .models import UserProfile, RunningPreferences, RouteRecommendation, RouteSegment
 
 logger = logging.getLogger(__name__)
 
+# Short TTLs for negative results (empty heatmaps, fallback routes)
+EMPTY_HEATMAP_TTL_SECONDS = 60
+MOCK_ROUTE_TTL_SECONDS = 30
+
+# Approximate degrees of latitude per km
+_DEG_PER_KM = 1.0 / 111.0
+
+# Constant fields of the empty heatmap response; bounds and pollutant are added per request
+_EMPTY_HEATMAP_TEMPLATE = {
+    'values': [],
+    'uncertainty': [],
+    'resolution': 100,
+    'timestamp': None,
+    'message': 'No pollution data available for this area'
+}
+
+# (9, 2) unit-circle (cos, sin) offsets for the 8-point mock route; row 8 closes the loop
+_UNIT_CIRCLE_ANGLES = np.arange(9) % 8 * (2 * np.pi / 8)
+_UNIT_CIRCLE = np.column_stack([np.cos(_UNIT_CIRCLE_ANGLES), np.sin(_UNIT_CIRCLE_ANGLES)])
+
+# Recently requested heatmap areas are recomputed in the background so
+# requests are served from cache: (lat, lon, radius_km) -> last access. Each
+# area's grid is rebuilt once per refresh and every pollutant's heatmap cached
+HEATMAP_REFRESH_INTERVAL_SECONDS = 60
+HEATMAP_ACTIVE_AREA_SECONDS = 600
+_active_heatmap_areas: Dict[Tuple, float] = {}
+
+# Serializes update_grid + heatmap reads on the shared PollutionGrid
+_grid_lock = threading.Lock()
+
+# Runs independent per-request lookups in parallel
+_request_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='run-coach')
+
 # Create Blueprint
 run_coach_bp = Blueprint('run_coach', __name__, url_prefix='/api/run-coach')
 
 # Lazy initialization of services
 _services_initialized = False
+_init_lock = threading.Lock()
 air_quality_service = None
 pollution_grid = None
 route_generator = None
@@ -35,7 +71,22 @@ def _initialize_services():
     global _services_initialized, air_quality_service, pollution_grid, route_generator
     global health_risk_calculator, time_optimizer, route_optimizer
     
-    if not _services_initialized:
+    # Fast path once initialized; the lock keeps concurrent first requests
+    # from building the services (and their grids) twice
+    if _services_initialized:
+        return
+    
+    with _init_lock:
+        if _services_initialized:
+            return
+        
+        from .core.optimizer import RunCoachOptimizer
+        from .core.pollution_grid import PollutionGrid
+        from .core.health_risk import HealthRiskCalculator
+        from .services.air_quality_service import AirQualityService
+        from .services.route_generator import RouteGenerator
+        from .services.time_optimizer import TimeWindowOptimizer
+        
         air_quality_service = AirQualityService()
         # Use 2000m resolution for demo performance (much faster)
         pollution_grid = PollutionGrid(resolution_meters=2000)
@@ -43,9 +94,60 @@ def _initialize_services():
         health_risk_calculator = HealthRiskCalculator()
         time_optimizer = TimeWindowOptimizer(air_quality_service)
         route_optimizer = RunCoachOptimizer(pollution_grid)
+        
+        threading.Thread(target=_heatmap_refresh_worker, daemon=True).start()
         _services_initialized = True
 
 
+def _compute_heatmap(lat: float, lon: float, radius_km: float, pollutant: str) -> Dict:
+    """Fetch air quality for an area, rebuild the grid and return its heatmap"""
+    air_quality_data = air_quality_service.get_current_air_quality(
+        (lat, lon),
+        radius_km
+    )
+    
+    with _grid_lock:
+        pollution_grid.update_grid(air_quality_data)
+        return pollution_grid.get_pollution_heatmap(pollutant)
+
+
+def _compute_area_heatmaps(lat: float, lon: float, radius_km: float) -> Dict[str, Dict]:
+    """Fetch air quality for an area, rebuild the grid once and return every pollutant's heatmap"""
+    air_quality_data = air_quality_service.get_current_air_quality(
+        (lat, lon),
+        radius_km
+    )
+    
+    with _grid_lock:
+        pollution_grid.update_grid(air_quality_data)
+        heatmaps = {
+            pollutant: pollution_grid.get_pollution_heatmap(pollutant)
+            for pollutant in pollution_grid.pollution_values
+        }
+    return {pollutant: heatmap for pollutant, heatmap in heatmaps.items() if heatmap is not None}
+
+
+def _heatmap_refresh_worker():
+    """Keep heatmaps for recently requested areas fresh in the cache"""
+    while True:
+        time.sleep(HEATMAP_REFRESH_INTERVAL_SECONDS)
+        
+        cutoff = time.monotonic() - HEATMAP_ACTIVE_AREA_SECONDS
+        for area, last_access in list(_active_heatmap_areas.items()):
+            if last_access < cutoff:
+                _active_heatmap_areas.pop(area, None)
+                continue
+            
+            lat, lon, radius_km = area
+            try:
+                for pollutant, heatmap_data in _compute_area_heatmaps(lat, lon, radius_km).items():
+                    cache.set('pollution_heatmap', {
+                        'lat': lat, 'lon': lon, 'radius_km': radius_km, 'pollutant': pollutant
+                    }, heatmap_data)
+            except Exception as e:
+                logger.error(f"Background heatmap refresh failed for {area}: {e}")
+
+
 @run_coach_bp.route('/health-check', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -105,16 +207,21 @@ def recommend_route():
             prioritize_parks=data['preferences'].get('prioritize_parks', True)
         )
         
+        # During an upstream outage, serve the recently cached fallback route
+        # instead of re-entering the air quality / generator path
+        mock_params = {
+            'lat': round(location[0], 3),
+            'lon': round(location[1], 3),
+            'distance_m': prefs.preferred_distance_m
+        }
+        cached_mock = cache.get('mock_route', mock_params)
+        if cached_mock:
+            return jsonify(cached_mock)
+        
         # Get current air quality data
         logger.info(f"Fetching air quality data for {location}")
         air_quality_data = air_quality_service.get_current_air_quality(location)
         
-        # Update pollution grid only if we have sufficient data
-        if len(air_quality_data) >= 3:
-            pollution_grid.update_grid(air_quality_data)
-        else:
-            logger.warning(f"Insufficient air quality data points: {len(air_quality_data)}")
-        
         # Generate route candidates
         logger.info("Generating route candidates")
         try:
@@ -126,42 +233,57 @@ def recommend_route():
             if not candidates:
                 # Return mock route if no candidates generated
                 logger.warning("No route candidates generated, using mock route")
-                return jsonify(_get_mock_route_response(location, prefs))
+                mock_response = _get_mock_route_response(location, prefs)
+                cache.set('mock_route', mock_params, mock_response, ttl_override=MOCK_ROUTE_TTL_SECONDS)
+                return jsonify(mock_response)
                 
         except Exception as e:
             logger.error(f"Error generating routes: {e}")
             # Return mock route on error
-            return jsonify(_get_mock_route_response(location, prefs))
-        
-        # Optimize route selection
-        logger.info(f"Optimizing route selection from {len(candidates)} candidates")
-        try:
-            best_route = route_optimizer.optimize_route(
-                location,
-                user_profile,
-                prefs,
-                candidates
-            )
-        except ValueError as e:
-            logger.error(f"Route optimization error: {e}")
-            # Return the first candidate if optimization fails
-            if candidates:
-                best_route = _convert_candidate_to_recommendation(candidates[0])
+            mock_response = _get_mock_route_response(location, prefs)
+            cache.set('mock_route', mock_params, mock_response, ttl_override=MOCK_ROUTE_TTL_SECONDS)
+            return jsonify(mock_response)
+        
+        # Hold the grid lock from update through optimization so a background
+        # heatmap refresh can't swap the shared grid to another area mid-scoring
+        with _grid_lock:
+            # Update pollution grid only if we have sufficient data
+            if len(air_quality_data) >= 3:
+                pollution_grid.update_grid(air_quality_data)
             else:
-                return jsonify(_get_mock_route_response(location, prefs))
-        
-        # Get elevation profile
-        elevation_profile = route_generator.get_elevation_profile({
-            'geometry': best_route.geometry
-        })
-        
-        # Find optimal time windows
-        time_windows = time_optimizer.find_optimal_windows(
+                logger.warning(f"Insufficient air quality data points: {len(air_quality_data)}")
+            
+            # Optimize route selection
+            logger.info(f"Optimizing route selection from {len(candidates)} candidates")
+            try:
+                best_route = route_optimizer.optimize_route(
+                    location,
+                    user_profile,
+                    prefs,
+                    candidates
+                )
+            except ValueError as e:
+                logger.error(f"Route optimization error: {e}")
+                # Return the first candidate if optimization fails
+                if candidates:
+                    best_route = _convert_candidate_to_recommendation(candidates[0])
+                else:
+                    return jsonify(_get_mock_route_response(location, prefs))
+        
+        # Elevation profile and optimal time windows are independent; fetch them concurrently
+        elevation_future = _request_executor.submit(
+            route_generator.get_elevation_profile,
+            {'route_id': best_route.route_id, 'geometry': best_route.geometry}
+        )
+        windows_future = _request_executor.submit(
+            time_optimizer.find_optimal_windows,
             location,
             user_profile,
-            int(best_route.duration_min),
+            max(1, math.ceil(best_route.duration_min)),  # Sub-minute routes still need a window
             lookahead_hours=24
         )
+        elevation_profile = elevation_future.result()
+        time_windows = windows_future.result()
         
         # Format response
         response = {
@@ -178,17 +300,7 @@ def recommend_route():
                 'safety_score': best_route.safety_score,
                 'elevation_profile': elevation_profile
             },
-            'segments': [
-                {
-                    'start': seg.start_point,
-                    'end': seg.end_point,
-                    'distance_m': seg.distance_m,
-                    'aqi': seg.aqi,
-                    'pm25': seg.pm25,
-                    'recommended_pace': seg.recommended_pace
-                }
-                for seg in best_route.segments[:10]  # Limit segments in response
-            ],
+            'segments': best_route.segment_dicts[:10],  # Limit segments in response
             'time_windows': [
                 {
                     'start': window.start.isoformat(),
@@ -224,52 +336,48 @@ def get_pollution_heatmap():
     - lon: longitude
     - radius_km: radius in kilometers
     - pollutant: pollutant type (aqi, pm25, pm10, o3, no2)
+    - format: 'json' (default) or 'bin' for the values grid as raw float32
+      bytes (see _binary_heatmap_response)
     """
     try:
-        lat = float(request.args.get('lat', 37.7749))
-        lon = float(request.args.get('lon', -122.4194))
-        radius_km = float(request.args.get('radius_km', 10))
+        # Quantize to ~100m (the heatmap's native cell size) so small map pans
+        # share a cache entry; the grid is computed for the quantized area
+        lat = round(float(request.args.get('lat', 37.7749)), 3)
+        lon = round(float(request.args.get('lon', -122.4194)), 3)
+        radius_km = round(float(request.args.get('radius_km', 10)), 1)
         pollutant = request.args.get('pollutant', 'aqi')
+        respond = _binary_heatmap_response if request.args.get('format') == 'bin' else _json_response
         
-        # Check cache first
         cache_params = {'lat': lat, 'lon': lon, 'radius_km': radius_km, 'pollutant': pollutant}
-        cached_data = cache.get('pollution_heatmap', cache_params)
-        if cached_data:
-            return jsonify(cached_data)
-        
-        # Get air quality data
-        air_quality_data = air_quality_service.get_current_air_quality(
-            (lat, lon),
-            radius_km
-        )
         
-        # Update grid
-        pollution_grid.update_grid(air_quality_data)
+        # Register the area for background refresh
+        _active_heatmap_areas[(lat, lon, radius_km)] = time.monotonic()
         
-        # Get heatmap data
-        heatmap_data = pollution_grid.get_pollution_heatmap(pollutant)
+        # Concurrent misses for the same area share a single computation
+        heatmap_data = cache.get_or_compute(
+            'pollution_heatmap', cache_params,
+            lambda: _compute_heatmap(lat, lon, radius_km, pollutant)
+        )
         
         if heatmap_data is None:
-            # Return empty heatmap if no data
-            return jsonify({
+            # Return empty heatmap if no data, caching it briefly so repeated
+            # requests don't each refetch upstream for the same empty area
+            dlat = radius_km * _DEG_PER_KM
+            empty_response = {
+                **_EMPTY_HEATMAP_TEMPLATE,
                 'bounds': {
-                    'min_lat': lat - radius_km / 111,
-                    'max_lat': lat + radius_km / 111,
-                    'min_lon': lon - radius_km / 111,
-                    'max_lon': lon + radius_km / 111
+                    'min_lat': lat - dlat,
+                    'max_lat': lat + dlat,
+                    'min_lon': lon - dlat,
+                    'max_lon': lon + dlat
                 },
-                'values': [],
-                'uncertainty': [],
-                'resolution': 100,
-                'pollutant': pollutant,
-                'timestamp': None,
-                'message': 'No pollution data available for this area'
-            })
-        
-        # Cache the result
-        cache.set('pollution_heatmap', cache_params, heatmap_data)
+                'pollutant': pollutant
+            }
+            cache.set('pollution_heatmap', cache_params, empty_response,
+                      ttl_override=EMPTY_HEATMAP_TTL_SECONDS)
+            return respond(empty_response)
         
-        return jsonify(heatmap_data)
+        return respond(heatmap_data)
         
     except Exception as e:
         logger.error(f"Error in get_pollution_heatmap: {e}")
@@ -410,10 +518,13 @@ def get_weekly_schedule():
         "user_profile": {...},
         "runs_per_week": 3
     }
+    
+    Send "locations": [{"lat": ..., "lon": ...}, ...] instead of "location"
+    to get one schedule per location (as "weekly_schedules"); their
+    forecasts are fetched concurrently.
     """
     try:
         data = request.json
-        location = (data['location']['lat'], data['location']['lon'])
         
         # Create user profile
         user_profile = UserProfile(
@@ -422,41 +533,74 @@ def get_weekly_schedule():
             age_group=data['user_profile'].get('age_group', '25-34')
         )
         
-        # Get weekly schedule
-        schedule = time_optimizer.suggest_weekly_schedule(
-            location,
-            user_profile,
-            data.get('runs_per_week', 3)
-        )
+        runs_per_week = data.get('runs_per_week', 3)
         
-        # Format response
-        response = {
-            'weekly_schedule': {}
-        }
+        if 'locations' in data:
+            locations = [(loc['lat'], loc['lon']) for loc in data['locations']]
+            schedules = time_optimizer.suggest_weekly_schedules(locations, user_profile, runs_per_week)
+            return jsonify({
+                'weekly_schedules': [_format_weekly_schedule(schedule) for schedule in schedules]
+            })
         
-        for day, windows in schedule.items():
-            if windows:
-                response['weekly_schedule'][day] = {
-                    'recommended': True,
-                    'best_time': {
-                        'start': windows[0].start.isoformat(),
-                        'end': windows[0].end.isoformat(),
-                        'avg_aqi': windows[0].avg_aqi
-                    }
-                }
-            else:
-                response['weekly_schedule'][day] = {
-                    'recommended': False,
-                    'reason': 'Rest day'
-                }
-                
-        return jsonify(response)
+        # Get weekly schedule
+        location = (data['location']['lat'], data['location']['lon'])
+        schedule = time_optimizer.suggest_weekly_schedule(location, user_profile, runs_per_week)
+        
+        return jsonify({'weekly_schedule': _format_weekly_schedule(schedule)})
         
     except Exception as e:
         logger.error(f"Error in get_weekly_schedule: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+def _format_weekly_schedule(schedule: Dict) -> Dict:
+    """Summarize each day of a weekly schedule by its best window"""
+    formatted = {}
+    
+    for day, windows in schedule.items():
+        if windows:
+            formatted[day] = {
+                'recommended': True,
+                'best_time': {
+                    'start': windows[0].start.isoformat(),
+                    'end': windows[0].end.isoformat(),
+                    'avg_aqi': windows[0].avg_aqi
+                }
+            }
+        else:
+            formatted[day] = {
+                'recommended': False,
+                'reason': 'Rest day'
+            }
+            
+    return formatted
+
+
+def _json_response(data: Dict) -> Response:
+    """Serialize large payloads (heatmap grids) with orjson instead of jsonify"""
+    return Response(
+        orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY),
+        mimetype='application/json'
+    )
+
+
+def _binary_heatmap_response(data: Dict) -> Response:
+    """
+    Send a heatmap's values grid as raw little-endian float32 bytes, row-major,
+    so clients can load it with np.frombuffer instead of parsing JSON; the
+    remaining fields (plus 'grid_shape') travel as JSON in the X-Heatmap-Meta
+    header, and the uncertainty grid is left out
+    """
+    values = np.ascontiguousarray(data['values'], dtype='<f4')
+    meta = {key: value for key, value in data.items() if key not in ('values', 'uncertainty')}
+    meta['grid_shape'] = list(values.shape)
+    return Response(
+        values.tobytes(),
+        mimetype='application/octet-stream',
+        headers={'X-Heatmap-Meta': orjson.dumps(meta).decode()}
+    )
+
+
 def _get_quality_rating(score: float) -> str:
     """Convert numerical score to quality rating"""
     if score >= 0.8:
@@ -490,17 +634,8 @@ def _get_mock_route_response(location: Tuple[float, float], prefs: RunningPrefer
     lat, lon = location
     
     # Create a simple circular route
-    import math
-    points = []
-    radius = prefs.preferred_distance_m / (2 * math.pi) / 111000  # Convert to degrees
-    
-    for i in range(8):
-        angle = (i / 8) * 2 * math.pi
-        points.append([
-            lat + radius * math.cos(angle),
-            lon + radius * math.sin(angle)
-        ])
-    points.append(points[0])  # Close the loop
+    radius = prefs.preferred_distance_m / (2 * math.pi * 111000)  # Convert to degrees
+    points = (np.array([lat, lon]) + radius * _UNIT_CIRCLE).tolist()
     
     route = RouteRecommendation(
         route_id='mock_route_1',
@@ -542,17 +677,7 @@ def _get_mock_route_response(location: Tuple[float, float], prefs: RunningPrefer
             'safety_score': route.safety_score,
             'elevation_profile': [10, 15, 20, 15, 10]
         },
-        'segments': [
-            {
-                'start': seg.start_point,
-                'end': seg.end_point,
-                'distance_m': seg.distance_m,
-                'aqi': seg.aqi,
-                'pm25': seg.pm25,
-                'recommended_pace': seg.recommended_pace
-            }
-            for seg in route.segments
-        ],
+        'segments': route.segment_dicts,
         'time_windows': [
             {
                 'start': datetime.now().replace(hour=6, minute=0).isoformat(),
@@ -0,0 +1,25 @@
+"""
+Ahead-of-time compile Run Coach numeric kernels with numba.pycc
+
+Usage (from backend_python/):
+    python -m run_coach.core.build_kernels
+
+Writes the _aot_kernels extension next to this module; optimizer.py imports
+it when present and falls back to @njit otherwise.
+"""
+
+import os
+
+from numba.pycc import CC
+
+from .optimizer import _accumulate_exposure_py
+
+cc = CC('_aot_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# int16 AQI / PM2.5 arrays in, int64 weighted sum out
+cc.export('accumulate_exposure', 'i8(i2[:], i2[:])')(_accumulate_exposure_py)
+
+
+if __name__ == "__main__":
+    cc.compile()
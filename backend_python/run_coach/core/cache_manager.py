@@ -2,59 +2,171 @@
 Cache manager for Run Coach to improve performance
 """
 import json
+import logging
+import threading
+from collections import OrderedDict
 import time
-from typing import Dict, Any, Optional
+from time import monotonic as now
+from typing import Dict, Any, Callable, Optional, Tuple
 import hashlib
 
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """An in-progress computation that concurrent callers wait on"""
+    __slots__ = ('event', 'result', 'error')
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
 class CacheManager:
-    """Simple in-memory cache for Run Coach API responses"""
+    """Simple in-memory LRU cache for Run Coach API responses"""
     
-    def __init__(self, ttl_seconds: int = 300):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 512):
+        # key -> (monotonic deadline, data), ordered from least to most recently used
+        self._cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
         self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._inflight: Dict[Tuple, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
     
-    def _get_cache_key(self, endpoint: str, params: Dict[str, Any]) -> str:
+    def _get_cache_key(self, endpoint: str, params: Dict[str, Any]) -> Tuple:
         """Generate cache key from endpoint and parameters"""
-        # Sort params for consistent key generation
-        sorted_params = json.dumps(params, sort_keys=True)
-        key_string = f"{endpoint}:{sorted_params}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # Sorted tuple of primitives hashes directly; only unhashable
+        # containers fall back to a digest of their JSON form
+        items = []
+        for name, value in sorted(params.items()):
+            if isinstance(value, (dict, list)):
+                value = hashlib.md5(json.dumps(value, sort_keys=True).encode()).hexdigest()
+            items.append((name, value))
+        return (endpoint, tuple(items))
     
     def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
         """Get cached response if available and not expired"""
         key = self._get_cache_key(endpoint, params)
+        with self._lock:
+            return self._get_locked(key)
+    
+    def _get_locked(self, key: Tuple) -> Optional[Any]:
+        """Look up a key; caller must hold the lock"""
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
         
-        if key in self._cache:
-            cached = self._cache[key]
-            if time.time() < cached['expires_at']:
-                return cached['data']
-            else:
-                # Remove expired entry
-                del self._cache[key]
+        expires_at, data = entry
+        if now() >= expires_at:
+            # Lazily drop the expired entry on access
+            self._cache.pop(key, None)
+            self.misses += 1
+            return None
+        
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return data
+    
+    def set(self, endpoint: str, params: Dict[str, Any], data: Any,
+            ttl_override: Optional[int] = None):
+        """
+        Cache response with TTL, evicting the least recently used entry when full
         
-        return None
+        ttl_override gives this entry its own lifetime, e.g. a short TTL for
+        negative results.
+        """
+        key = self._get_cache_key(endpoint, params)
+        ttl = self.ttl_seconds if ttl_override is None else ttl_override
+        with self._lock:
+            self._cache[key] = (now() + ttl, data)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
     
-    def set(self, endpoint: str, params: Dict[str, Any], data: Any):
-        """Cache response with TTL"""
+    def get_or_compute(self, endpoint: str, params: Dict[str, Any],
+                       loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value, or compute it once for all concurrent callers
+        
+        The first caller to miss runs `loader`; callers arriving while it runs
+        wait for and share its result instead of recomputing. None results are
+        returned to every waiter but not cached.
+        """
         key = self._get_cache_key(endpoint, params)
-        self._cache[key] = {
-            'data': data,
-            'expires_at': time.time() + self.ttl_seconds
-        }
+        with self._lock:
+            data = self._get_locked(key)
+            if data is not None:
+                return data
+            flight = self._inflight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._inflight[key] = _Flight()
+        
+        if not is_leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        
+        try:
+            flight.result = loader()
+            if flight.result is not None:
+                self.set(endpoint, params, flight.result)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
     
     def clear(self):
         """Clear all cached data"""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
     
     def clean_expired(self):
         """Remove expired entries"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, value in self._cache.items()
-            if current_time >= value['expires_at']
-        ]
-        for key in expired_keys:
-            del self._cache[key]
+        current_time = now()
+        with self._lock:
+            expired_keys = [
+                key for key, (expires_at, _) in self._cache.items()
+                if current_time >= expires_at
+            ]
+            for key in expired_keys:
+                self._cache.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and hit ratio since startup"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._cache),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
+    
+    def start_sweeper(self, stats_log_interval_seconds: int = 600):
+        """Periodically drop expired entries and log hit ratio from a daemon thread"""
+        sweep_interval = max(1, self.ttl_seconds / 5)
+        
+        def sweep():
+            last_stats_log = now()
+            while True:
+                time.sleep(sweep_interval)
+                self.clean_expired()
+                if now() - last_stats_log >= stats_log_interval_seconds:
+                    logger.info(f"Run Coach cache stats: {self.stats()}")
+                    last_stats_log = now()
+        
+        threading.Thread(target=sweep, daemon=True, name='run-coach-cache-sweeper').start()
 
 # Global cache instance
-cache = CacheManager(ttl_seconds=300)  # 5 minutes cache
\ No newline at end of file
+cache = CacheManager(ttl_seconds=300)  # 5 minutes cache
+cache.start_sweeper()
@@ -3,8 +3,9 @@ Personalized health risk assessment for outdoor activities
 """
 
 import numpy as np
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import date as date_cls, datetime
+from functools import lru_cache
 import logging
 
 from ..models import UserProfile, PollutantData
@@ -12,6 +13,11 @@ from ..models import UserProfile, PollutantData
 logger = logging.getLogger(__name__)
 
 
+def _today_ord() -> int:
+    """Today's local date as a proleptic Gregorian ordinal day number"""
+    return date_cls.today().toordinal()
+
+
 class HealthRiskCalculator:
     """
     Calculate personalized health risk thresholds and exposure budgets
@@ -49,7 +55,69 @@ class HealthRiskCalculator:
         '65+': 0.7
     }
     
+    # Integer-coded lookup tables for the multipliers above; the extra last
+    # age slot holds the 0.9 default for unknown age groups
+    _CONDITION_INDEX = {condition: i for i, condition in enumerate(CONDITION_MULTIPLIERS)}
+    _CONDITION_TABLE = np.array(list(CONDITION_MULTIPLIERS.values()))
+    _AGE_INDEX = {age_group: i for i, age_group in enumerate(AGE_MULTIPLIERS)}
+    _AGE_TABLE = np.array(list(AGE_MULTIPLIERS.values()) + [0.9])
+    
+    # AQI bands as fractions of the personal threshold; an AQI falls in band i
+    # when it is below bounds[i] * threshold (and not below any earlier bound)
+    _STATUS_BOUNDS = np.array([0.5, 0.75, 1.0, 1.5])
+    _STATUS_TABLE = (
+        ('excellent', 'Perfect conditions for outdoor exercise'),
+        ('good', 'Good conditions for outdoor activities'),
+        ('moderate', 'Consider shorter duration or reduced intensity'),
+        ('poor', 'Limit outdoor activity, consider indoor alternatives'),
+        ('hazardous', 'Avoid outdoor exercise, stay indoors')
+    )
+    
+    _RUNNING_BOUNDS = np.array([0.5, 0.75, 1.0])
+    _RUNNING_TABLE = (
+        {'recommended': True, 'intensity': 'normal', 'duration': 'normal',
+         'notes': 'Excellent conditions for running'},
+        {'recommended': True, 'intensity': 'moderate', 'duration': 'normal',
+         'notes': 'Good conditions, stay hydrated'},
+        {'recommended': True, 'intensity': 'easy', 'duration': 'reduced',
+         'notes': 'Run at easy pace, consider shorter route'},
+        {'recommended': False, 'intensity': None, 'duration': None,
+         'notes': 'Consider indoor treadmill or postpone'}
+    )
+    
+    # Cycling typically involves higher ventilation rates (0.85x threshold)
+    _CYCLING_BOUNDS = np.array([0.85 * 0.5, 0.85])
+    _CYCLING_TABLE = (
+        {'recommended': True, 'intensity': 'normal',
+         'notes': 'Great conditions for cycling'},
+        {'recommended': True, 'intensity': 'moderate',
+         'notes': 'Moderate pace recommended, avoid high-traffic areas'},
+        {'recommended': False, 'intensity': None,
+         'notes': 'Indoor cycling recommended'}
+    )
+    
+    # Walking has lower intensity, more tolerant of pollution (1.3x threshold)
+    _WALKING_BOUNDS = np.array([1.3])
+    _WALKING_TABLE = (
+        {'recommended': True, 'duration': 'normal',
+         'notes': 'Walking is fine, choose parks if available'},
+        {'recommended': False, 'duration': None,
+         'notes': 'Limit time outdoors'}
+    )
+    
+    _SPORTS_BOUNDS = np.array([0.6, 1.0])
+    _SPORTS_TABLE = (
+        {'recommended': True, 'notes': 'Good conditions for outdoor sports'},
+        {'recommended': 'limited', 'notes': 'Light activities only, frequent breaks'},
+        {'recommended': False, 'notes': 'Move activities indoors'}
+    )
+    
+    # Initial per-user history capacity; arrays double when full
+    HISTORY_INITIAL_CAPACITY = 16
+    
     def __init__(self):
+        # user_id -> {'dates': int64 ordinal days (sorted), 'exp': float64 exposure,
+        #             'cum': running total of 'exp', 'size': used length}
         self.exposure_history = {}
         
     def calculate_personal_threshold(
@@ -67,74 +135,143 @@ class HealthRiskCalculator:
         Returns:
             Personalized AQI threshold
         """
+        return self._personal_threshold(
+            frozenset(user_profile.health_conditions),
+            user_profile.age_group,
+            user_profile.vo2_max_estimate,
+            user_profile.resting_hr,
+            user_profile.avg_hrv,
+            activity_level
+        )
+        
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _personal_threshold(
+        cls,
+        health_conditions: frozenset,
+        age_group: str,
+        vo2_max_estimate: Optional[float],
+        resting_hr: Optional[int],
+        avg_hrv: Optional[float],
+        activity_level: str
+    ) -> float:
+        """Threshold computation, memoized on the profile fields it depends on"""
         # Start with base threshold
-        base_threshold = self.BASE_THRESHOLDS.get(activity_level, 75)
+        base_threshold = cls.BASE_THRESHOLDS.get(activity_level, 75)
         
-        # Apply health condition multipliers
-        condition_multiplier = 1.0
-        for condition in user_profile.health_conditions:
-            if condition in self.CONDITION_MULTIPLIERS:
-                condition_multiplier = min(
-                    condition_multiplier,
-                    self.CONDITION_MULTIPLIERS[condition]
-                )
+        # Apply health condition multipliers (most restrictive condition wins)
+        condition_codes = cls._encode_conditions(health_conditions)
+        condition_multiplier = float(cls._CONDITION_TABLE[condition_codes].min()) if condition_codes.size else 1.0
                 
         # Apply age group multiplier
-        age_multiplier = self.AGE_MULTIPLIERS.get(user_profile.age_group, 0.9)
+        age_multiplier = float(cls._AGE_TABLE[cls._AGE_INDEX.get(age_group, -1)])
         
         # Apply fitness level adjustments
-        fitness_multiplier = self._calculate_fitness_multiplier(user_profile)
+        fitness_multiplier = cls._calculate_fitness_multiplier(vo2_max_estimate, resting_hr)
         
         # Apply HRV-based recovery status
-        hrv_multiplier = self._calculate_hrv_multiplier(user_profile)
+        hrv_multiplier = cls._calculate_hrv_multiplier(avg_hrv)
         
         # Calculate final threshold
         threshold = base_threshold * condition_multiplier * age_multiplier * fitness_multiplier * hrv_multiplier
         
-        logger.info(f"Personal threshold: {threshold:.1f} (base: {base_threshold}, "
-                   f"conditions: {condition_multiplier:.2f}, age: {age_multiplier:.2f}, "
-                   f"fitness: {fitness_multiplier:.2f}, HRV: {hrv_multiplier:.2f})")
+        logger.debug("Personal threshold: %.1f (base: %s, conditions: %.2f, age: %.2f, "
+                     "fitness: %.2f, HRV: %.2f)", threshold, base_threshold, condition_multiplier,
+                     age_multiplier, fitness_multiplier, hrv_multiplier)
                    
         return threshold
         
-    def _calculate_fitness_multiplier(self, user_profile: UserProfile) -> float:
+    def calculate_personal_threshold_batch(
+        self,
+        user_profiles: Sequence[UserProfile],
+        activity_level: str = 'moderate'
+    ) -> np.ndarray:
+        """
+        Calculate personalized AQI thresholds for many users at once
+        
+        Same rules as calculate_personal_threshold, evaluated as array
+        operations across the cohort.
+        
+        Args:
+            user_profiles: User health and fitness profiles
+            activity_level: Activity intensity level
+            
+        Returns:
+            Array of personalized AQI thresholds, aligned with user_profiles
+        """
+        base_threshold = self.BASE_THRESHOLDS.get(activity_level, 75)
+        
+        # Missing (or zero) biometrics become NaN so every comparison below is False
+        vo2 = np.array([p.vo2_max_estimate or np.nan for p in user_profiles], dtype=np.float64)
+        rhr = np.array([p.resting_hr or np.nan for p in user_profiles], dtype=np.float64)
+        hrv = np.array([p.avg_hrv or np.nan for p in user_profiles], dtype=np.float64)
+        age_idx = np.array([self._AGE_INDEX.get(p.age_group, -1) for p in user_profiles], dtype=np.intp)
+        
+        condition_multiplier = np.ones(len(user_profiles))
+        for i, profile in enumerate(user_profiles):
+            codes = self._encode_conditions(profile.health_conditions)
+            if codes.size:
+                condition_multiplier[i] = self._CONDITION_TABLE[codes].min()
+                
+        age_multiplier = self._AGE_TABLE[age_idx]
+        
+        # Fitness adjustments (VO2 max, resting HR), capped like _calculate_fitness_multiplier
+        fitness_multiplier = np.select([vo2 < 35, vo2 > 50], [0.85, 1.15], 1.0)
+        fitness_multiplier *= np.select([rhr > 80, rhr < 55], [0.9, 1.1], 1.0)
+        fitness_multiplier = np.clip(fitness_multiplier, 0.8, 1.3)
+        
+        hrv_multiplier = np.select([hrv < 30, hrv < 50, hrv > 70], [0.85, 0.95, 1.1], 1.0)
+        
+        return base_threshold * condition_multiplier * age_multiplier * fitness_multiplier * hrv_multiplier
+        
+    @classmethod
+    def _encode_conditions(cls, health_conditions) -> np.ndarray:
+        """Map known health conditions to their _CONDITION_TABLE indices"""
+        return np.fromiter(
+            (cls._CONDITION_INDEX[c] for c in health_conditions if c in cls._CONDITION_INDEX),
+            dtype=np.int8
+        )
+        
+    @staticmethod
+    def _calculate_fitness_multiplier(vo2_max_estimate: Optional[float], resting_hr: Optional[int]) -> float:
         """Calculate fitness-based adjustment factor"""
         
         multiplier = 1.0
         
         # Adjust based on VO2 max estimate
-        if user_profile.vo2_max_estimate:
+        if vo2_max_estimate:
             # Higher VO2 max = better pollution tolerance
             # Average VO2 max ~40, good ~50, excellent ~60
-            if user_profile.vo2_max_estimate < 35:
+            if vo2_max_estimate < 35:
                 multiplier *= 0.85
-            elif user_profile.vo2_max_estimate > 50:
+            elif vo2_max_estimate > 50:
                 multiplier *= 1.15
-            elif user_profile.vo2_max_estimate > 60:
+            elif vo2_max_estimate > 60:
                 multiplier *= 1.25
                 
         # Adjust based on resting heart rate
-        if user_profile.resting_hr:
+        if resting_hr:
             # Lower resting HR = better fitness
-            if user_profile.resting_hr > 80:
+            if resting_hr > 80:
                 multiplier *= 0.9
-            elif user_profile.resting_hr < 55:
+            elif resting_hr < 55:
                 multiplier *= 1.1
-            elif user_profile.resting_hr < 45:
+            elif resting_hr < 45:
                 multiplier *= 1.2
                 
         # Cap multiplier
         return min(max(multiplier, 0.8), 1.3)
         
-    def _calculate_hrv_multiplier(self, user_profile: UserProfile) -> float:
+    @staticmethod
+    def _calculate_hrv_multiplier(avg_hrv: Optional[float]) -> float:
         """Calculate HRV-based recovery status multiplier"""
         
-        if not user_profile.avg_hrv:
+        if not avg_hrv:
             return 1.0
             
         # HRV varies by individual, use relative values
         # Higher HRV = better recovery
-        hrv = user_profile.avg_hrv
+        hrv = avg_hrv
         
         if hrv < 30:
             return 0.85  # Poor recovery
@@ -188,17 +325,20 @@ class HealthRiskCalculator:
     def _calculate_recent_exposure(self, user_id: str, days: int) -> float:
         """Calculate cumulative exposure over recent days"""
         
-        if user_id not in self.exposure_history:
+        history = self.exposure_history.get(user_id)
+        if history is None:
             return 0.0
             
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_exposure = 0.0
+        size = history['size']
+        cutoff_ord = _today_ord() - days
         
-        for date, exposure in self.exposure_history[user_id].items():
-            if date >= cutoff_date:
-                recent_exposure += exposure
-                
-        return recent_exposure
+        # Days after the cutoff day form a contiguous tail of the sorted array,
+        # so their sum is the difference of two prefix totals
+        start = int(np.searchsorted(history['dates'][:size], cutoff_ord, side='right'))
+        if start >= size:
+            return 0.0
+        before = history['cum'][start - 1] if start > 0 else 0.0
+        return float(history['cum'][size - 1] - before)
         
     def update_exposure_history(
         self, 
@@ -208,18 +348,47 @@ class HealthRiskCalculator:
     ):
         """Update user's exposure history"""
         
-        if date is None:
-            date = datetime.now()
-            
-        if user_id not in self.exposure_history:
-            self.exposure_history[user_id] = {}
+        history = self.exposure_history.get(user_id)
+        if history is None:
+            history = self.exposure_history[user_id] = {
+                'dates': np.empty(self.HISTORY_INITIAL_CAPACITY, dtype=np.int64),
+                'exp': np.empty(self.HISTORY_INITIAL_CAPACITY, dtype=np.float64),
+                'cum': np.empty(self.HISTORY_INITIAL_CAPACITY, dtype=np.float64),
+                'size': 0
+            }
             
-        # Store by date
-        date_key = date.date()
-        if date_key in self.exposure_history[user_id]:
-            self.exposure_history[user_id][date_key] += exposure_score
+        # Store by ordinal day
+        day = _today_ord() if date is None else date.toordinal()
+        size = history['size']
+        
+        # Updates almost always land on the newest day (or a new one after it),
+        # so check the tail before binary searching
+        if size == 0 or day > history['dates'][size - 1]:
+            idx = size
+        elif day == history['dates'][size - 1]:
+            idx = size - 1
         else:
-            self.exposure_history[user_id][date_key] = exposure_score
+            idx = int(np.searchsorted(history['dates'][:size], day))
+        
+        if idx < size and history['dates'][idx] == day:
+            history['exp'][idx] += exposure_score
+            history['cum'][idx:size] += exposure_score
+            return
+            
+        if size == len(history['dates']):
+            # Geometric growth keeps inserts amortized O(1) reallocations
+            history['dates'] = np.concatenate([history['dates'], np.empty(size, dtype=np.int64)])
+            history['exp'] = np.concatenate([history['exp'], np.empty(size, dtype=np.float64)])
+            history['cum'] = np.concatenate([history['cum'], np.empty(size, dtype=np.float64)])
+            
+        # Shift later days right to keep the arrays sorted
+        history['dates'][idx + 1:size + 1] = history['dates'][idx:size]
+        history['exp'][idx + 1:size + 1] = history['exp'][idx:size]
+        history['cum'][idx + 1:size + 1] = history['cum'][idx:size] + exposure_score
+        history['dates'][idx] = day
+        history['exp'][idx] = exposure_score
+        history['cum'][idx] = (history['cum'][idx - 1] if idx > 0 else 0.0) + exposure_score
+        history['size'] = size + 1
             
     def get_activity_recommendations(
         self,
@@ -242,21 +411,9 @@ class HealthRiskCalculator:
         recommendations = {}
         
         # Current conditions
-        if current_aqi < threshold * 0.5:
-            current_status = "excellent"
-            current_advice = "Perfect conditions for outdoor exercise"
-        elif current_aqi < threshold * 0.75:
-            current_status = "good"
-            current_advice = "Good conditions for outdoor activities"
-        elif current_aqi < threshold:
-            current_status = "moderate"
-            current_advice = "Consider shorter duration or reduced intensity"
-        elif current_aqi < threshold * 1.5:
-            current_status = "poor"
-            current_advice = "Limit outdoor activity, consider indoor alternatives"
-        else:
-            current_status = "hazardous"
-            current_advice = "Avoid outdoor exercise, stay indoors"
+        current_status, current_advice = self._STATUS_TABLE[
+            self._aqi_band(self._STATUS_BOUNDS, current_aqi, threshold)
+        ]
             
         recommendations['current'] = {
             'status': current_status,
@@ -289,127 +446,59 @@ class HealthRiskCalculator:
     ) -> List[Dict]:
         """Find time windows with AQI below threshold"""
         
-        windows = []
-        start_idx = None
-        
-        for i, aqi in enumerate(forecast_aqi):
-            if aqi < threshold:
-                if start_idx is None:
-                    start_idx = i
-            else:
-                if start_idx is not None and (i - start_idx) >= min_duration_hours:
-                    windows.append({
-                        'start_hour': start_idx,
-                        'end_hour': i,
-                        'duration_hours': i - start_idx,
-                        'avg_aqi': np.mean(forecast_aqi[start_idx:i]),
-                        'quality': 'good' if np.mean(forecast_aqi[start_idx:i]) < threshold * 0.75 else 'moderate'
-                    })
-                start_idx = None
-                
-        # Check last window
-        if start_idx is not None and (len(forecast_aqi) - start_idx) >= min_duration_hours:
-            windows.append({
-                'start_hour': start_idx,
-                'end_hour': len(forecast_aqi),
-                'duration_hours': len(forecast_aqi) - start_idx,
-                'avg_aqi': np.mean(forecast_aqi[start_idx:]),
-                'quality': 'good' if np.mean(forecast_aqi[start_idx:]) < threshold * 0.75 else 'moderate'
-            })
+        arr = np.asarray(forecast_aqi, dtype=np.float64)
+        if arr.size == 0:
+            return []
+            
+        # Run-length encode the below-threshold mask: +1 edges open a window, -1 edges close it
+        below = (arr < threshold).astype(np.int8)
+        edges = np.diff(np.concatenate(([0], below, [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        
+        durations = ends - starts
+        keep = durations >= min_duration_hours
+        starts, ends, durations = starts[keep], ends[keep], durations[keep]
+        if starts.size == 0:
+            return []
             
-        return windows
+        # Window means from one running sum: sum(arr[a:b]) == cum[b] - cum[a]
+        cum = np.concatenate(([0.0], np.cumsum(arr)))
+        avg_aqi = (cum[ends] - cum[starts]) / durations
+            
+        return [
+            {
+                'start_hour': int(start),
+                'end_hour': int(end),
+                'duration_hours': int(duration),
+                'avg_aqi': float(avg),
+                'quality': 'good' if avg < threshold * 0.75 else 'moderate'
+            }
+            for start, end, duration, avg in zip(starts, ends, durations, avg_aqi)
+        ]
+        
+    @staticmethod
+    def _aqi_band(bounds: np.ndarray, aqi, threshold: float):
+        """
+        Index of the AQI band for a scalar AQI or an array of AQIs (e.g. an hourly forecast)
+        
+        Returns an int for scalar input and an int array otherwise.
+        """
+        band = np.searchsorted(bounds * threshold, aqi, side='right')
+        return int(band) if np.ndim(band) == 0 else band
         
     def _get_running_recommendation(self, aqi: float, threshold: float, user_profile: UserProfile) -> Dict:
         """Get running-specific recommendations"""
-        
-        if aqi < threshold * 0.5:
-            return {
-                'recommended': True,
-                'intensity': 'normal',
-                'duration': 'normal',
-                'notes': 'Excellent conditions for running'
-            }
-        elif aqi < threshold * 0.75:
-            return {
-                'recommended': True,
-                'intensity': 'moderate',
-                'duration': 'normal',
-                'notes': 'Good conditions, stay hydrated'
-            }
-        elif aqi < threshold:
-            return {
-                'recommended': True,
-                'intensity': 'easy',
-                'duration': 'reduced',
-                'notes': 'Run at easy pace, consider shorter route'
-            }
-        else:
-            return {
-                'recommended': False,
-                'intensity': None,
-                'duration': None,
-                'notes': 'Consider indoor treadmill or postpone'
-            }
+        return dict(self._RUNNING_TABLE[self._aqi_band(self._RUNNING_BOUNDS, aqi, threshold)])
             
     def _get_cycling_recommendation(self, aqi: float, threshold: float, user_profile: UserProfile) -> Dict:
         """Get cycling-specific recommendations"""
-        
-        # Cycling typically involves higher ventilation rates
-        adjusted_threshold = threshold * 0.85
-        
-        if aqi < adjusted_threshold * 0.5:
-            return {
-                'recommended': True,
-                'intensity': 'normal',
-                'notes': 'Great conditions for cycling'
-            }
-        elif aqi < adjusted_threshold:
-            return {
-                'recommended': True,
-                'intensity': 'moderate',
-                'notes': 'Moderate pace recommended, avoid high-traffic areas'
-            }
-        else:
-            return {
-                'recommended': False,
-                'intensity': None,
-                'notes': 'Indoor cycling recommended'
-            }
+        return dict(self._CYCLING_TABLE[self._aqi_band(self._CYCLING_BOUNDS, aqi, threshold)])
             
     def _get_walking_recommendation(self, aqi: float, threshold: float, user_profile: UserProfile) -> Dict:
         """Get walking-specific recommendations"""
-        
-        # Walking has lower intensity, more tolerant of pollution
-        adjusted_threshold = threshold * 1.3
-        
-        if aqi < adjusted_threshold:
-            return {
-                'recommended': True,
-                'duration': 'normal',
-                'notes': 'Walking is fine, choose parks if available'
-            }
-        else:
-            return {
-                'recommended': False,
-                'duration': None,
-                'notes': 'Limit time outdoors'
-            }
+        return dict(self._WALKING_TABLE[self._aqi_band(self._WALKING_BOUNDS, aqi, threshold)])
             
     def _get_sports_recommendation(self, aqi: float, threshold: float, user_profile: UserProfile) -> Dict:
         """Get outdoor sports recommendations"""
-        
-        if aqi < threshold * 0.6:
-            return {
-                'recommended': True,
-                'notes': 'Good conditions for outdoor sports'
-            }
-        elif aqi < threshold:
-            return {
-                'recommended': 'limited',
-                'notes': 'Light activities only, frequent breaks'
-            }
-        else:
-            return {
-                'recommended': False,
-                'notes': 'Move activities indoors'
-            }
\ No newline at end of file
+        return dict(self._SPORTS_TABLE[self._aqi_band(self._SPORTS_BOUNDS, aqi, threshold)])
@@ -6,6 +6,7 @@ import numpy as np
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 import logging
+from numba import njit, prange
 
 from ..models import (
     UserProfile, RunningPreferences, RouteRecommendation, 
@@ -15,6 +16,95 @@ from .pollution_grid import PollutionGrid
 
 logger = logging.getLogger(__name__)
 
+# Fixed layout of each route's objective vector (all minimized)
+OBJECTIVE_ORDER = ('exposure', 'distance_error', 'elevation_penalty', 'green_space', 'safety')
+EXPOSURE, DISTANCE_ERROR, ELEVATION_PENALTY, GREEN_SPACE, SAFETY = range(len(OBJECTIVE_ORDER))
+
+# Baseline preference weights, aligned with OBJECTIVE_ORDER
+DEFAULT_WEIGHTS = np.array([1.0, 0.5, 0.3, 0.4, 0.5])
+
+
+def _build_weight_lut() -> Tuple[np.ndarray, ...]:
+    """
+    Precompute every personalized weight vector, indexed by the bitmask
+    (sensitive << 3) | (allergies << 2) | (avoid_traffic << 1) | prioritize_parks
+    """
+    lut = []
+    for mask in range(16):
+        weights = DEFAULT_WEIGHTS.copy()
+        
+        # Increase exposure weight for sensitive users (asthma/COPD)
+        if mask & 0b1000:
+            weights[EXPOSURE] = 2.0
+            
+        # Increase green space weight for allergy sufferers
+        if mask & 0b0100:
+            weights[GREEN_SPACE] = 0.8
+            
+        # Adjust based on preferences
+        if mask & 0b0010:
+            weights[SAFETY] = 0.8
+            
+        if mask & 0b0001:
+            weights[GREEN_SPACE] = 0.9
+            
+        # Shared across requests, so guard against in-place edits
+        weights.flags.writeable = False
+        lut.append(weights)
+    return tuple(lut)
+
+
+_WEIGHT_LUT = _build_weight_lut()
+
+# Below this many candidates the pairwise check beats building the broadcast matrix
+PARETO_BROADCAST_MIN_ROUTES = 8
+_OBJECTIVE_BITS = 1 << np.arange(len(OBJECTIVE_ORDER))
+
+# From this many candidates the (n, n, k) broadcast gets memory-bound; switch to
+# the parallel kernel, which needs no intermediate matrices
+PARETO_PARALLEL_MIN_ROUTES = 200
+
+
+@njit(parallel=True, cache=True)
+def _pareto_mask(A):
+    """Boolean mask of rows of A (n routes x k objectives) that no other row dominates"""
+    n, k = A.shape
+    dominated = np.zeros(n, dtype=np.bool_)
+    # Each outer iteration writes only dominated[i], so iterations don't race
+    for i in prange(n):
+        for j in range(n):
+            if i == j:
+                continue
+            j_better = False
+            j_worse = False
+            for t in range(k):
+                if A[j, t] < A[i, t]:
+                    j_better = True
+                elif A[j, t] > A[i, t]:
+                    j_worse = True
+                    break
+            if j_better and not j_worse:
+                dominated[i] = True
+                break
+    return ~dominated
+
+
+def _accumulate_exposure_py(aqi, pm25):
+    """Integer sum of 10x the per-segment PM2.5/AQI exposure weight"""
+    total = 0
+    for i in range(aqi.size):
+        # Using PM2.5 as primary metric with AQI weighting (0.7 / 0.3, scaled by 10)
+        total += pm25[i] * 7 + aqi[i] * 3
+    return total
+
+
+try:
+    # Ahead-of-time build (python -m run_coach.core.build_kernels) skips the
+    # JIT compile on the first request of a fresh worker
+    from ._aot_kernels import accumulate_exposure as _accumulate_exposure
+except ImportError:
+    _accumulate_exposure = njit(cache=True)(_accumulate_exposure_py)
+
 
 class RunCoachOptimizer:
     """
@@ -49,18 +139,17 @@ class RunCoachOptimizer:
         Returns:
             Optimal route recommendation
         """
-        logger.info(f"Optimizing route from {start_point} with {len(candidate_routes)} candidates")
+        logger.info("Optimizing route from %s with %d candidates", start_point, len(candidate_routes))
         
         # Calculate objectives for each route
         evaluated_routes = []
         for route in candidate_routes:
-            objectives = self._calculate_objectives(route, user_profile, preferences)
-            route['objectives'] = objectives
+            route['objectives'] = self._calculate_objectives(route, user_profile, preferences)
             evaluated_routes.append(route)
             
         # Find Pareto optimal solutions
         pareto_front = self._find_pareto_optimal_routes(evaluated_routes)
-        logger.info(f"Found {len(pareto_front)} Pareto optimal routes")
+        logger.info("Found %d Pareto optimal routes", len(pareto_front))
         
         # Rank solutions based on user preferences
         best_route = self._rank_by_preferences(pareto_front, user_profile, preferences)
@@ -75,8 +164,8 @@ class RunCoachOptimizer:
         route: Dict,
         user_profile: UserProfile,
         preferences: RunningPreferences
-    ) -> Dict[str, float]:
-        """Calculate multiple objective values for a route"""
+    ) -> np.ndarray:
+        """Calculate multiple objective values for a route, laid out as OBJECTIVE_ORDER"""
         
         # Extract route geometry
         waypoints = route['geometry']
@@ -96,13 +185,13 @@ class RunCoachOptimizer:
         # 5. Safety Score (maximize -> minimize negative)
         safety_score = -route.get('safety_score', 0.5)
         
-        return {
-            'exposure': exposure_score,
-            'distance_error': distance_error,
-            'elevation_penalty': elevation_penalty,
-            'green_space': green_score,
-            'safety': safety_score
-        }
+        return np.array([
+            exposure_score,
+            distance_error,
+            elevation_penalty,
+            green_score,
+            safety_score
+        ], dtype=np.float64)
         
     def _calculate_exposure_score(self, waypoints: List[Tuple[float, float]], duration_min: float) -> float:
         """
@@ -111,7 +200,6 @@ class RunCoachOptimizer:
         Uses time-weighted integration of pollutant concentrations
         accounting for increased breathing rate during exercise
         """
-        total_exposure = 0.0
         num_points = len(waypoints)
         
         if num_points < 2:
@@ -123,21 +211,13 @@ class RunCoachOptimizer:
         # Exercise ventilation multiplier (2.5x resting rate for moderate pace)
         ventilation_multiplier = 2.5
         
-        for i in range(num_points - 1):
-            # Get pollution data at midpoint
-            midpoint = (
-                (waypoints[i][0] + waypoints[i+1][0]) / 2,
-                (waypoints[i][1] + waypoints[i+1][1]) / 2
-            )
-            
-            # Get interpolated pollution values
-            aqi = self.pollution_grid.get_aqi_at_point(midpoint)
-            pm25 = self.pollution_grid.get_pm25_at_point(midpoint)
-            
-            # Calculate exposure for this segment
-            # Using PM2.5 as primary metric with AQI weighting
-            segment_exposure = (pm25 * 0.7 + aqi * 0.3) * time_per_segment * ventilation_multiplier
-            total_exposure += segment_exposure
+        # Get interpolated pollution values at every segment midpoint in one query,
+        # quantized to int16 so the integration streams 2-byte values
+        wp = np.asarray(waypoints, dtype=np.float64)
+        midpoints = 0.5 * (wp[:-1] + wp[1:])
+        aqi, pm25 = self.pollution_grid.get_aqi_pm25_batch(midpoints, dtype=np.int16)
+        
+        total_exposure = float(_accumulate_exposure(aqi, pm25)) * 0.1 * time_per_segment * ventilation_multiplier
             
         # Normalize by duration to get exposure rate
         exposure_rate = total_exposure / duration_min
@@ -151,38 +231,35 @@ class RunCoachOptimizer:
         A solution dominates another if it's better in at least one objective
         and not worse in any other objective
         """
-        n = len(routes)
-        if n == 0:
+        if not routes:
             return []
             
-        # Track domination counts
-        domination_count = [0] * n
-        dominated_by = [[] for _ in range(n)]
-        
-        # Compare all pairs
-        for i in range(n):
-            for j in range(i + 1, n):
-                dominance = self._check_dominance(
-                    routes[i]['objectives'],
-                    routes[j]['objectives']
-                )
-                
-                if dominance == 1:  # i dominates j
-                    dominated_by[i].append(j)
-                    domination_count[j] += 1
-                elif dominance == -1:  # j dominates i
-                    dominated_by[j].append(i)
-                    domination_count[i] += 1
-                    
-        # Extract Pareto front (non-dominated solutions)
-        pareto_front = []
-        for i in range(n):
-            if domination_count[i] == 0:
-                pareto_front.append(routes[i])
-                
-        return pareto_front
-        
-    def _check_dominance(self, obj1: Dict[str, float], obj2: Dict[str, float]) -> int:
+        n = len(routes)
+        if n < PARETO_BROADCAST_MIN_ROUTES:
+            domination_count = [0] * n
+            for i in range(n):
+                for j in range(i + 1, n):
+                    dominance = self._check_dominance(routes[i]['objectives'], routes[j]['objectives'])
+                    if dominance == 1:  # i dominates j
+                        domination_count[j] += 1
+                    elif dominance == -1:  # j dominates i
+                        domination_count[i] += 1
+            return [route for route, count in zip(routes, domination_count) if count == 0]
+            
+        # (n, k) objective matrix; dominates[i, j] is True when route i dominates route j
+        A = np.stack([r['objectives'] for r in routes])
+        if n >= PARETO_PARALLEL_MIN_ROUTES:
+            return [routes[i] for i in np.flatnonzero(_pareto_mask(A))]
+            
+        no_worse = (A[:, None, :] <= A[None, :, :]).all(axis=2)
+        better = (A[:, None, :] < A[None, :, :]).any(axis=2)
+        dominates = no_worse & better
+        
+        # Extract Pareto front (solutions no other route dominates)
+        domination_count = dominates.sum(axis=0)
+        return [routes[i] for i in np.flatnonzero(domination_count == 0)]
+        
+    def _check_dominance(self, obj1: np.ndarray, obj2: np.ndarray) -> int:
         """
         Check dominance relationship between two objective vectors
         
@@ -191,21 +268,12 @@ class RunCoachOptimizer:
             -1 if obj2 dominates obj1
             0 if neither dominates
         """
-        better_in_any = False
-        worse_in_any = False
-        
-        for key in obj1:
-            if obj1[key] < obj2[key]:
-                better_in_any = True
-            elif obj1[key] > obj2[key]:
-                worse_in_any = True
-                
-        if better_in_any and not worse_in_any:
-            return 1
-        elif worse_in_any and not better_in_any:
-            return -1
-        else:
-            return 0
+        # One bit per objective where obj1 is better / worse
+        diff = obj1 - obj2
+        better = int(_OBJECTIVE_BITS @ (diff < 0))
+        worse = int(_OBJECTIVE_BITS @ (diff > 0))
+        
+        return (better != 0 and worse == 0) - (worse != 0 and better == 0)
             
     def _rank_by_preferences(
         self, 
@@ -224,74 +292,52 @@ class RunCoachOptimizer:
         # Define preference weights based on user profile
         weights = self._get_preference_weights(user_profile, preferences)
         
-        best_score = float('inf')
-        best_route = None
-        
-        for route in pareto_front:
-            # Calculate weighted score
-            score = 0
-            for obj_name, obj_value in route['objectives'].items():
-                score += weights.get(obj_name, 1.0) * abs(obj_value)
-                
-            if score < best_score:
-                best_score = score
-                best_route = route
-                
-        return best_route
+        # Weighted score of every route in one matrix-vector product
+        obj_mat = np.stack([route['objectives'] for route in pareto_front])
+        scores = np.abs(obj_mat) @ weights
+        
+        return pareto_front[int(np.argmin(scores))]
         
     def _get_preference_weights(
         self,
         user_profile: UserProfile,
         preferences: RunningPreferences
-    ) -> Dict[str, float]:
-        """Get personalized objective weights based on user profile"""
-        
-        weights = {
-            'exposure': 1.0,
-            'distance_error': 0.5,
-            'elevation_penalty': 0.3,
-            'green_space': 0.4,
-            'safety': 0.5
-        }
-        
-        # Increase exposure weight for sensitive users
-        if user_profile.has_asthma or user_profile.has_copd:
-            weights['exposure'] = 2.0
-            
-        # Increase green space weight for allergy sufferers
-        if user_profile.has_allergies:
-            weights['green_space'] = 0.8
-            
-        # Adjust based on preferences
-        if preferences.avoid_traffic:
-            weights['safety'] = 0.8
-            
-        if preferences.prioritize_parks:
-            weights['green_space'] = 0.9
-            
-        return weights
+    ) -> np.ndarray:
+        """Get personalized objective weights (aligned with OBJECTIVE_ORDER) based on user profile"""
+        
+        mask = (
+            (user_profile.has_asthma or user_profile.has_copd) << 3 |
+            user_profile.has_allergies << 2 |
+            bool(preferences.avoid_traffic) << 1 |
+            bool(preferences.prioritize_parks)
+        )
+        return _WEIGHT_LUT[mask]
         
     def _create_recommendation(self, route: Dict, user_profile: UserProfile) -> RouteRecommendation:
         """Convert optimized route to RouteRecommendation format"""
         
         # Create route segments with pollution data
-        segments = []
         waypoints = route['geometry']
+        objectives = route['objectives']
         
-        for i in range(len(waypoints) - 1):
-            segment = RouteSegment(
+        # One batched grid query, distance pass and pace classification for all segments
+        distances = self._calculate_segment_distances(waypoints).tolist()
+        aqi_all, pm25_all = self.pollution_grid.get_aqi_pm25_batch(waypoints[:-1])
+        paces = self._get_recommended_paces(aqi_all, user_profile)
+        aqi_all, pm25_all = aqi_all.tolist(), pm25_all.tolist()
+        
+        segments = [
+            RouteSegment(
                 start_point=waypoints[i],
                 end_point=waypoints[i+1],
-                distance_m=self._calculate_segment_distance(waypoints[i], waypoints[i+1]),
-                aqi=self.pollution_grid.get_aqi_at_point(waypoints[i]),
-                pm25=self.pollution_grid.get_pm25_at_point(waypoints[i]),
+                distance_m=distances[i],
+                aqi=aqi_all[i],
+                pm25=pm25_all[i],
                 elevation_change_m=0,  # TODO: Get from elevation API
-                recommended_pace=self._get_recommended_pace(
-                    self.pollution_grid.get_aqi_at_point(waypoints[i]),
-                    user_profile
-                )
+                recommended_pace=paces[i]
             )
-            segments.append(segment)
+            for i in range(len(waypoints) - 1)
+        ]
             
         return RouteRecommendation(
             route_id=route.get('route_id', 'generated'),
@@ -300,34 +346,37 @@ class RunCoachOptimizer:
             segments=segments,
             total_distance_m=route['distance_m'],
             duration_min=route['duration_min'],
-            avg_aqi=route['objectives']['exposure'] / 2.5,  # Rough conversion
+            avg_aqi=float(objectives[EXPOSURE]) / 2.5,  # Rough conversion
             max_aqi=max(s.aqi for s in segments),
-            exposure_score=route['objectives']['exposure'],
+            exposure_score=float(objectives[EXPOSURE]),
             elevation_gain_m=route.get('elevation_gain_m', 0),
-            green_coverage=abs(route['objectives']['green_space']),
-            safety_score=abs(route['objectives']['safety'])
+            green_coverage=abs(float(objectives[GREEN_SPACE])),
+            safety_score=abs(float(objectives[SAFETY]))
         )
         
-    def _calculate_segment_distance(self, point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
-        """Calculate distance between two points using Haversine formula"""
-        from math import radians, cos, sin, asin, sqrt
+    def _calculate_segment_distances(self, waypoints: List[Tuple[float, float]]) -> np.ndarray:
+        """Calculate distances between consecutive waypoints using Haversine formula"""
         
         # Radius of Earth in meters
         R = 6371000
         
-        lat1, lon1 = radians(point1[0]), radians(point1[1])
-        lat2, lon2 = radians(point2[0]), radians(point2[1])
+        wp = np.radians(np.asarray(waypoints, dtype=np.float64).reshape(-1, 2))
+        lat1, lon1 = wp[:-1, 0], wp[:-1, 1]
+        lat2, lon2 = wp[1:, 0], wp[1:, 1]
         
         dlat = lat2 - lat1
         dlon = lon2 - lon1
         
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
+        a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+        c = 2 * np.arcsin(np.sqrt(a))
         
         return R * c
         
-    def _get_recommended_pace(self, aqi: float, user_profile: UserProfile) -> str:
-        """Get recommended pace based on AQI and user sensitivity"""
+    # Pace for AQI at or below 0.7x / above 0.7x / above 1x the pace threshold
+    _PACE_TABLE = ("moderate", "easy", "walk")
+    
+    def _get_recommended_paces(self, aqi: np.ndarray, user_profile: UserProfile) -> List[str]:
+        """Get recommended pace for each segment AQI based on user sensitivity"""
         
         # Adjust threshold based on user conditions
         threshold = 100
@@ -336,9 +385,5 @@ class RunCoachOptimizer:
         if user_profile.has_copd:
             threshold *= 0.5
             
-        if aqi > threshold:
-            return "walk"
-        elif aqi > threshold * 0.7:
-            return "easy"
-        else:
-            return "moderate"
\ No newline at end of file
+        bands = np.searchsorted([threshold * 0.7, threshold], aqi, side='left')
+        return [self._PACE_TABLE[band] for band in bands.tolist()]
@@ -2,18 +2,48 @@
 Spatiotemporal pollution grid using Gaussian Process Regression
 """
 
+import hashlib
 import numpy as np
 from typing import List, Tuple, Dict, Optional
 from datetime import datetime
 import logging
+from numba import njit, prange
 from sklearn.gaussian_process import GaussianProcessRegressor
 from sklearn.gaussian_process.kernels import Matern, WhiteKernel
-from scipy.interpolate import griddata
+from scipy import ndimage
+from scipy.interpolate import griddata, RegularGridInterpolator
+from scipy.spatial import cKDTree, Delaunay
 
 from ..models import PollutantData
 
 logger = logging.getLogger(__name__)
 
+# Storage dtype for interpolated pollutant and uncertainty grids: values are
+# bounded (AQI 0-500) and sensors are ~1% accurate, so float32 loses nothing
+GRID_DTYPE = np.float32
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _idw(grid_xy, src_xy, src_v, power, out):
+    """Inverse distance weighted interpolation of src_v onto grid_xy, written into out"""
+    half_power = power / 2.0
+    for i in prange(grid_xy.shape[0]):
+        weighted_sum = 0.0
+        weight_total = 0.0
+        exact = -1
+        for j in range(src_xy.shape[0]):
+            dx = grid_xy[i, 0] - src_xy[j, 0]
+            dy = grid_xy[i, 1] - src_xy[j, 1]
+            d2 = dx * dx + dy * dy
+            if d2 == 0.0:
+                exact = j
+                break
+            # 1 / d**power without the sqrt
+            w = 1.0 / d2 ** half_power
+            weighted_sum += w * src_v[j]
+            weight_total += w
+        out[i] = src_v[exact] if exact >= 0 else weighted_sum / weight_total
+
 
 class PollutionGrid:
     """
@@ -31,6 +61,23 @@ class PollutionGrid:
         self.resolution = resolution_meters
         self.grid_bounds = None
         self.grid_points = None
+        # KD-tree over grid_points projected to meters (see _to_m), rebuilt with the grid
+        self._kdtree = None
+        # Local tangent-plane projection: grid origin (lat, lon) and meters per degree
+        self._origin = None
+        self._m_per_deg = None
+        # 1D latitude/longitude coordinates and (n_lat, n_lon) of the current grid,
+        # set by _create_grid_points
+        self.lat_axis = None
+        self.lon_axis = None
+        self.grid_shape = (0, 0)
+        # (sensor location digest, barycentric weights) from the last update, reused
+        # while neither the grid nor the sensor locations change
+        self._barycentric_cache = None
+        # pollutant -> bilinear interpolator over the grid, rebuilt with the grid
+        self._interpolators = {}
+        # (pollutant, last_update) -> heatmap payload, reset on every grid update
+        self._heatmap_cache = {}
         self.pollution_values = {}
         self.uncertainty_values = {}
         self.last_update = None
@@ -62,15 +109,26 @@ class PollutionGrid:
         # Extract bounds if not provided
         if bounds is None:
             bounds = self._calculate_bounds(sensor_data)
-        self.grid_bounds = bounds
-        
-        # Create grid points
-        self.grid_points = self._create_grid_points(bounds)
+            
+        # Grid points and KD-tree depend only on the bounds, so a refresh of the
+        # same area keeps them
+        if self.grid_points is None or bounds != self.grid_bounds:
+            self.grid_bounds = bounds
+            
+            # Create grid points
+            self.grid_points = self._create_grid_points(bounds)
+            # Built once per update but queried for every route segment, so trade build
+            # time for query time: bigger leaves and median splits give a shallower,
+            # tighter tree
+            self._kdtree = cKDTree(self._to_m(self.grid_points), leafsize=32, balanced_tree=True, compact_nodes=True)
+            self._barycentric_cache = None
         
         # Perform interpolation for each pollutant
         self._interpolate_pollutants(sensor_data)
+        self._build_interpolators()
         
         self.last_update = datetime.now()
+        self._heatmap_cache = {}
         logger.info(f"Grid updated successfully with {len(self.grid_points)} points")
         
     def _calculate_bounds(self, sensor_data: List[PollutantData]) -> Dict:
@@ -100,32 +158,66 @@ class PollutionGrid:
         n_lat = int((bounds['max_lat'] - bounds['min_lat']) * lat_meters_per_degree / self.resolution)
         n_lon = int((bounds['max_lon'] - bounds['min_lon']) * lon_meters_per_degree / self.resolution)
         
-        # Create meshgrid
+        # Lat/lon scale factors, reused to project points for Euclidean distance math
+        self._origin = np.array([bounds['min_lat'], bounds['min_lon']])
+        self._m_per_deg = np.array([lat_meters_per_degree, lon_meters_per_degree])
+        
         lat_points = np.linspace(bounds['min_lat'], bounds['max_lat'], n_lat)
         lon_points = np.linspace(bounds['min_lon'], bounds['max_lon'], n_lon)
+        self.lat_axis, self.lon_axis = lat_points, lon_points
+        self.grid_shape = (n_lat, n_lon)
         
-        lon_grid, lat_grid = np.meshgrid(lon_points, lat_points)
-        grid_points = np.column_stack([lat_grid.ravel(), lon_grid.ravel()])
+        # Row-major (lat, lon) pairs written straight from the axes, no meshgrid temporaries
+        i, j = np.divmod(np.arange(n_lat * n_lon), n_lon)
+        grid_points = np.empty((n_lat * n_lon, 2))
+        grid_points[:, 0] = lat_points[i]
+        grid_points[:, 1] = lon_points[j]
         
         return grid_points
         
+    def _to_m(self, points) -> np.ndarray:
+        """
+        Project (lat, lon) degrees onto the grid's local tangent plane in meters
+        
+        An equirectangular projection about the grid origin: over a city-sized grid
+        it makes degree offsets isotropic, so plain Euclidean distance is in meters.
+        Accepts a single (lat, lon) or an (N, 2) array.
+        """
+        return (np.asarray(points, dtype=np.float64) - self._origin) * self._m_per_deg
+        
     def _interpolate_pollutants(self, sensor_data: List[PollutantData]):
         """Perform GP interpolation for each pollutant type"""
         
-        # Prepare training data
-        X_train = np.array([[data.location[0], data.location[1]] for data in sensor_data])
+        # Prepare training data (one pass over the measurements, then column slices)
+        arrays = PollutantData.to_arrays(sensor_data)
+        X_train = np.column_stack([arrays['lat'], arrays['lon']])
         
         # Weight by confidence scores
-        sample_weights = np.array([data.confidence for data in sensor_data])
+        sample_weights = arrays['confidence']
+        
+        # Colocated sensors (e.g. synthetic points on top of provider stations)
+        # collapse to one sample per location: duplicate vertices only slow qhull
+        # down and degrade the triangulation
+        unique_xy, inverse = np.unique(X_train, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
         
         # Interpolate each pollutant
         pollutants = ['aqi', 'pm25', 'pm10', 'o3', 'no2']
         
+        # Triangulation of all sensors + barycentric weights of every grid point,
+        # built once and shared by each pollutant that has no invalid readings.
+        # Time-series refreshes re-send the same sensor locations with new
+        # readings, so the previous update's weights are reused when they match
+        sensor_key = hashlib.blake2b(unique_xy.tobytes(), digest_size=16).digest()
+        barycentric = None
+        if self._barycentric_cache is not None and self._barycentric_cache[0] == sensor_key:
+            barycentric = self._barycentric_cache[1]
+        
         for pollutant in pollutants:
             logger.info(f"Interpolating {pollutant}")
             
             # Extract values
-            y_train = np.array([getattr(data, pollutant) for data in sensor_data])
+            y_train = arrays[pollutant]
             
             # Remove invalid values
             valid_mask = ~np.isnan(y_train) & (y_train >= 0)
@@ -137,54 +229,149 @@ class PollutionGrid:
             y_valid = y_train[valid_mask]
             weights_valid = sample_weights[valid_mask]
             
+            # Fill value and constant uncertainty, shared by every branch below
+            mean_v, std_v = float(y_valid.mean()), float(y_valid.std())
+            
             try:
                 # SIMPLIFIED INTERPOLATION FOR PERFORMANCE
-                # Use scipy's griddata for simple linear interpolation
-                from scipy.interpolate import griddata
-                
                 # Simple linear interpolation instead of GP
-                y_pred = griddata(
-                    X_valid, 
-                    y_valid, 
-                    self.grid_points, 
-                    method='linear',
-                    fill_value=np.mean(y_valid)
-                )
+                if valid_mask.all():
+                    if barycentric is None:
+                        barycentric = self._barycentric_weights(unique_xy)
+                        self._barycentric_cache = (sensor_key, barycentric)
+                    y_unique = self._merge_colocated(inverse, len(unique_xy), y_valid, weights_valid)
+                    y_pred = self._apply_barycentric(barycentric, y_unique, fill_value=mean_v)
+                else:
+                    X_unique, inverse_valid = np.unique(X_valid, axis=0, return_inverse=True)
+                    y_unique = self._merge_colocated(
+                        inverse_valid.ravel(), len(X_unique), y_valid, weights_valid
+                    )
+                    
+                    # Use scipy's griddata for simple linear interpolation
+                    y_pred = griddata(
+                        X_unique, 
+                        y_unique, 
+                        self.grid_points, 
+                        method='linear',
+                        fill_value=mean_v
+                    )
                 
                 # Simple uncertainty estimate (constant)
-                y_std = np.full_like(y_pred, np.std(y_valid))
+                y_std = np.full(len(y_pred), std_v, dtype=GRID_DTYPE)
                 
                 # Store results
-                self.pollution_values[pollutant] = y_pred
+                self.pollution_values[pollutant] = y_pred.astype(GRID_DTYPE)
                 self.uncertainty_values[pollutant] = y_std
                 
             except Exception as e:
                 logger.error(f"Error interpolating {pollutant}: {e}")
                 # Fallback to mean value
-                self.pollution_values[pollutant] = np.full(len(self.grid_points), np.mean(y_valid))
-                self.uncertainty_values[pollutant] = np.full(len(self.grid_points), np.std(y_valid))
+                self.pollution_values[pollutant] = np.full(len(self.grid_points), mean_v, dtype=GRID_DTYPE)
+                self.uncertainty_values[pollutant] = np.full(len(self.grid_points), std_v, dtype=GRID_DTYPE)
                 # Fallback to simple IDW interpolation
                 self._fallback_interpolation(pollutant, X_valid, y_valid)
                 
-    def _fallback_interpolation(self, pollutant: str, points: np.ndarray, values: np.ndarray):
-        """Fallback interpolation using inverse distance weighting"""
+    @staticmethod
+    def _merge_colocated(
+        inverse: np.ndarray,
+        n_unique: int,
+        values: np.ndarray,
+        weights: np.ndarray
+    ) -> np.ndarray:
+        """Confidence-weighted mean of the values sharing each unique location"""
+        weight_sum = np.bincount(inverse, weights=weights, minlength=n_unique)
+        value_sum = np.bincount(inverse, weights=values * weights, minlength=n_unique)
+        
+        # Locations whose readings all have zero confidence fall back to a plain mean
+        counts = np.bincount(inverse, minlength=n_unique)
+        plain_mean = np.bincount(inverse, weights=values, minlength=n_unique) / counts
+        return np.divide(value_sum, weight_sum, out=plain_mean, where=weight_sum > 0)
+        
+    def _barycentric_weights(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Triangulate sensor locations and locate every grid point in the triangulation
+        
+        Returns:
+            (vertices, weights, inside): sensor indices and barycentric weights of each
+            grid point's enclosing triangle, and a mask of grid points inside the hull
+        """
+        tri = Delaunay(points)
+        simplex = tri.find_simplex(self.grid_points)
+        inside = simplex >= 0
+        
+        # Same affine transform LinearNDInterpolator uses (rows outside the hull are masked later)
+        transform = tri.transform[simplex]
+        bary = np.einsum('ijk,ik->ij', transform[:, :2], self.grid_points - transform[:, 2])
+        weights = np.column_stack([bary, 1 - bary.sum(axis=1)])
+        
+        return tri.simplices[simplex], weights, inside
+        
+    def _apply_barycentric(
+        self,
+        barycentric: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        values: np.ndarray,
+        fill_value: float
+    ) -> np.ndarray:
+        """Linearly interpolate sensor values onto the grid with precomputed weights"""
+        vertices, weights, inside = barycentric
+        return np.where(inside, np.einsum('ij,ij->i', values[vertices], weights), fill_value)
+        
+    def _fallback_interpolation(self, pollutant: str, points: np.ndarray, values: np.ndarray, power: float = 2.0):
+        """
+        Fallback interpolation using inverse distance weighting
+        
+        Only replaces the pollutant values; the caller has already stored the
+        constant uncertainty for these readings.
+        """
         
         try:
-            # Use scipy's griddata for simple interpolation
-            interpolated = griddata(
-                points, 
-                values, 
-                self.grid_points,
-                method='linear',
-                fill_value=np.nanmean(values)
+            interpolated = np.empty(len(self.grid_points), dtype=GRID_DTYPE)
+            # Distances in projected meters so a degree of longitude isn't
+            # weighted like a degree of latitude
+            _idw(
+                self._to_m(self.grid_points),
+                self._to_m(points),
+                np.ascontiguousarray(values, dtype=np.float64),
+                power,
+                interpolated
             )
             
             self.pollution_values[pollutant] = interpolated
-            self.uncertainty_values[pollutant] = np.full_like(interpolated, np.std(values))
             
         except Exception as e:
             logger.error(f"Fallback interpolation failed for {pollutant}: {e}")
             
+    def _build_interpolators(self):
+        """Wrap each pollutant's grid in a bilinear interpolator for point queries"""
+        self._interpolators = {}
+        n_lat, n_lon = self.grid_shape
+        
+        # Linear interpolation needs at least two nodes along each axis
+        if n_lat < 2 or n_lon < 2:
+            return
+            
+        for pollutant, values in self.pollution_values.items():
+            if len(values) != n_lat * n_lon:
+                continue
+            self._interpolators[pollutant] = RegularGridInterpolator(
+                (self.lat_axis, self.lon_axis),
+                values.reshape(self.grid_shape),
+                method='linear',
+                bounds_error=False,
+                fill_value=None
+            )
+            
+    def _interpolate_at(self, pollutant: str, points: np.ndarray, workers: int = 1) -> np.ndarray:
+        """Bilinear values at (N, 2) points, nearest grid node if no interpolator exists"""
+        interpolator = self._interpolators.get(pollutant)
+        if interpolator is not None:
+            # Clamp to the grid extent so far-away queries take edge values rather
+            # than unbounded linear extrapolation
+            lat = np.clip(points[:, 0], self.lat_axis[0], self.lat_axis[-1])
+            lon = np.clip(points[:, 1], self.lon_axis[0], self.lon_axis[-1])
+            return interpolator(np.column_stack([lat, lon]))
+        return self.pollution_values[pollutant][self._nearest_grid_indices(points, workers=workers)]
+        
     def get_aqi_at_point(self, location: Tuple[float, float]) -> float:
         """Get interpolated AQI at a specific location"""
         return self._get_value_at_point('aqi', location)
@@ -197,36 +384,93 @@ class PollutionGrid:
         """Get interpolated pollutant value at a specific location"""
         return self._get_value_at_point(pollutant, location)
         
-    def _get_value_at_point(self, pollutant: str, location: Tuple[float, float]) -> float:
-        """Get interpolated value at a specific location"""
+    def _get_value_at_point(self, pollutant: str, location):
+        """
+        Get interpolated value at a specific location
+        
+        Accepts a single (lat, lon) and returns a float, or an (N, 2) array of
+        locations and returns an array of N values.
+        """
         
         if pollutant not in self.pollution_values:
             logger.warning(f"No data available for {pollutant}")
-            return 0.0
+            return 0.0 if np.ndim(location) == 1 else np.zeros(len(location))
             
-        # Find nearest grid point
-        distances = np.sqrt(
-            (self.grid_points[:, 0] - location[0])**2 + 
-            (self.grid_points[:, 1] - location[1])**2
+        points = np.asarray(location, dtype=np.float64)
+        values = self._interpolate_at(pollutant, points.reshape(-1, 2))
+        
+        return float(values[0]) if points.ndim == 1 else values
+        
+    def get_values_along_path(self, pollutant: str, locations: np.ndarray) -> np.ndarray:
+        """Get interpolated values for every (lat, lon) along a path in one vectorized query"""
+        locations = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+        
+        if pollutant not in self.pollution_values:
+            logger.warning(f"No data available for {pollutant}")
+            return np.zeros(len(locations))
+            
+        # Same bilinear result as the point interpolators, but the grid is a
+        # strict linspace so fractional indices are one affine map and the whole
+        # path is sampled in a single C call (needs two nodes along each axis)
+        n_lat, n_lon = self.grid_shape
+        if n_lat < 2 or n_lon < 2 or pollutant not in self._interpolators:
+            return self._interpolate_at(pollutant, locations, workers=-1)
+            
+        row = (locations[:, 0] - self.lat_axis[0]) / (self.lat_axis[1] - self.lat_axis[0])
+        col = (locations[:, 1] - self.lon_axis[0]) / (self.lon_axis[1] - self.lon_axis[0])
+        
+        # mode='nearest' clamps off-grid points to the edge, matching _interpolate_at
+        return ndimage.map_coordinates(
+            self.pollution_values[pollutant].reshape(self.grid_shape),
+            np.vstack([row, col]),
+            order=1,
+            mode='nearest',
+            output=np.float64
         )
-        nearest_idx = np.argmin(distances)
         
-        return float(self.pollution_values[pollutant][nearest_idx])
+    def get_aqi_pm25_batch(
+        self,
+        points: np.ndarray,
+        dtype: Optional[np.dtype] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get bilinear AQI and PM2.5 at many (lat, lon) points, sampled along the
+        path with get_values_along_path
         
-    def get_uncertainty_at_point(self, pollutant: str, location: Tuple[float, float]) -> float:
-        """Get prediction uncertainty at a specific location"""
+        Args:
+            points: (n, 2) array of (lat, lon)
+            dtype: Optional integer dtype (e.g. np.int16) to round and clip values into
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        
+        results = []
+        for pollutant in ('aqi', 'pm25'):
+            values = self.get_values_along_path(pollutant, points)
+            if dtype is not None:
+                # AQI (0-500) and PM2.5 carry no meaningful sub-integer precision
+                values = np.clip(np.rint(values), 0, np.iinfo(dtype).max).astype(dtype)
+            results.append(values)
+        return results[0], results[1]
+        
+    def _nearest_grid_indices(self, points, workers: int = 1):
+        """
+        Index of the nearest grid point for a (lat, lon) or each row of an (N, 2) array
+        
+        workers=-1 spreads a batched query across all cores (worth it for whole paths).
+        """
+        _, nearest_idx = self._kdtree.query(self._to_m(points), k=1, workers=workers)
+        return nearest_idx
+        
+    def get_uncertainty_at_point(self, pollutant: str, location):
+        """Get prediction uncertainty at a specific location (or (N, 2) array of locations)"""
         
         if pollutant not in self.uncertainty_values:
-            return 0.0
+            return 0.0 if np.ndim(location) == 1 else np.zeros(len(location))
             
-        # Find nearest grid point
-        distances = np.sqrt(
-            (self.grid_points[:, 0] - location[0])**2 + 
-            (self.grid_points[:, 1] - location[1])**2
-        )
-        nearest_idx = np.argmin(distances)
+        nearest_idx = self._nearest_grid_indices(location)
+        values = self.uncertainty_values[pollutant][nearest_idx]
         
-        return float(self.uncertainty_values[pollutant][nearest_idx])
+        return float(values) if np.ndim(nearest_idx) == 0 else values
         
     def get_pollution_heatmap(self, pollutant: str = 'aqi') -> Dict:
         """
@@ -238,9 +482,24 @@ class PollutionGrid:
         if pollutant not in self.pollution_values:
             return None
             
-        # Calculate actual grid dimensions
-        unique_lats = len(np.unique(self.grid_points[:, 0]))
-        unique_lons = len(np.unique(self.grid_points[:, 1]))
+        cache_key = (pollutant, self.last_update)
+        heatmap = self._heatmap_cache.get(cache_key)
+        if heatmap is None:
+            heatmap = self._build_heatmap(pollutant)
+            self._heatmap_cache[cache_key] = heatmap
+        return heatmap
+        
+    def _build_heatmap(self, pollutant: str) -> Dict:
+        """
+        Assemble one pollutant's grid into the heatmap payload
+        
+        'values' and 'uncertainty' are left as ndarrays so the response can be
+        encoded straight from the buffers (orjson OPT_SERIALIZE_NUMPY) without
+        boxing every cell into a Python float first.
+        """
+        
+        # Grid dimensions recorded when the grid was created
+        unique_lats, unique_lons = self.grid_shape
         
         # Ensure we can reshape
         expected_size = unique_lats * unique_lons
@@ -251,8 +510,8 @@ class PollutionGrid:
             # Return flattened values
             return {
                 'bounds': self.grid_bounds,
-                'values': self.pollution_values[pollutant].tolist(),
-                'uncertainty': self.uncertainty_values[pollutant].tolist(),
+                'values': self.pollution_values[pollutant],
+                'uncertainty': self.uncertainty_values[pollutant],
                 'resolution': self.resolution,
                 'pollutant': pollutant,
                 'timestamp': self.last_update.isoformat() if self.last_update else None,
@@ -264,8 +523,8 @@ class PollutionGrid:
         
         return {
             'bounds': self.grid_bounds,
-            'values': values_2d.tolist(),
-            'uncertainty': uncertainty_2d.tolist(),
+            'values': values_2d,
+            'uncertainty': uncertainty_2d,
             'resolution': self.resolution,
             'pollutant': pollutant,
             'timestamp': self.last_update.isoformat() if self.last_update else None
@@ -280,36 +539,46 @@ class PollutionGrid:
             min_area_m2: Minimum area in square meters
             
         Returns:
-            List of clean zones with boundaries
+            List of clean zones with boundaries (JSON-ready: 'boundary_points'
+            is a list of [lat, lon] pairs)
         """
         if 'aqi' not in self.pollution_values:
             return []
             
-        from scipy import ndimage
+        aqi = self.pollution_values['aqi']
+        
+        # Label clean cells on the 2D lattice; 8-connectivity joins diagonal neighbours
+        clean_mask = (aqi < threshold).reshape(self.grid_shape)
+        labeled, num_features = ndimage.label(clean_mask, structure=np.ones((3, 3), dtype=int))
+        
+        if num_features == 0:
+            return []
         
-        # Create binary mask of clean areas
-        clean_mask = self.pollution_values['aqi'] < threshold
+        labels = labeled.ravel()
+        index = np.arange(1, num_features + 1)
         
-        # Find connected components
-        labeled, num_features = ndimage.label(clean_mask.reshape(-1, 1))
+        # Per-zone statistics in single passes over the grid
+        counts = np.bincount(labels, minlength=num_features + 1)
+        avg_aqi = ndimage.mean(aqi, labels, index)
+        max_aqi = ndimage.maximum(aqi, labels, index)
+        center_lat = ndimage.mean(self.grid_points[:, 0], labels, index)
+        center_lon = ndimage.mean(self.grid_points[:, 1], labels, index)
+        
+        # Grouping cells by label keeps each zone's points contiguous and in grid order
+        order = np.argsort(labels, kind='stable')
+        offsets = np.cumsum(counts)
         
         clean_zones = []
         min_points = min_area_m2 / (self.resolution ** 2)
         
-        for i in range(1, num_features + 1):
-            zone_mask = labeled == i
-            zone_points = self.grid_points[zone_mask.ravel()]
-            
-            if len(zone_points) >= min_points:
-                # Calculate zone properties
-                zone_aqi = self.pollution_values['aqi'][zone_mask.ravel()]
-                
-                clean_zones.append({
-                    'center': zone_points.mean(axis=0).tolist(),
-                    'area_m2': len(zone_points) * (self.resolution ** 2),
-                    'avg_aqi': float(zone_aqi.mean()),
-                    'max_aqi': float(zone_aqi.max()),
-                    'boundary_points': zone_points.tolist()
-                })
+        for i in np.flatnonzero(counts[1:] >= min_points):
+            zone_points = self.grid_points[order[offsets[i]:offsets[i + 1]]]
+            clean_zones.append({
+                'center': [float(center_lat[i]), float(center_lon[i])],
+                'area_m2': int(counts[i + 1]) * (self.resolution ** 2),
+                'avg_aqi': float(avg_aqi[i]),
+                'max_aqi': float(max_aqi[i]),
+                'boundary_points': zone_points.tolist()
+            })
                 
         return sorted(clean_zones, key=lambda x: x['avg_aqi'])
\ No newline at end of file
@@ -1,9 +1,13 @@
 """Data models for Run Coach system"""
 
 from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import chain
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
 
 @dataclass
 class UserProfile:
@@ -74,6 +78,21 @@ class RouteRecommendation:
     green_coverage: float
     safety_score: float
     generated_at: datetime = field(default_factory=datetime.now)
+    
+    @cached_property
+    def segment_dicts(self) -> List[Dict]:
+        """API-ready segment dicts, built once on first access (segments must be final)"""
+        return [
+            {
+                'start': seg.start_point,
+                'end': seg.end_point,
+                'distance_m': seg.distance_m,
+                'aqi': seg.aqi,
+                'pm25': seg.pm25,
+                'recommended_pace': seg.recommended_pace
+            }
+            for seg in self.segments
+        ]
 
 
 @dataclass
@@ -100,4 +119,24 @@ class PollutantData:
     co: float
     so2: float
     source: str
-    confidence: float = 1.0
\ No newline at end of file
+    confidence: float = 1.0
+    
+    # Numeric columns produced by to_arrays
+    ARRAY_FIELDS = ('lat', 'lon', 'aqi', 'pm25', 'pm10', 'o3', 'no2', 'co', 'so2', 'confidence')
+    
+    @staticmethod
+    def to_arrays(measurements: List['PollutantData']) -> Dict[str, np.ndarray]:
+        """Convert measurements to structure-of-arrays form: one float64 column per numeric field"""
+        n_fields = len(PollutantData.ARRAY_FIELDS)
+        
+        # Stream the fields straight into one preallocated buffer instead of
+        # building an intermediate list of row tuples
+        rows = np.fromiter(
+            chain.from_iterable(
+                (m.location[0], m.location[1], m.aqi, m.pm25, m.pm10, m.o3, m.no2, m.co, m.so2, m.confidence)
+                for m in measurements
+            ),
+            dtype=np.float64,
+            count=len(measurements) * n_fields
+        ).reshape(-1, n_fields)
+        return dict(zip(PollutantData.ARRAY_FIELDS, np.ascontiguousarray(rows.T)))
\ No newline at end of file
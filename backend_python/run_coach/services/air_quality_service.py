@@ -4,13 +4,23 @@ Integrates multiple AQI data sources for comprehensive coverage
 """
 
 import os
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 import numpy as np
 from dotenv import load_dotenv
 
+try:
+    # Optional: lets the HTTP layer honour the providers' Cache-Control headers
+    from cachecontrol import CacheControl
+except ImportError:
+    CacheControl = None
+
 from ..models import PollutantData
 
 load_dotenv()
@@ -25,6 +35,16 @@ class AirQualityService:
     - PurpleAir (if available)
     """
     
+    # Pollutant columns combined by aggregate_measurements
+    POLLUTANT_FIELDS = ('aqi', 'pm25', 'pm10', 'o3', 'no2', 'co', 'so2')
+    
+    # EPA PM2.5 breakpoints (ug/m3) and the AQI range each band maps onto
+    _PM25_BP_LO = np.array([0.0, 12.1, 35.5, 55.5, 150.5, 250.5])
+    _PM25_BP_HI = np.array([12.0, 35.4, 55.4, 150.4, 250.4, 500.4])
+    _AQI_LO = np.array([0.0, 51.0, 101.0, 151.0, 201.0, 301.0])
+    _AQI_HI = np.array([50.0, 100.0, 150.0, 200.0, 300.0, 500.0])
+    _AQI_SLOPE = (_AQI_HI - _AQI_LO) / (_PM25_BP_HI - _PM25_BP_LO)
+    
     def __init__(self):
         # API Keys
         self.openweather_key = os.getenv('OPENWEATHER_API_KEY')
@@ -35,8 +55,17 @@ class AirQualityService:
         self.openweather_base = "http://api.openweathermap.org/data/2.5/air_pollution"
         self.airnow_base = "https://www.airnowapi.org/aq"
         
-        # Cache for recent queries
-        self.cache = {}
+        # Shared keep-alive session so repeated provider calls reuse pooled connections
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self.session = CacheControl(session) if CacheControl is not None else session
+        
+        # Provider fetches are independent I/O, so they run side by side
+        self._fetch_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix='aq-fetch')
+        
+        # Lifetime of memoized query results (see _cached_air_quality)
         self.cache_duration = 300  # 5 minutes
         
     def get_current_air_quality(
@@ -55,33 +84,38 @@ class AirQualityService:
             List of PollutantData from various sources
         """
         lat, lon = location
+        
+        # Rounded coordinates plus the current time bucket form the cache key, so
+        # results expire after cache_duration and eviction is bounded by the LRU
+        ttl_bucket = int(time.time() // self.cache_duration)
+        return self._cached_air_quality(round(lat, 3), round(lon, 3), radius_km, ttl_bucket)
+        
+    @lru_cache(maxsize=512)
+    def _cached_air_quality(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        ttl_bucket: int
+    ) -> List[PollutantData]:
+        """Fetch and combine all sources for one rounded location and time bucket"""
         all_data = []
         
-        # Check cache first
-        cache_key = f"{lat:.3f},{lon:.3f},{radius_km}"
-        if cache_key in self.cache:
-            cached_time, cached_data = self.cache[cache_key]
-            if datetime.now() - cached_time < timedelta(seconds=self.cache_duration):
-                logger.info("Returning cached air quality data")
-                return cached_data
-                
-        # Fetch from OpenWeatherMap
+        # Start every configured provider at once so the wait is the slowest
+        # round trip rather than the sum of them
+        futures = []
         if self.openweather_key:
-            owm_data = self._fetch_openweather_data(lat, lon)
-            if owm_data:
-                all_data.extend(owm_data)
-                
-        # Fetch from AirNow
+            futures.append(self._fetch_pool.submit(self._fetch_openweather_data, lat, lon))
         if self.airnow_key:
-            airnow_data = self._fetch_airnow_data(lat, lon, radius_km)
-            if airnow_data:
-                all_data.extend(airnow_data)
-                
-        # Fetch from PurpleAir (if available)
+            futures.append(self._fetch_pool.submit(self._fetch_airnow_data, lat, lon, radius_km))
         if self.purpleair_key:
-            purpleair_data = self._fetch_purpleair_data(lat, lon, radius_km)
-            if purpleair_data:
-                all_data.extend(purpleair_data)
+            futures.append(self._fetch_pool.submit(self._fetch_purpleair_data, lat, lon, radius_km))
+            
+        # Collect in provider order; each fetcher already logs and returns [] on failure
+        for future in futures:
+            provider_data = future.result()
+            if provider_data:
+                all_data.extend(provider_data)
         
         # Add synthetic data for demo purposes (hackathon)
         # REDUCED TO 15 POINTS FOR PERFORMANCE
@@ -90,9 +124,6 @@ class AirQualityService:
             synthetic_data = generate_synthetic_pollution_data((lat, lon), radius_km, num_points=15)
             all_data.extend(synthetic_data)
             logger.info(f"Added {len(synthetic_data)} synthetic data points for demo")
-                
-        # Cache results
-        self.cache[cache_key] = (datetime.now(), all_data)
         
         logger.info(f"Retrieved {len(all_data)} air quality measurements")
         return all_data
@@ -102,7 +133,7 @@ class AirQualityService:
         
         try:
             url = f"{self.openweather_base}?lat={lat}&lon={lon}&appid={self.openweather_key}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             
             if response.status_code != 200:
                 logger.error(f"OpenWeather API error: {response.status_code}")
@@ -156,7 +187,7 @@ class AirQualityService:
                 'API_KEY': self.airnow_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             
             if response.status_code != 200:
                 logger.error(f"AirNow API error: {response.status_code}")
@@ -230,31 +261,21 @@ class AirQualityService:
         
         # Simplified AQI calculation based on PM2.5
         # Real calculation would consider all pollutants
-        if pm25 <= 12.0:
-            aqi = self._linear_interpolation(pm25, 0, 12.0, 0, 50)
-        elif pm25 <= 35.4:
-            aqi = self._linear_interpolation(pm25, 12.1, 35.4, 51, 100)
-        elif pm25 <= 55.4:
-            aqi = self._linear_interpolation(pm25, 35.5, 55.4, 101, 150)
-        elif pm25 <= 150.4:
-            aqi = self._linear_interpolation(pm25, 55.5, 150.4, 151, 200)
-        elif pm25 <= 250.4:
-            aqi = self._linear_interpolation(pm25, 150.5, 250.4, 201, 300)
-        else:
-            aqi = self._linear_interpolation(pm25, 250.5, 500.4, 301, 500)
-            
-        return min(aqi, 500)  # Cap at 500
+        return self._pm25_to_aqi(pm25)
         
-    def _linear_interpolation(
-        self, 
-        value: float,
-        low_break: float,
-        high_break: float,
-        low_aqi: float,
-        high_aqi: float
-    ) -> float:
-        """Linear interpolation for AQI calculation"""
-        return ((high_aqi - low_aqi) / (high_break - low_break)) * (value - low_break) + low_aqi
+    @classmethod
+    def _pm25_to_aqi(cls, pm25):
+        """
+        Piecewise-linear EPA AQI for a PM2.5 value or array of values
+        
+        The band is found by searchsorted on the upper breakpoints (first band
+        whose upper bound is >= pm25); values past the last band extrapolate
+        along it and are capped at 500.
+        """
+        band = np.minimum(np.searchsorted(cls._PM25_BP_HI, pm25), len(cls._PM25_BP_HI) - 1)
+        aqi = cls._AQI_SLOPE[band] * (pm25 - cls._PM25_BP_LO[band]) + cls._AQI_LO[band]
+        aqi = np.minimum(aqi, 500)  # Cap at 500
+        return float(aqi) if np.ndim(aqi) == 0 else aqi
         
     def get_forecast(
         self,
@@ -278,15 +299,20 @@ class AirQualityService:
             try:
                 # OpenWeatherMap provides 5-day forecast
                 url = f"{self.openweather_base}/forecast?lat={lat}&lon={lon}&appid={self.openweather_key}"
-                response = requests.get(url, timeout=10)
+                response = self.session.get(url, timeout=10)
                 
                 if response.status_code == 200:
                     data = response.json()
                     
-                    for item in data.get('list', [])[:hours]:
-                        components = item.get('components', {})
-                        aqi = self._calculate_aqi_from_components(components)
-                        
+                    items = data.get('list', [])[:hours]
+                    components_list = [item.get('components', {}) for item in items]
+                    
+                    # Convert every hour's PM2.5 to AQI in one vectorized pass
+                    aqi_values = self._pm25_to_aqi(
+                        np.array([c.get('pm2_5', 0) for c in components_list], dtype=np.float64)
+                    ).tolist()
+                    
+                    for item, components, aqi in zip(items, components_list, aqi_values):
                         forecasts.append({
                             'timestamp': datetime.fromtimestamp(item['dt']),
                             'aqi': aqi,
@@ -321,43 +347,30 @@ class AirQualityService:
         if len(measurements) == 1:
             return measurements[0]
             
+        arrays = PollutantData.to_arrays(measurements)
+        
+        # (N, 7) matrix, one column per pollutant in POLLUTANT_FIELDS order
+        M = np.column_stack([arrays[name] for name in self.POLLUTANT_FIELDS])
+        
         if method == 'weighted_average':
             # Weight by confidence scores
-            weights = np.array([m.confidence for m in measurements])
-            weights = weights / weights.sum()
-            
-            aqi = np.sum([m.aqi * w for m, w in zip(measurements, weights)])
-            pm25 = np.sum([m.pm25 * w for m, w in zip(measurements, weights)])
-            pm10 = np.sum([m.pm10 * w for m, w in zip(measurements, weights)])
-            o3 = np.sum([m.o3 * w for m, w in zip(measurements, weights)])
-            no2 = np.sum([m.no2 * w for m, w in zip(measurements, weights)])
-            co = np.sum([m.co * w for m, w in zip(measurements, weights)])
-            so2 = np.sum([m.so2 * w for m, w in zip(measurements, weights)])
+            weights = arrays['confidence'] / arrays['confidence'].sum()
+            aggregated = weights @ M
             
         elif method == 'median':
-            aqi = np.median([m.aqi for m in measurements])
-            pm25 = np.median([m.pm25 for m in measurements])
-            pm10 = np.median([m.pm10 for m in measurements])
-            o3 = np.median([m.o3 for m in measurements])
-            no2 = np.median([m.no2 for m in measurements])
-            co = np.median([m.co for m in measurements])
-            so2 = np.median([m.so2 for m in measurements])
+            aggregated = np.median(M, axis=0)
             
         elif method == 'worst_case':
-            aqi = max(m.aqi for m in measurements)
-            pm25 = max(m.pm25 for m in measurements)
-            pm10 = max(m.pm10 for m in measurements)
-            o3 = max(m.o3 for m in measurements)
-            no2 = max(m.no2 for m in measurements)
-            co = max(m.co for m in measurements)
-            so2 = max(m.so2 for m in measurements)
+            aggregated = M.max(axis=0)
             
         else:
             raise ValueError(f"Unknown aggregation method: {method}")
             
+        aqi, pm25, pm10, o3, no2, co, so2 = aggregated.tolist()
+            
         # Use centroid of locations
-        avg_lat = np.mean([m.location[0] for m in measurements])
-        avg_lon = np.mean([m.location[1] for m in measurements])
+        avg_lat = arrays['lat'].mean()
+        avg_lon = arrays['lon'].mean()
         
         return PollutantData(
             location=(avg_lat, avg_lon),
@@ -370,5 +383,5 @@ class AirQualityService:
             co=co,
             so2=so2,
             source='aggregated',
-            confidence=np.mean([m.confidence for m in measurements])
+            confidence=arrays['confidence'].mean()
         )
\ No newline at end of file
@@ -2,24 +2,160 @@
 Route generation service using Google Maps APIs
 """
 
+import hashlib
 import os
+import threading
+import time
+from itertools import count
+from math import asin, cos, radians, sin, sqrt
 import googlemaps
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional
-import polyline
 import numpy as np
-from datetime import datetime
+from joblib import Memory
+from numba import njit
 import logging
 
 from ..models import RouteRecommendation, RouteSegment
 
 logger = logging.getLogger(__name__)
 
+# Generated candidates persist on disk across restarts; the same start point
+# and preferences are requested over and over in demos
+_route_memory = Memory(os.path.join('.cache', 'routes'), verbose=0)
+
+# Cached candidates expire when the time bucket rolls over, so closed roads
+# and new paths are picked up at least once a day
+ROUTE_CACHE_TTL_S = 24 * 3600
+
+
+class _IncompleteRouteCandidates(Exception):
+    """
+    Raised inside the disk-cached helper so partial results (a failed
+    strategy, API errors) are returned to the caller but never stored
+    """
+    
+    def __init__(self, routes: List[Dict]):
+        super().__init__()
+        self.routes = routes
+
+
+@_route_memory.cache(ignore=['generator'])
+def _cached_route_candidates(
+    generator: 'RouteGenerator',
+    key_hash: str,
+    start_point: Tuple[float, float],
+    preferences: Tuple,
+    num_alternatives: int,
+    time_bucket: int
+) -> List[Dict]:
+    """Disk-memoized candidate generation keyed on the API key hash, inputs and time bucket"""
+    routes = generator._generate_route_candidates(start_point, dict(preferences), num_alternatives)
+    if len(routes) != num_alternatives:
+        raise _IncompleteRouteCandidates(routes)
+    return routes
+
+
+def _haversine_m(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Great-circle distance in meters between broadcastable (..., 2) lat/lon arrays in radians"""
+    dlat = b[..., 0] - a[..., 0]
+    dlon = b[..., 1] - a[..., 1]
+    h = np.sin(dlat / 2) ** 2 + np.cos(a[..., 0]) * np.cos(b[..., 0]) * np.sin(dlon / 2) ** 2
+    return 2 * 6371000 * np.arcsin(np.sqrt(h))
+
+
+def _distance_m(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Great-circle distance in meters between two lat/lon points in degrees"""
+    lat1, lat2 = radians(a[0]), radians(b[0])
+    h = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin(radians(b[1] - a[1]) / 2) ** 2
+    return 2 * 6371000 * asin(sqrt(h))
+
+
+def _plausible_loop(
+    start: Tuple[float, float],
+    waypoint1: Tuple[float, float],
+    waypoint2: Tuple[float, float],
+    expected_m: float
+) -> bool:
+    """
+    Cheap pre-API check on a loop's waypoints: both must be valid coordinates
+    within 50% of the intended distance from the start, and far enough apart
+    that the loop does not collapse into an out-and-back
+    """
+    for waypoint in (waypoint1, waypoint2):
+        if not (-90 <= waypoint[0] <= 90 and -180 <= waypoint[1] <= 180):
+            return False
+        if abs(_distance_m(start, waypoint) - expected_m) > 0.5 * expected_m:
+            return False
+    return _distance_m(waypoint1, waypoint2) >= 0.5 * expected_m
+
+
+@njit(cache=True, fastmath=True)
+def _count_green(samples, parks, radius_m):
+    """Count (n, 2) sample points with any (m, 2) park within radius_m; lat/lon in radians"""
+    green = 0
+    for i in range(samples.shape[0]):
+        lat1 = samples[i, 0]
+        lon1 = samples[i, 1]
+        for j in range(parks.shape[0]):
+            h = (sin((parks[j, 0] - lat1) / 2) ** 2
+                 + cos(lat1) * cos(parks[j, 0]) * sin((parks[j, 1] - lon1) / 2) ** 2)
+            if 2 * 6371000 * asin(sqrt(h)) < radius_m:
+                green += 1
+                break
+    return green
+
+
+@njit(cache=True)
+def _decode_polylines(buf, starts):
+    """
+    Decode concatenated Google encoded polylines (precision 5) into (n, 2) lat/lon
+    
+    buf holds the ASCII bytes of every polyline back to back and starts the byte
+    offset where each one begins; the running lat/lon deltas reset at each start.
+    """
+    # Every coordinate takes at least one byte, so a point takes at least two
+    out = np.empty((buf.shape[0] // 2, 2))
+    n = 0
+    for p in range(starts.shape[0]):
+        index = starts[p]
+        end = starts[p + 1] if p + 1 < starts.shape[0] else buf.shape[0]
+        lat = 0
+        lng = 0
+        while index < end:
+            for axis in range(2):
+                result = 0
+                shift = 0
+                while True:
+                    b = np.int64(buf[index]) - 63
+                    index += 1
+                    result |= (b & 0x1f) << shift
+                    shift += 5
+                    if b < 0x20:
+                        break
+                delta = ~(result >> 1) if result & 1 else result >> 1
+                if axis == 0:
+                    lat += delta
+                else:
+                    lng += delta
+            out[n, 0] = lat / 100000.0
+            out[n, 1] = lng / 100000.0
+            n += 1
+    return out[:n]
+
 
 class RouteGenerator:
     """
     Generates running route candidates using Google Maps Platform
     """
     
+    # Points per parallel Elevation API sub-request
+    ELEVATION_CHUNK = 200
+    
+    # Route points closer than 1/20000 degree (~5m) are treated as duplicates
+    DEDUP_CELLS_PER_DEG = 20000
+    
     def __init__(self):
         self.gmaps_key = os.getenv('GOOGLE_MAPS_API_KEY')
         if not self.gmaps_key:
@@ -27,6 +163,38 @@ class RouteGenerator:
             
         self.gmaps = googlemaps.Client(key=self.gmaps_key)
         
+        # Part of the disk cache key, so rotating the API key starts a fresh cache
+        self._key_hash = hashlib.sha256(self.gmaps_key.encode()).hexdigest()[:16]
+        
+        # Maps API calls are independent network round trips, so each strategy
+        # issues its requests side by side on this shared pool
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='gmaps')
+        
+        # Whole strategies and per-route metadata run side by side on a separate
+        # pool; they block on requests submitted to _pool, so sharing it could
+        # leave every worker waiting on work queued behind it
+        self._task_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='routegen')
+        
+        # Places and directions responses barely change within an hour, and
+        # overlapping routes keep asking for the same ones
+        self._places_cache = TTLCache(maxsize=4096, ttl=3600)
+        self._directions_cache = TTLCache(maxsize=1024, ttl=3600)
+        
+        # Elevation profiles by route_id, filled by get_elevation_profile
+        self._elevation_cache = TTLCache(maxsize=256, ttl=3600)
+        self._cache_lock = threading.Lock()
+        
+        # Route ids come from a counter: unique per generator even when several
+        # routes are parsed within the same clock tick. The random prefix keeps
+        # ids from earlier processes (served from the disk cache) distinct
+        self._route_id_prefix = f"gmaps_{os.urandom(4).hex()}"
+        self._route_ids = count()
+        
+    def close(self):
+        """Release the shared pools without waiting for in-flight calls"""
+        self._task_pool.shutdown(wait=False)
+        self._pool.shutdown(wait=False)
+        
     def generate_route_candidates(
         self,
         start_point: Tuple[float, float],
@@ -44,25 +212,42 @@ class RouteGenerator:
         Returns:
             List of route dictionaries with geometry and metadata
         """
-        routes = []
+        try:
+            return _cached_route_candidates(
+                self,
+                self._key_hash,
+                (float(start_point[0]), float(start_point[1])),
+                tuple(sorted(preferences.items())),
+                num_alternatives,
+                int(time.time() // ROUTE_CACHE_TTL_S)
+            )
+        except _IncompleteRouteCandidates as incomplete:
+            return incomplete.routes
+            
+    def _generate_route_candidates(
+        self,
+        start_point: Tuple[float, float],
+        preferences: Dict,
+        num_alternatives: int
+    ) -> List[Dict]:
+        """Uncached body of generate_route_candidates"""
         target_distance = preferences.get('preferred_distance_m', 5000)
         
         # Strategy 1: Loop routes using waypoints
-        loop_routes = self._generate_loop_routes(start_point, target_distance)
-        routes.extend(loop_routes)
-        
         # Strategy 2: Out-and-back routes
-        out_back_routes = self._generate_out_and_back_routes(start_point, target_distance)
-        routes.extend(out_back_routes)
-        
         # Strategy 3: Park-focused routes
+        # The strategies are independent, so their place searches and
+        # directions requests are all in flight at once
+        strategies = [self._generate_loop_routes, self._generate_out_and_back_routes]
         if preferences.get('prioritize_parks', True):
-            park_routes = self._generate_park_routes(start_point, target_distance)
-            routes.extend(park_routes)
+            strategies.append(self._generate_park_routes)
             
-        # Add metadata to all routes
-        for route in routes:
-            self._add_route_metadata(route)
+        futures = [self._task_pool.submit(strategy, start_point, target_distance) for strategy in strategies]
+        routes = [route for future in futures for route in future.result()]
+        
+        # Add metadata to all routes concurrently
+        for future in [self._task_pool.submit(self._add_route_metadata, route) for route in routes]:
+            future.result()
             
         # Return top N routes based on initial scoring
         return self._select_best_candidates(routes, num_alternatives)
@@ -84,31 +269,46 @@ class RouteGenerator:
         # Generate waypoints in different directions
         directions = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, 1), (1, -1), (-1, -1)]
         
+        # Degrees of longitude shrink with latitude; scale so offsets are in meters
+        lon_scale = 1 / max(cos(radians(start[0])), 1e-6)
+        waypoint_m = radius_m * 0.6
+        
+        requests = []
+        queued = set()
         for dx, dy in directions[:4]:  # Limit to 4 main directions
             # Create waypoint at roughly 1/3 distance
             waypoint1 = (
                 start[0] + dx * radius_deg * 0.6,
-                start[1] + dy * radius_deg * 0.6
+                start[1] + dy * radius_deg * 0.6 * lon_scale
             )
             
             # Create waypoint at roughly 2/3 distance (perpendicular)
             waypoint2 = (
                 start[0] + dy * radius_deg * 0.6,
-                start[1] - dx * radius_deg * 0.6
+                start[1] - dx * radius_deg * 0.6 * lon_scale
             )
             
+            # optimize_waypoints reorders the stops, so a mirrored pair is the
+            # same route; skip it along with geometrically implausible loops
+            # before paying for a directions call
+            key = frozenset((round(w[0], 5), round(w[1], 5)) for w in (waypoint1, waypoint2))
+            if key in queued or not _plausible_loop(start, waypoint1, waypoint2, waypoint_m):
+                continue
+            queued.add(key)
+            
+            # Request route through waypoints
+            requests.append(dict(
+                origin=start,
+                destination=start,
+                waypoints=[waypoint1, waypoint2],
+                mode="walking",
+                alternatives=False,
+                optimize_waypoints=True,
+                avoid=["highways", "tolls", "ferries"]
+            ))
+            
+        for result in self._directions_many(requests):
             try:
-                # Request route through waypoints
-                result = self.gmaps.directions(
-                    origin=start,
-                    destination=start,
-                    waypoints=[waypoint1, waypoint2],
-                    mode="walking",
-                    alternatives=False,
-                    optimize_waypoints=True,
-                    avoid=["highways", "tolls", "ferries"]
-                )
-                
                 if result:
                     route = self._parse_gmaps_route(result[0])
                     route['type'] = 'loop'
@@ -132,27 +332,26 @@ class RouteGenerator:
         # Search for interesting destinations at half distance
         try:
             # Find parks, landmarks, or other points of interest
-            places_result = self.gmaps.places_nearby(
-                location=start,
-                radius=half_distance,
-                type='park'
-            )
+            places_result = self._cached_places_nearby(start, half_distance, 'park')
             
-            for place in places_result.get('results', [])[:3]:
-                destination = (
-                    place['geometry']['location']['lat'],
-                    place['geometry']['location']['lng']
-                )
-                
-                # Get route to destination
-                result = self.gmaps.directions(
+            places = places_result.get('results', [])[:3]
+            
+            # Get routes to all destinations at once
+            results = self._directions_many([
+                dict(
                     origin=start,
-                    destination=destination,
+                    destination=(
+                        place['geometry']['location']['lat'],
+                        place['geometry']['location']['lng']
+                    ),
                     mode="walking",
                     alternatives=True,
                     avoid=["highways", "tolls", "ferries"]
                 )
-                
+                for place in places
+            ])
+            
+            for place, result in zip(places, results):
                 for route_option in result[:2]:  # Take up to 2 alternatives
                     route = self._parse_gmaps_route(route_option)
                     
@@ -181,11 +380,7 @@ class RouteGenerator:
         try:
             # Find nearby parks
             # Note: radius and rank_by='distance' are mutually exclusive
-            parks = self.gmaps.places_nearby(
-                location=start,
-                radius=int(target_distance * 0.7),
-                type='park'
-            )
+            parks = self._cached_places_nearby(start, int(target_distance * 0.7), 'park')
             
             park_locations = []
             for park in parks.get('results', [])[:5]:
@@ -199,18 +394,20 @@ class RouteGenerator:
                 
             # Create routes that visit multiple parks
             if len(park_locations) >= 2:
-                for i in range(min(3, len(park_locations) - 1)):
-                    waypoints = [p['location'] for p in park_locations[i:i+2]]
-                    
-                    result = self.gmaps.directions(
+                pairs = range(min(3, len(park_locations) - 1))
+                results = self._directions_many([
+                    dict(
                         origin=start,
                         destination=start,
-                        waypoints=waypoints,
+                        waypoints=[p['location'] for p in park_locations[i:i+2]],
                         mode="walking",
                         optimize_waypoints=True,
                         avoid=["highways", "tolls", "ferries"]
                     )
-                    
+                    for i in pairs
+                ])
+                
+                for i, result in zip(pairs, results):
                     if result:
                         route = self._parse_gmaps_route(result[0])
                         route['type'] = 'park_route'
@@ -222,6 +419,51 @@ class RouteGenerator:
             
         return routes
         
+    def _directions_many(self, requests: List[Dict]) -> List[List[Dict]]:
+        """Issue several directions requests concurrently; results come back in request order"""
+        futures = [self._pool.submit(self._safe_directions, params) for params in requests]
+        return [future.result() for future in futures]
+        
+    def _safe_directions(self, params: Dict) -> List[Dict]:
+        """Directions request for a pool worker; a failed call yields no routes instead of raising"""
+        key = tuple(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in sorted(params.items())
+        )
+        with self._cache_lock:
+            cached = self._directions_cache.get(key)
+        if cached is not None:
+            return cached
+            
+        try:
+            result = self.gmaps.directions(**params) or []
+        except Exception as e:
+            logger.error(f"Error requesting directions: {e}")
+            return []
+            
+        with self._cache_lock:
+            self._directions_cache[key] = result
+        return result
+        
+    def _cached_places_nearby(self, location: Tuple[float, float], radius: float, place_type: str) -> Dict:
+        """
+        places_nearby memoized for an hour
+        
+        The location is rounded to 4 decimals (~11m) first, so neighbouring
+        samples along adjacent routes share one request.
+        """
+        key = (round(location[0], 4), round(location[1], 4), radius, place_type)
+        with self._cache_lock:
+            cached = self._places_cache.get(key)
+        if cached is not None:
+            return cached
+            
+        result = self.gmaps.places_nearby(location=key[:2], radius=radius, type=place_type)
+        
+        with self._cache_lock:
+            self._places_cache[key] = result
+        return result
+            
     def _parse_gmaps_route(self, gmaps_route: Dict) -> Dict:
         """Parse Google Maps route response into our format"""
         
@@ -229,31 +471,33 @@ class RouteGenerator:
             raise ValueError("Invalid route response")
             
         # Combine all legs
-        all_points = []
+        encoded = []
         total_distance = 0
         total_duration = 0
         
         for leg in gmaps_route['legs']:
-            # Decode polyline
+            # Collect step polylines
             if 'steps' in leg:
                 for step in leg['steps']:
                     if 'polyline' in step and 'points' in step['polyline']:
-                        points = polyline.decode(step['polyline']['points'])
-                        all_points.extend(points)
+                        encoded.append(step['polyline']['points'].encode('ascii'))
                         
             total_distance += leg['distance']['value']
             total_duration += leg['duration']['value']
             
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_points = []
-        for point in all_points:
-            if point not in seen:
-                seen.add(point)
-                unique_points.append(point)
+        # Decode every step in one compiled pass over the concatenated bytes
+        starts = np.cumsum([0] + [len(e) for e in encoded[:-1]], dtype=np.int64)
+        decoded = _decode_polylines(np.frombuffer(b''.join(encoded), dtype=np.uint8), starts)
+        
+        # Remove duplicates while preserving order; points are compared on a
+        # ~5m grid so GPS-like near-duplicates collapse too (the first point
+        # seen in each cell is kept as-is)
+        cells = np.round(decoded * self.DEDUP_CELLS_PER_DEG).astype(np.int64)
+        _, first = np.unique(cells[:, 0] * 10_000_000 + cells[:, 1], return_index=True)
+        unique_points = list(map(tuple, decoded[np.sort(first)].tolist()))
                 
         return {
-            'route_id': f"gmaps_{datetime.now().timestamp()}",
+            'route_id': f"{self._route_id_prefix}_{next(self._route_ids)}",
             'geometry': unique_points,
             'encoded_polyline': gmaps_route['overview_polyline']['points'],
             'distance_m': total_distance,
@@ -266,8 +510,8 @@ class RouteGenerator:
         
         geometry = route['geometry']
         
-        # Calculate elevation gain (would need Elevation API)
-        route['elevation_gain_m'] = self._estimate_elevation_gain(geometry)
+        # Calculate elevation gain from the route's elevation profile
+        route['elevation_gain_m'] = self._estimate_elevation_gain(route)
         
         # Estimate green space coverage
         route['green_coverage'] = self._estimate_green_coverage(geometry)
@@ -275,14 +519,13 @@ class RouteGenerator:
         # Calculate safety score based on road types
         route['safety_score'] = self._calculate_safety_score(geometry)
         
-    def _estimate_elevation_gain(self, geometry: List[Tuple[float, float]]) -> float:
+    def _estimate_elevation_gain(self, route: Dict) -> float:
         """
         Estimate elevation gain for route
-        Note: This would use Google Elevation API in production
+        Sums the climbs between adjacent samples of the (cached) elevation profile
         """
-        # Simplified estimation based on number of turns and distance
-        # Real implementation would query elevation API
-        return np.random.uniform(0, 50)  # Placeholder
+        elevations = np.asarray(self.get_elevation_profile(route), dtype=np.float64)
+        return float(np.diff(elevations).clip(min=0).sum())
         
     def _estimate_green_coverage(self, geometry: List[Tuple[float, float]]) -> float:
         """
@@ -297,30 +540,37 @@ class RouteGenerator:
         if len(sample_points) < 2:
             sample_points = [geometry[0], geometry[-1]]
 
-        green_segments = 0
         total_segments = len(sample_points)
 
-        # Check each sample point for nearby parks
-        for point in sample_points:
-            try:
-                parks = self.gmaps.places_nearby(
-                    location=point,
-                    radius=100,  # 100m radius for green space detection
-                    type='park'
-                )
+        # One park search covering the whole route (its bounding box plus the
+        # 100m green-space margin) instead of one search per sample point
+        pts = np.radians(np.asarray(sample_points, dtype=np.float64))
+        lo, hi = np.radians(np.min(geometry, axis=0)), np.radians(np.max(geometry, axis=0))
+        center = (lo + hi) / 2
+        radius = _haversine_m(lo, hi) / 2 + 100
+        try:
+            parks = self._cached_places_nearby(
+                tuple(np.degrees(center)), int(min(radius, 50000)), 'park'
+            ).get('results', [])
+        except Exception as e:
+            logger.warning(f"Error checking green coverage around {tuple(np.degrees(center))}: {e}")
+            return 0.0
+
+        if not parks:
+            return 0.0
 
-                # If parks found within 100m, consider this segment "green"
-                if parks.get('results'):
-                    green_segments += 1
+        park_locs = np.radians([
+            (p['geometry']['location']['lat'], p['geometry']['location']['lng'])
+            for p in parks
+        ])
 
-            except Exception as e:
-                logger.warning(f"Error checking green coverage at {point}: {e}")
-                continue
+        # A sample point is "green" when any park lies within 100m of it
+        green_segments = int(_count_green(pts, park_locs, 100.0))
 
         # Return percentage of green segments
         green_percentage = green_segments / total_segments if total_segments > 0 else 0.0
         return min(green_percentage, 1.0)  # Cap at 100%
-        
+            
     def _calculate_safety_score(self, geometry: List[Tuple[float, float]]) -> float:
         """
         Calculate safety score based on road types and traffic
@@ -340,29 +590,25 @@ class RouteGenerator:
         if len(routes) <= num_candidates:
             return routes
             
-        # Score routes based on multiple factors
-        for route in routes:
-            score = 0
-            
-            # Prefer routes close to target distance
-            distance_error = abs(route['distance_m'] - 5000) / 5000
-            score -= distance_error
-            
-            # Prefer routes with green coverage
-            score += route['green_coverage'] * 2
-            
-            # Prefer safer routes
-            score += route['safety_score']
-            
-            # Prefer loop routes
-            if route.get('type') == 'loop':
-                score += 0.5
-                
+        # Score all routes at once from column arrays of the scoring fields
+        distance = np.fromiter((r['distance_m'] for r in routes), dtype=np.float64, count=len(routes))
+        green = np.fromiter((r['green_coverage'] for r in routes), dtype=np.float64, count=len(routes))
+        safety = np.fromiter((r['safety_score'] for r in routes), dtype=np.float64, count=len(routes))
+        is_loop = np.fromiter((r.get('type') == 'loop' for r in routes), dtype=bool, count=len(routes))
+        
+        scores = (
+            -np.abs(distance - 5000) / 5000  # Prefer routes close to target distance
+            + green * 2                      # Prefer routes with green coverage
+            + safety                         # Prefer safer routes
+            + np.where(is_loop, 0.5, 0.0)    # Prefer loop routes
+        )
+        
+        for route, score in zip(routes, scores.tolist()):
             route['initial_score'] = score
             
-        # Sort by score and return top N
-        routes.sort(key=lambda x: x['initial_score'], reverse=True)
-        return routes[:num_candidates]
+        # Highest score first; a stable sort keeps ties in generation order
+        order = np.argsort(-scores, kind='stable')[:num_candidates]
+        return [routes[i] for i in order]
         
     def get_elevation_profile(self, route: Dict) -> List[float]:
         """
@@ -374,27 +620,44 @@ class RouteGenerator:
         Returns:
             List of elevation values in meters
         """
+        route_id = route.get('route_id')
+        if route_id is not None:
+            with self._cache_lock:
+                cached = self._elevation_cache.get(route_id)
+            if cached is not None:
+                return cached
+                
         geometry = route['geometry']
         
         if len(geometry) > 512:
             # Google Elevation API has a limit of 512 points per request
-            # Sample points evenly
-            indices = np.linspace(0, len(geometry) - 1, 512, dtype=int)
-            sampled_points = [geometry[i] for i in indices]
+            # Sample points evenly (first and last included) with integer index math
+            last = len(geometry) - 1
+            sampled_points = [geometry[i * last // 511] for i in range(512)]
         else:
             sampled_points = geometry
             
         try:
-            # Query elevation API
-            elevations = self.gmaps.elevation(sampled_points)
+            # Query elevation API in parallel chunks of ELEVATION_CHUNK points
+            futures = [
+                self._pool.submit(self.gmaps.elevation, sampled_points[i:i + self.ELEVATION_CHUNK])
+                for i in range(0, len(sampled_points), self.ELEVATION_CHUNK)
+            ]
             
-            return [e['elevation'] for e in elevations]
+            elevations = [e['elevation'] for future in futures for e in future.result()]
             
         except Exception as e:
             logger.error(f"Error fetching elevation data: {e}")
             # Return flat profile as fallback
             return [0.0] * len(sampled_points)
             
+        # Remember the profile so metadata scoring and the API response share one fetch
+        if route_id is not None:
+            with self._cache_lock:
+                self._elevation_cache[route_id] = elevations
+                
+        return elevations
+            
     def get_nearby_amenities(self, route: Dict) -> Dict[str, List]:
         """
         Find amenities near the route (water fountains, restrooms, etc.)
@@ -415,14 +678,15 @@ class RouteGenerator:
         geometry = route['geometry']
         sample_points = geometry[::max(1, len(geometry) // 10)]  # Sample every 10%
         
-        for point in sample_points:
+        # Search for amenities near every sample point concurrently (200m radius)
+        futures = [
+            self._pool.submit(self._cached_places_nearby, point, 200, 'convenience_store')
+            for point in sample_points
+        ]
+        
+        for future in futures:
             try:
-                # Search for amenities near this point
-                places = self.gmaps.places_nearby(
-                    location=point,
-                    radius=200,  # 200m radius
-                    type='convenience_store'
-                )
+                places = future.result()
                 
                 for place in places.get('results', [])[:2]:
                     amenities['convenience_stores'].append({
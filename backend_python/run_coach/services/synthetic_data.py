@@ -3,111 +3,155 @@ Synthetic air quality data for demonstration purposes
 Simulates pollution hotspots around Houston for hackathon demo
 """
 
-import random
 from datetime import datetime
-from typing import List, Tuple
+from math import atan2, cos, sin, radians, pi
+from typing import List, Optional, Tuple
 import numpy as np
+from numba import njit
 
 from ..models import PollutantData
 
 
-def generate_synthetic_pollution_data(
-    center: Tuple[float, float], 
-    radius_km: float = 10,
-    num_points: int = 50
-) -> List[PollutantData]:
-    """
-    Generate synthetic pollution data with realistic patterns for Houston area
+# Define pollution zones around Houston
+_POLLUTION_ZONES = [
+    # High pollution areas (highways and industrial)
+    {"center": (29.7304, -95.4248), "radius": 0.02, "aqi_range": (100, 150), "name": "I-610 West"},
+    {"center": (29.7404, -95.3648), "radius": 0.015, "aqi_range": (80, 120), "name": "US-59"},
+    {"center": (29.6904, -95.4148), "radius": 0.018, "aqi_range": (90, 140), "name": "Industrial Area"},
+    {"center": (29.7504, -95.4348), "radius": 0.02, "aqi_range": (85, 125), "name": "Galleria Traffic"},
     
-    Creates:
-    - High pollution zones near highways (I-610, US-59)
-    - Moderate pollution in industrial areas
-    - Lower pollution in residential/park areas
-    - Clean air zones around Rice University campus
+    # Moderate pollution areas
+    {"center": (29.7204, -95.3848), "radius": 0.015, "aqi_range": (60, 90), "name": "Medical Center"},
+    {"center": (29.7004, -95.4048), "radius": 0.012, "aqi_range": (50, 80), "name": "West University"},
+    
+    # Clean areas (parks and campus)
+    {"center": (29.7174, -95.4018), "radius": 0.008, "aqi_range": (20, 40), "name": "Rice University"},
+    {"center": (29.7274, -95.3918), "radius": 0.01, "aqi_range": (25, 45), "name": "Hermann Park"},
+    {"center": (29.7074, -95.3818), "radius": 0.008, "aqi_range": (30, 50), "name": "Brays Bayou"},
+]
+
+# Zone columns as flat arrays (structure of arrays) for the JIT kernel; the
+# names are only needed for display so they stay a parallel Python list
+_ZONE_NAMES = [zone["name"] for zone in _POLLUTION_ZONES]
+_ZONE_LAT = np.array([zone["center"][0] for zone in _POLLUTION_ZONES], dtype=np.float64)
+_ZONE_LON = np.array([zone["center"][1] for zone in _POLLUTION_ZONES], dtype=np.float64)
+_ZONE_RADIUS = np.array([zone["radius"] for zone in _POLLUTION_ZONES], dtype=np.float64)
+_ZONE_AQI_MIN = np.array([zone["aqi_range"][0] for zone in _POLLUTION_ZONES], dtype=np.float64)
+_ZONE_AQI_MAX = np.array([zone["aqi_range"][1] for zone in _POLLUTION_ZONES], dtype=np.float64)
+
+# Per-zone longitude scale (1 / cos(lat)), computed once since the zones never move
+_ZONE_INV_COS_LAT = np.array([1.0 / cos(radians(lat)) for lat in _ZONE_LAT], dtype=np.float64)
+
+# Shared generator for all synthetic draws; pass an explicit rng for reproducible data
+_RNG = np.random.default_rng()
+
+# Columns of the per-point uniform draw matrix consumed by _gen_points
+_N_DRAWS = 11
+
+
+@njit(cache=True, fastmath=True)
+def _gen_points(u, center_lat, center_lon, radius_km, zone_lat, zone_lon, zone_radius, zone_inv_cos_lat, aqi_min, aqi_max):
     """
-    synthetic_data = []
-    center_lat, center_lon = center
+    Turn per-point U[0, 1) draws into synthetic readings
     
-    # Define pollution zones around Houston
-    pollution_zones = [
-        # High pollution areas (highways and industrial)
-        {"center": (29.7304, -95.4248), "radius": 0.02, "aqi_range": (100, 150), "name": "I-610 West"},
-        {"center": (29.7404, -95.3648), "radius": 0.015, "aqi_range": (80, 120), "name": "US-59"},
-        {"center": (29.6904, -95.4148), "radius": 0.018, "aqi_range": (90, 140), "name": "Industrial Area"},
-        {"center": (29.7504, -95.4348), "radius": 0.02, "aqi_range": (85, 125), "name": "Galleria Traffic"},
-        
-        # Moderate pollution areas
-        {"center": (29.7204, -95.3848), "radius": 0.015, "aqi_range": (60, 90), "name": "Medical Center"},
-        {"center": (29.7004, -95.4048), "radius": 0.012, "aqi_range": (50, 80), "name": "West University"},
+    u has one row of _N_DRAWS draws per point: zone membership, zone pick, angle,
+    distance, AQI, PM2.5/PM10/O3/NO2 noise, CO and SO2. Returns rows of
+    (lat, lon, aqi, pm25, pm10, o3, no2, co, so2).
+    """
+    n = u.shape[0]
+    out = np.empty((n, 9))
+    inv_cos_center = 1.0 / cos(radians(center_lat))
+    for i in range(n):
+        angle = 2 * pi * u[i, 2]
         
-        # Clean areas (parks and campus)
-        {"center": (29.7174, -95.4018), "radius": 0.008, "aqi_range": (20, 40), "name": "Rice University"},
-        {"center": (29.7274, -95.3918), "radius": 0.01, "aqi_range": (25, 45), "name": "Hermann Park"},
-        {"center": (29.7074, -95.3818), "radius": 0.008, "aqi_range": (30, 50), "name": "Brays Bayou"},
-    ]
-    
-    # Generate points
-    for i in range(num_points):
         # Randomly select a zone or create a background point
-        if random.random() < 0.7:  # 70% chance of being in a zone
-            zone = random.choice(pollution_zones)
+        if u[i, 0] < 0.7:  # 70% chance of being in a zone
+            k = min(int(u[i, 1] * zone_radius.shape[0]), zone_radius.shape[0] - 1)
             
             # Generate point within zone
-            angle = random.uniform(0, 2 * np.pi)
-            distance = random.uniform(0, zone["radius"])
-            lat = zone["center"][0] + distance * np.cos(angle)
-            lon = zone["center"][1] + distance * np.sin(angle) / np.cos(np.radians(zone["center"][0]))
+            distance = zone_radius[k] * u[i, 3]
+            lat = zone_lat[k] + distance * cos(angle)
+            lon = zone_lon[k] + distance * sin(angle) * zone_inv_cos_lat[k]
             
-            # Generate AQI based on zone and distance from center
-            zone_center_distance = distance / zone["radius"]  # 0 to 1
-            aqi_min, aqi_max = zone["aqi_range"]
             # Higher pollution at center of zone
-            aqi = aqi_max - (aqi_max - aqi_min) * zone_center_distance
-            aqi += random.uniform(-10, 10)  # Add noise
+            zone_center_distance = distance / zone_radius[k]  # 0 to 1
+            aqi = aqi_max[k] - (aqi_max[k] - aqi_min[k]) * zone_center_distance
+            aqi += -10 + 20 * u[i, 4]  # Add noise
             
         else:
             # Background pollution
-            angle = random.uniform(0, 2 * np.pi)
-            distance = random.uniform(0, radius_km / 111)  # Convert km to degrees
-            lat = center_lat + distance * np.cos(angle)
-            lon = center_lon + distance * np.sin(angle) / np.cos(np.radians(center_lat))
+            distance = radius_km / 111 * u[i, 3]  # Convert km to degrees
+            lat = center_lat + distance * cos(angle)
+            lon = center_lon + distance * sin(angle) * inv_cos_center
             
             # Background AQI
-            aqi = random.uniform(40, 70)
-        
+            aqi = 40 + 30 * u[i, 4]
+            
         # Ensure AQI is positive
-        aqi = max(0, aqi)
+        aqi = max(0.0, aqi)
         
         # Calculate other pollutants based on AQI
         # Simplified relationships
-        pm25 = aqi * 0.3 + random.uniform(-5, 5)
-        pm10 = pm25 * 1.8 + random.uniform(-10, 10)
-        o3 = 50 + aqi * 0.5 + random.uniform(-10, 10)
-        no2 = aqi * 0.4 + random.uniform(-5, 5)
+        pm25 = aqi * 0.3 + (-5 + 10 * u[i, 5])
+        pm10 = pm25 * 1.8 + (-10 + 20 * u[i, 6])
+        o3 = 50 + aqi * 0.5 + (-10 + 20 * u[i, 7])
+        no2 = aqi * 0.4 + (-5 + 10 * u[i, 8])
         
+        out[i, 0] = lat
+        out[i, 1] = lon
+        out[i, 2] = aqi
         # Ensure all values are positive
-        pm25 = max(0, pm25)
-        pm10 = max(0, pm10)
-        o3 = max(0, o3)
-        no2 = max(0, no2)
-        
-        synthetic_data.append(
-            PollutantData(
-                location=(lat, lon),
-                timestamp=datetime.now(),
-                aqi=aqi,
-                pm25=pm25,
-                pm10=pm10,
-                o3=o3,
-                no2=no2,
-                co=random.uniform(0, 2),  # Low CO levels
-                so2=random.uniform(0, 5),  # Low SO2 levels
-                source="synthetic_demo",
-                confidence=0.95
-            )
-        )
+        out[i, 3] = max(0.0, pm25)
+        out[i, 4] = max(0.0, pm10)
+        out[i, 5] = max(0.0, o3)
+        out[i, 6] = max(0.0, no2)
+        out[i, 7] = 2 * u[i, 9]  # Low CO levels
+        out[i, 8] = 5 * u[i, 10]  # Low SO2 levels
+    return out
+
+
+def generate_synthetic_pollution_data(
+    center: Tuple[float, float], 
+    radius_km: float = 10,
+    num_points: int = 50,
+    rng: Optional[np.random.Generator] = None
+) -> List[PollutantData]:
+    """
+    Generate synthetic pollution data with realistic patterns for Houston area
+    
+    Creates:
+    - High pollution zones near highways (I-610, US-59)
+    - Moderate pollution in industrial areas
+    - Lower pollution in residential/park areas
+    - Clean air zones around Rice University campus
+    """
+    center_lat, center_lon = center
+    rng = rng or _RNG
+    
+    # Every random value comes from one vectorized draw; the compiled kernel does
+    # the numeric work and only object construction stays in Python
+    rows = _gen_points(
+        rng.random((num_points, _N_DRAWS)), center_lat, center_lon, radius_km,
+        _ZONE_LAT, _ZONE_LON, _ZONE_RADIUS, _ZONE_INV_COS_LAT, _ZONE_AQI_MIN, _ZONE_AQI_MAX
+    )
     
-    return synthetic_data
+    timestamp = datetime.now()
+    return [
+        PollutantData(
+            location=(lat, lon),
+            timestamp=timestamp,
+            aqi=aqi,
+            pm25=pm25,
+            pm10=pm10,
+            o3=o3,
+            no2=no2,
+            co=co,
+            so2=so2,
+            source="synthetic_demo",
+            confidence=0.95
+        )
+        for lat, lon, aqi, pm25, pm10, o3, no2, co, so2 in rows.tolist()
+    ]
 
 
 def add_traffic_pollution_corridor(
@@ -116,44 +160,53 @@ def add_traffic_pollution_corridor(
     end: Tuple[float, float],
     width_deg: float = 0.005,
     aqi_range: Tuple[float, float] = (80, 120),
-    num_points: int = 20
+    num_points: int = 20,
+    rng: Optional[np.random.Generator] = None
 ) -> List[PollutantData]:
     """
     Add a corridor of high pollution along a road/highway
     """
     start_lat, start_lon = start
     end_lat, end_lon = end
+    rng = rng or _RNG
     
-    for i in range(num_points):
-        # Point along the line
-        t = i / (num_points - 1)
-        lat = start_lat + t * (end_lat - start_lat)
-        lon = start_lon + t * (end_lon - start_lon)
-        
-        # Add perpendicular offset
-        perpendicular_angle = np.arctan2(end_lon - start_lon, end_lat - start_lat) + np.pi/2
-        offset = random.uniform(-width_deg, width_deg)
-        lat += offset * np.cos(perpendicular_angle)
-        lon += offset * np.sin(perpendicular_angle)
-        
-        # AQI varies along the corridor
-        aqi = random.uniform(*aqi_range)
-        pm25 = aqi * 0.3 + random.uniform(-5, 5)
-        
-        data.append(
-            PollutantData(
-                location=(lat, lon),
-                timestamp=datetime.now(),
-                aqi=aqi,
-                pm25=max(0, pm25),
-                pm10=max(0, pm25 * 1.8),
-                o3=max(0, 50 + aqi * 0.5),
-                no2=max(0, aqi * 0.4),
-                co=random.uniform(0, 3),
-                so2=random.uniform(0, 5),
-                source="synthetic_traffic",
-                confidence=0.9
-            )
+    # Points along the line
+    t = np.linspace(0, 1, num_points)
+    
+    # Perpendicular offset; the direction is the same for every point of a straight corridor
+    perpendicular_angle = atan2(end_lon - start_lon, end_lat - start_lat) + pi/2
+    offset = rng.uniform(-width_deg, width_deg, num_points)
+    lats = start_lat + t * (end_lat - start_lat) + offset * cos(perpendicular_angle)
+    lons = start_lon + t * (end_lon - start_lon) + offset * sin(perpendicular_angle)
+    
+    # AQI varies along the corridor
+    aqi = rng.uniform(aqi_range[0], aqi_range[1], num_points)
+    pm25 = np.clip(aqi * 0.3 + rng.uniform(-5, 5, num_points), 0, None)
+    pm10 = pm25 * 1.8
+    o3 = np.clip(50 + aqi * 0.5, 0, None)
+    no2 = np.clip(aqi * 0.4, 0, None)
+    co = rng.uniform(0, 3, num_points)
+    so2 = rng.uniform(0, 5, num_points)
+    
+    timestamp = datetime.now()
+    data.extend(
+        PollutantData(
+            location=(lat, lon),
+            timestamp=timestamp,
+            aqi=aqi_i,
+            pm25=pm25_i,
+            pm10=pm10_i,
+            o3=o3_i,
+            no2=no2_i,
+            co=co_i,
+            so2=so2_i,
+            source="synthetic_traffic",
+            confidence=0.9
+        )
+        for lat, lon, aqi_i, pm25_i, pm10_i, o3_i, no2_i, co_i, so2_i in zip(
+            lats.tolist(), lons.tolist(), aqi.tolist(), pm25.tolist(), pm10.tolist(),
+            o3.tolist(), no2.tolist(), co.tolist(), so2.tolist()
         )
+    )
     
-    return data
\ No newline at end of file
+    return data
@@ -2,21 +2,207 @@
 Time window optimization for finding best running times
 """
 
+import asyncio
+import math
 import numpy as np
+from numba import njit, types
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from concurrent.futures import ThreadPoolExecutor
 
 from ..models import TimeWindow, UserProfile
+from ..core.health_risk import HealthRiskCalculator
 from .air_quality_service import AirQualityService
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Score lookup tables indexed by hour of day (0-23)
+
+# Circadian rhythm score for exercise: early morning 0.9, mid-morning 0.8,
+# mid-afternoon 0.7, late afternoon/early evening peak 1.0, very early/late 0.5,
+# night 0.2
+_CIRCADIAN_LUT = np.array([
+    0.2, 0.2, 0.2, 0.2, 0.2, 0.5,   # 00-05
+    0.9, 0.9, 0.9, 0.8, 0.8, 0.8,   # 06-11
+    0.2, 0.2, 0.7, 0.7, 1.0, 1.0,   # 12-17
+    1.0, 1.0, 0.5, 0.2, 0.2, 0.2,   # 18-23
+])
+
+# Time-of-day preference score per preferred_time_of_day; anything else scores 0.8
+_TIME_PREFERENCE_LUTS = {
+    'morning': np.array([
+        0.3, 0.3, 0.3, 0.3, 0.3, 1.0,   # 00-05
+        1.0, 1.0, 1.0, 1.0, 0.7, 0.7,   # 06-11
+        0.3, 0.3, 0.3, 0.3, 0.3, 0.3,   # 12-17
+        0.3, 0.3, 0.3, 0.3, 0.3, 0.3,   # 18-23
+    ]),
+    'evening': np.array([
+        0.3, 0.3, 0.3, 0.3, 0.3, 0.3,   # 00-05
+        0.3, 0.3, 0.3, 0.3, 0.3, 0.3,   # 06-11
+        0.3, 0.3, 0.3, 0.7, 0.7, 1.0,   # 12-17
+        1.0, 1.0, 1.0, 0.3, 0.3, 0.3,   # 18-23
+    ]),
+    'afternoon': np.array([
+        0.3, 0.3, 0.3, 0.3, 0.3, 0.3,   # 00-05
+        0.3, 0.3, 0.3, 0.3, 0.7, 0.7,   # 06-11
+        1.0, 1.0, 1.0, 1.0, 1.0, 0.7,   # 12-17
+        0.7, 0.3, 0.3, 0.3, 0.3, 0.3,   # 18-23
+    ]),
+}
+_ANY_TIME_LUT = np.full(24, 0.8)
+
+
+# The kernels below are compiled eagerly for these exact argument types, at
+# import (or loaded from the on-disk cache), so no request ever pays for JIT
+# compilation; callers must pass C-contiguous float64 arrays
+_F8_ARRAY = types.float64[::1]
+
+
+@njit((_F8_ARRAY, types.int64), cache=True)
+def _rolling_max(values, window):
+    """Max of every length-window run of values, via a monotonic deque in one O(N) pass"""
+    n = values.shape[0]
+    if window < 1 or window > n:
+        return np.empty(0)
+    out = np.empty(n - window + 1)
+    # Deque of indices whose values decrease from head to tail; every index
+    # is pushed once, so a flat buffer with head/tail cursors is enough
+    candidates = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(n):
+        while tail > head and values[candidates[tail - 1]] <= values[i]:
+            tail -= 1
+        candidates[tail] = i
+        tail += 1
+        if candidates[head] <= i - window:
+            head += 1
+        if i >= window - 1:
+            out[i - window + 1] = values[candidates[head]]
+    return out
+
+
+@njit(
+    (_F8_ARRAY, _F8_ARRAY, types.float64, types.int64, types.int64, _F8_ARRAY, _F8_ARRAY),
+    cache=True,
+    fastmath=True
+)
+def _scan_windows(aqi, hourly_weather, threshold, window, start_hour, time_lut, circadian_lut):
+    """
+    Greedy scan for non-overlapping windows whose every hour is below threshold,
+    scoring each window as it is taken
+    
+    hourly_weather holds per-hour weather scores (it may cover fewer hours than
+    aqi) and start_hour is the hour of day at index 0. Returns parallel arrays
+    (start_idx, avg_aqi, max_aqi, weather_score, overall_score) for the windows
+    taken, plus the AQI-only score of every hour for fallback ranking.
+    """
+    n = aqi.shape[0]
+    # A non-positive window has no valid runs (and would never advance the scan)
+    size = max(n - window + 1, 0) if window >= 1 else 0
+    start_idx = np.empty(size, dtype=np.int64)
+    avg_aqi = np.empty(size)
+    max_aqi = np.empty(size)
+    weather_score = np.empty(size)
+    overall_score = np.empty(size)
+    
+    # Prefix sums for window means, and the simple per-hour AQI score, in one pass
+    csum = np.empty(n + 1)
+    csum[0] = 0.0
+    hourly_score = np.empty(n)
+    for i in range(n):
+        csum[i + 1] = csum[i] + aqi[i]
+        hourly_score[i] = (200 - aqi[i]) / 200
+        
+    if size == 0:
+        return start_idx, avg_aqi, max_aqi, weather_score, overall_score, hourly_score
+        
+    rolling_max = _rolling_max(aqi, window)
+    
+    k = 0
+    i = 0
+    while i < size:
+        if rolling_max[i] < threshold:
+            # Window meets AQI criteria
+            avg = (csum[i + window] - csum[i]) / window
+            
+            end = min(i + window, hourly_weather.shape[0])
+            if end > i:
+                total = 0.0
+                for j in range(i, end):
+                    total += hourly_weather[j]
+                weather = total / (end - i)
+            else:
+                weather = 0.5  # Neutral score if no data
+                
+            # Weights: AQI 40%, weather 30%, time preference 20%, circadian 10%
+            hour = (start_hour + i) % 24
+            start_idx[k] = i
+            avg_aqi[k] = avg
+            max_aqi[k] = rolling_max[i]
+            weather_score[k] = weather
+            overall_score[k] = ((1.0 - avg / 200) * 0.4 + weather * 0.3
+                                + time_lut[hour] * 0.2 + circadian_lut[hour] * 0.1)
+            k += 1
+            
+            # Skip ahead to avoid overlapping windows
+            i += window
+        else:
+            i += 1
+            
+    return start_idx[:k], avg_aqi[:k], max_aqi[:k], weather_score[:k], overall_score[:k], hourly_score
+
+
+def _top_k(scores: np.ndarray, k: int) -> List[int]:
+    """
+    Indices of the k highest scores, best first, with ties in index order
+    
+    Partitions in O(N) and sorts only the candidates at or above the k-th
+    score (ties included, so the result matches a full stable sort).
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return []
+    if k < len(scores):
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')][:k].tolist()
+
+
+def _forecast_to_arrays(aqi_forecast: List[Dict]) -> Dict[str, np.ndarray]:
+    """Convert hourly forecast dicts to structure-of-arrays form, one array per field"""
+    n = len(aqi_forecast)
+    return {
+        'aqi': np.fromiter((f['aqi'] for f in aqi_forecast), dtype=np.float64, count=n),
+        'pm25': np.fromiter((f.get('pm25', 0) for f in aqi_forecast), dtype=np.float64, count=n),
+    }
+
+
+def _run_coroutine(coro):
+    """
+    Run a coroutine to completion from synchronous code
+    
+    asyncio.run cannot be called from a thread that already runs an event
+    loop, so in that case the coroutine gets its own loop in a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+@dataclass(frozen=True)
 class WeatherConditions:
     """Weather conditions for a time period"""
+    __slots__ = ('temperature', 'humidity', 'wind_speed', 'uv_index', 'precipitation_probability', 'visibility')
+    
     temperature: float
     humidity: float
     wind_speed: float
@@ -25,6 +211,29 @@ class WeatherConditions:
     visibility: float
     
 
+@dataclass
+class WeatherForecast:
+    """Hourly weather forecast stored as one array per field (index = hour offset)"""
+    temperature: np.ndarray
+    humidity: np.ndarray
+    wind_speed: np.ndarray
+    uv_index: np.ndarray
+    precipitation_probability: np.ndarray
+    visibility: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.temperature)
+        
+    def __getitem__(self, hours: slice) -> 'WeatherForecast':
+        """Slice every field to the same range of hours"""
+        return WeatherForecast(*(getattr(self, f.name)[hours] for f in fields(self)))
+        
+    def __iter__(self):
+        """Per-hour WeatherConditions, built only when something iterates"""
+        columns = (getattr(self, f.name).tolist() for f in fields(self))
+        return (WeatherConditions(*values) for values in zip(*columns))
+        
+
 class TimeWindowOptimizer:
     """
     Finds optimal time windows for running based on:
@@ -34,8 +243,13 @@ class TimeWindowOptimizer:
     - Historical patterns
     """
     
-    def __init__(self, air_quality_service: AirQualityService):
+    def __init__(
+        self,
+        air_quality_service: AirQualityService,
+        rng: Optional[np.random.Generator] = None
+    ):
         self.air_quality_service = air_quality_service
+        self._risk_calc = HealthRiskCalculator()
         
         # Ideal conditions for running
         self.ideal_conditions = {
@@ -46,6 +260,9 @@ class TimeWindowOptimizer:
             'precipitation': 0.2      # Max 20% chance
         }
         
+        # Random source for simulated weather; pass a seeded rng for reproducible runs
+        self._rng = rng or np.random.default_rng()
+        
     def find_optimal_windows(
         self,
         location: Tuple[float, float],
@@ -69,309 +286,268 @@ class TimeWindowOptimizer:
         """
         logger.info(f"Finding optimal windows for {duration_minutes}min run in next {lookahead_hours}h")
         
+        # One clock reading is the origin of both forecasts and every window
+        current_time = datetime.now()
+        
         # Get air quality forecast
-        aqi_forecast = self.air_quality_service.get_forecast(location, lookahead_hours)
+        # (converted once to arrays that the window search and fallback index directly)
+        aqi_forecast = _forecast_to_arrays(
+            self.air_quality_service.get_forecast(location, lookahead_hours)
+        )
         
         # Get weather forecast (would integrate with weather API)
-        weather_forecast = self._get_weather_forecast(location, lookahead_hours)
+        weather_forecast = self._get_weather_forecast(location, lookahead_hours, start_time=current_time)
+        
+        return self.find_optimal_windows_in_range(
+            aqi_forecast['aqi'],
+            weather_forecast,
+            0,
+            lookahead_hours,
+            user_profile,
+            duration_minutes,
+            min_windows,
+            current_time=current_time
+        )
+        
+    def find_optimal_windows_in_range(
+        self,
+        aqi: np.ndarray,
+        weather_forecast: WeatherForecast,
+        offset_hours: int,
+        window_hours: int,
+        user_profile: UserProfile,
+        duration_minutes: int,
+        min_windows: int = 3,
+        current_time: Optional[datetime] = None
+    ) -> List[TimeWindow]:
+        """
+        Find optimal time windows within an already fetched forecast
+        
+        Args:
+            aqi: Hourly AQI forecast starting at current_time
+            weather_forecast: Hourly weather forecast starting at current_time
+            offset_hours: First forecast hour to consider
+            window_hours: Number of forecast hours to consider from offset_hours
+            user_profile: User health and preferences
+            duration_minutes: Planned activity duration
+            min_windows: Minimum number of windows to return
+            current_time: Time of forecast hour 0 (defaults to now)
+            
+        Returns:
+            List of optimal time windows ranked by quality
+        """
+        if current_time is None:
+            current_time = datetime.now()
+            
+        # Window times are relative to the first hour of the range
+        range_start = current_time + timedelta(hours=offset_hours)
+        aqi = aqi[offset_hours:offset_hours + window_hours]
+        weather_forecast = weather_forecast[offset_hours:offset_hours + window_hours]
         
         # Calculate personalized AQI threshold
-        from ..core.health_risk import HealthRiskCalculator
-        risk_calc = HealthRiskCalculator()
-        aqi_threshold = risk_calc.calculate_personal_threshold(user_profile, 'moderate')
+        aqi_threshold = self._risk_calc.calculate_personal_threshold(user_profile, 'moderate')
         
-        # Find candidate windows
-        candidate_windows = self._identify_candidate_windows(
-            aqi_forecast,
+        # Find candidate windows, scored in the same compiled pass that also
+        # scores every hour for the fallback
+        candidates, hourly_scores = self._identify_candidate_windows(
+            aqi,
             weather_forecast,
             aqi_threshold,
-            duration_minutes
+            duration_minutes,
+            self._time_preference_lut(user_profile),
+            range_start.hour
         )
         
-        # Score and rank windows
-        scored_windows = self._score_windows(
-            candidate_windows,
-            user_profile,
-            weather_forecast
-        )
+        # Rank windows, keeping only the best min_windows
+        scored_windows = self._score_windows(candidates, range_start, min_windows)
         
         # Ensure minimum windows
         if len(scored_windows) < min_windows:
             # Add suboptimal windows if necessary
             scored_windows.extend(
                 self._find_fallback_windows(
-                    aqi_forecast,
-                    weather_forecast,
-                    min_windows - len(scored_windows)
+                    aqi,
+                    hourly_scores,
+                    min_windows - len(scored_windows),
+                    range_start
                 )
             )
             
-        return scored_windows[:min_windows]
+        return scored_windows
         
     def _identify_candidate_windows(
         self,
-        aqi_forecast: List[Dict],
-        weather_forecast: List[WeatherConditions],
+        aqi: np.ndarray,
+        weather_forecast: WeatherForecast,
         aqi_threshold: float,
-        duration_minutes: int
-    ) -> List[Dict]:
-        """Identify continuous time windows meeting criteria"""
-        
-        windows = []
-        duration_hours = np.ceil(duration_minutes / 60)
+        duration_minutes: int,
+        time_lut: np.ndarray,
+        start_hour: int
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """
+        Identify continuous time windows meeting criteria
         
-        i = 0
-        while i < len(aqi_forecast) - duration_hours + 1:
-            # Check if window meets AQI criteria
-            window_aqi = [aqi_forecast[j]['aqi'] for j in range(i, i + int(duration_hours))]
-            
-            if all(aqi < aqi_threshold for aqi in window_aqi):
-                # Window meets AQI criteria
-                window = {
-                    'start_idx': i,
-                    'end_idx': i + int(duration_hours),
-                    'avg_aqi': np.mean(window_aqi),
-                    'max_aqi': max(window_aqi),
-                    'weather_score': self._calculate_weather_score(
-                        weather_forecast[i:i + int(duration_hours)]
-                    )
-                }
-                windows.append(window)
-                
-                # Skip ahead to avoid overlapping windows
-                i += int(duration_hours)
-            else:
-                i += 1
-                
-        return windows
+        Returns one array per window field (start/end index, AQI stats, the
+        score components and the weighted overall score), and the AQI-only
+        score of every forecast hour.
+        """
+        duration_hours = math.ceil(duration_minutes / 60)
+        if duration_hours < 1:
+            raise ValueError(f"duration_minutes must be positive, got {duration_minutes}")
+        
+        start_idx, avg_aqi, max_aqi, weather_score, overall_score, hourly_scores = _scan_windows(
+            np.ascontiguousarray(aqi, dtype=np.float64),
+            np.ascontiguousarray(self._hourly_weather_scores(weather_forecast), dtype=np.float64),
+            float(aqi_threshold),
+            duration_hours,
+            start_hour,
+            time_lut,
+            _CIRCADIAN_LUT
+        )
+        start_hours = (start_hour + start_idx) % 24
+        
+        return {
+            'start_idx': start_idx,
+            'end_idx': start_idx + duration_hours,
+            'avg_aqi': avg_aqi,
+            'max_aqi': max_aqi,
+            'aqi_score': 1.0 - (avg_aqi / 200),  # Normalize to 200 AQI
+            'weather_score': weather_score,
+            'time_preference': time_lut[start_hours],
+            'circadian_score': _CIRCADIAN_LUT[start_hours],
+            'overall_score': overall_score
+        }, hourly_scores
         
     def _score_windows(
         self,
-        windows: List[Dict],
-        user_profile: UserProfile,
-        weather_forecast: List[WeatherConditions]
+        windows: Dict[str, np.ndarray],
+        current_time: datetime,
+        num_windows: int
     ) -> List[TimeWindow]:
-        """Score and rank time windows"""
+        """Rank scored candidate windows and build TimeWindow objects for the top num_windows"""
         
-        scored_windows = []
-        current_time = datetime.now()
+        order = _top_k(windows['overall_score'], num_windows)
         
-        for window in windows:
-            start_time = current_time + timedelta(hours=window['start_idx'])
-            end_time = current_time + timedelta(hours=window['end_idx'])
-            
-            # Calculate comprehensive score
-            score = 0
-            
-            # AQI score (lower is better, normalize to 0-1)
-            aqi_score = 1.0 - (window['avg_aqi'] / 200)  # Normalize to 200 AQI
-            score += aqi_score * 0.4  # 40% weight
-            
-            # Weather score (already 0-1)
-            score += window['weather_score'] * 0.3  # 30% weight
-            
-            # Time preference score
-            time_score = self._calculate_time_preference_score(
-                start_time,
-                user_profile
-            )
-            score += time_score * 0.2  # 20% weight
-            
-            # Circadian rhythm score
-            circadian_score = self._calculate_circadian_score(start_time.hour)
-            score += circadian_score * 0.1  # 10% weight
-            
-            # Create TimeWindow object
-            time_window = TimeWindow(
-                start=start_time,
-                end=end_time,
-                avg_aqi=window['avg_aqi'],
-                weather_score=window['weather_score'],
+        columns = {name: values.tolist() for name, values in windows.items()}
+        factor_names = ('aqi_score', 'weather_score', 'time_preference', 'circadian_score', 'overall_score')
+        
+        return [
+            TimeWindow(
+                start=current_time + timedelta(hours=columns['start_idx'][i]),
+                end=current_time + timedelta(hours=columns['end_idx'][i]),
+                avg_aqi=columns['avg_aqi'][i],
+                weather_score=columns['weather_score'][i],
                 confidence=0.8,  # Forecast confidence
-                factors={
-                    'aqi_score': aqi_score,
-                    'weather_score': window['weather_score'],
-                    'time_preference': time_score,
-                    'circadian_score': circadian_score,
-                    'overall_score': score
-                }
+                factors={name: columns[name][i] for name in factor_names}
             )
-            scored_windows.append(time_window)
-            
-        # Sort by overall score (descending)
-        scored_windows.sort(key=lambda x: x.factors['overall_score'], reverse=True)
+            for i in order
+        ]
         
-        return scored_windows
+    def _hourly_weather_scores(self, weather: WeatherForecast) -> np.ndarray:
+        """Weather quality score (0-1) for every hour of the forecast at once"""
         
-    def _calculate_weather_score(self, weather_conditions: List[WeatherConditions]) -> float:
-        """Calculate weather quality score (0-1)"""
+        temp_lo, temp_hi = self.ideal_conditions['temperature']
+        humidity_lo, humidity_hi = self.ideal_conditions['humidity']
         
-        if not weather_conditions:
-            return 0.5  # Neutral score if no data
-            
-        scores = []
+        # Temperature score: 1 inside the ideal range, penalized by deviation outside
+        temp = weather.temperature
+        temp_score = np.clip(1 - np.maximum(temp_lo - temp, temp - temp_hi) / 10, 0, 1)
         
-        for conditions in weather_conditions:
-            score = 1.0
-            
-            # Temperature score
-            temp = conditions.temperature
-            if self.ideal_conditions['temperature'][0] <= temp <= self.ideal_conditions['temperature'][1]:
-                temp_score = 1.0
-            else:
-                # Penalize based on deviation
-                if temp < self.ideal_conditions['temperature'][0]:
-                    temp_score = max(0, 1 - (self.ideal_conditions['temperature'][0] - temp) / 10)
-                else:
-                    temp_score = max(0, 1 - (temp - self.ideal_conditions['temperature'][1]) / 10)
-            score *= temp_score
-            
-            # Humidity score
-            humidity = conditions.humidity
-            if self.ideal_conditions['humidity'][0] <= humidity <= self.ideal_conditions['humidity'][1]:
-                humidity_score = 1.0
-            else:
-                humidity_score = max(0, 1 - abs(humidity - 50) / 50)
-            score *= humidity_score
-            
-            # Wind score
-            wind = conditions.wind_speed
-            if wind <= self.ideal_conditions['wind_speed'][1]:
-                wind_score = 1.0 - (wind / 30)  # Gradually decrease
-            else:
-                wind_score = 0.3  # High wind penalty
-            score *= wind_score
-            
-            # Precipitation penalty
-            if conditions.precipitation_probability > self.ideal_conditions['precipitation']:
-                score *= (1 - conditions.precipitation_probability)
-                
-            # UV index consideration
-            if conditions.uv_index > self.ideal_conditions['uv_index'][1]:
-                score *= 0.7  # High UV penalty
-                
-            scores.append(score)
-            
-        return np.mean(scores)
+        # Humidity score
+        humidity = weather.humidity
+        humidity_score = np.where(
+            (humidity_lo <= humidity) & (humidity <= humidity_hi),
+            1.0,
+            np.maximum(0, 1 - np.abs(humidity - 50) / 50)
+        )
         
-    def _calculate_time_preference_score(
-        self,
-        start_time: datetime,
-        user_profile: UserProfile
-    ) -> float:
-        """Calculate score based on user's time preferences"""
+        # Wind score: gradually decrease, with a high wind penalty
+        wind = weather.wind_speed
+        wind_score = np.where(wind <= self.ideal_conditions['wind_speed'][1], 1.0 - wind / 30, 0.3)
+        
+        # Precipitation penalty
+        precip = weather.precipitation_probability
+        precip_factor = np.where(precip > self.ideal_conditions['precipitation'], 1 - precip, 1.0)
+        
+        # UV index consideration (high UV penalty)
+        uv_factor = np.where(weather.uv_index > self.ideal_conditions['uv_index'][1], 0.7, 1.0)
+        
+        return (temp_score * humidity_score * wind_score * precip_factor * uv_factor).astype(np.float64)
+        
+    def _time_preference_lut(self, user_profile: UserProfile) -> np.ndarray:
+        """Hour-of-day lookup table for the user's preferred running time"""
         
-        hour = start_time.hour
         preferred_time = getattr(user_profile, 'preferred_time_of_day', 'morning')
+        return _TIME_PREFERENCE_LUTS.get(preferred_time, _ANY_TIME_LUT)
         
-        if preferred_time == 'morning':
-            if 5 <= hour <= 9:
-                return 1.0
-            elif 9 < hour <= 11:
-                return 0.7
-            else:
-                return 0.3
-                
-        elif preferred_time == 'evening':
-            if 17 <= hour <= 20:
-                return 1.0
-            elif 15 <= hour < 17:
-                return 0.7
-            else:
-                return 0.3
-                
-        elif preferred_time == 'afternoon':
-            if 12 <= hour <= 16:
-                return 1.0
-            elif 10 <= hour < 12 or 16 < hour <= 18:
-                return 0.7
-            else:
-                return 0.3
-                
-        else:  # any time
-            return 0.8
-            
-    def _calculate_circadian_score(self, hour: int) -> float:
-        """Calculate score based on circadian rhythm for exercise"""
-        
-        # Optimal exercise times based on circadian biology
-        if 6 <= hour <= 8:  # Early morning
-            return 0.9
-        elif 16 <= hour <= 19:  # Late afternoon/early evening
-            return 1.0  # Peak performance time
-        elif 9 <= hour <= 11:  # Mid-morning
-            return 0.8
-        elif 14 <= hour <= 16:  # Mid-afternoon
-            return 0.7
-        elif 5 <= hour < 6 or 19 < hour <= 20:  # Very early/late
-            return 0.5
-        else:  # Night time
-            return 0.2
-            
     def _get_weather_forecast(
         self,
         location: Tuple[float, float],
-        hours: int
-    ) -> List[WeatherConditions]:
+        hours: int,
+        rng: Optional[np.random.Generator] = None,
+        start_time: Optional[datetime] = None
+    ) -> WeatherForecast:
         """
         Get weather forecast
         Note: This would integrate with a weather API
+        
+        Pass a seeded rng for reproducible simulated weather; it defaults to the
+        optimizer's own generator. start_time is the time of forecast hour 0
+        (defaults to now).
         """
+        rng = rng or self._rng
+        if start_time is None:
+            start_time = datetime.now()
+        
         # Placeholder implementation
         # In production, this would call OpenWeatherMap or similar
-        forecast = []
+        # Simulate all hours at once, one array per field
+        offset = np.arange(hours)
+        hour_of_day = (start_time.hour + offset) % 24
+        
+        # Simple temperature model
+        temperature = np.select(
+            [(6 <= hour_of_day) & (hour_of_day <= 10), (11 <= hour_of_day) & (hour_of_day <= 16)],
+            [15 + offset * 0.5, 20 + (16 - hour_of_day) * 0.5],
+            default=15 - (hour_of_day - 16) * 0.3
+        )
         
-        for i in range(hours):
-            # Simulate weather conditions
-            hour_of_day = (datetime.now().hour + i) % 24
-            
-            # Simple temperature model
-            if 6 <= hour_of_day <= 10:
-                temp = 15 + i * 0.5
-            elif 11 <= hour_of_day <= 16:
-                temp = 20 + (16 - hour_of_day) * 0.5
-            else:
-                temp = 15 - (hour_of_day - 16) * 0.3
-                
-            conditions = WeatherConditions(
-                temperature=temp,
-                humidity=50 + np.random.normal(0, 10),
-                wind_speed=10 + np.random.normal(0, 5),
-                uv_index=max(0, 5 * np.sin(np.pi * hour_of_day / 24)),
-                precipitation_probability=0.1,
-                visibility=10
-            )
-            forecast.append(conditions)
-            
-        return forecast
+        return WeatherForecast(
+            temperature=temperature,
+            humidity=50 + rng.normal(0, 10, hours),
+            wind_speed=10 + rng.normal(0, 5, hours),
+            uv_index=np.maximum(0, 5 * np.sin(np.pi * hour_of_day / 24)),
+            precipitation_probability=np.full(hours, 0.1),
+            visibility=np.full(hours, 10.0)
+        )
         
     def _find_fallback_windows(
         self,
-        aqi_forecast: List[Dict],
-        weather_forecast: List[WeatherConditions],
-        num_windows: int
+        aqi: np.ndarray,
+        hourly_scores: np.ndarray,
+        num_windows: int,
+        current_time: datetime
     ) -> List[TimeWindow]:
         """Find suboptimal windows when not enough ideal windows exist"""
         
-        # Relax criteria and find best available windows
-        all_windows = []
-        current_time = datetime.now()
+        # Relax criteria and find best available windows: rank every one-hour
+        # window but the last forecast hour by its simple AQI score (already
+        # computed by the main scan)
+        hourly_aqi = aqi[:-1]
+        scores = hourly_scores[:-1]
         
-        for i in range(len(aqi_forecast) - 1):
-            score = (200 - aqi_forecast[i]['aqi']) / 200  # Simple AQI score
-            
-            all_windows.append(TimeWindow(
+        # Build TimeWindows only for the requested number of best hours
+        return [
+            TimeWindow(
                 start=current_time + timedelta(hours=i),
                 end=current_time + timedelta(hours=i+1),
-                avg_aqi=aqi_forecast[i]['aqi'],
+                avg_aqi=float(hourly_aqi[i]),
                 weather_score=0.5,  # Neutral
                 confidence=0.6,  # Lower confidence
-                factors={'overall_score': score}
-            ))
-            
-        # Sort by score and return requested number
-        all_windows.sort(key=lambda x: x.factors['overall_score'], reverse=True)
-        return all_windows[:num_windows]
+                factors={'overall_score': float(scores[i])}
+            )
+            for i in _top_k(scores, num_windows)
+        ]
         
     def suggest_weekly_schedule(
         self,
@@ -390,29 +566,96 @@ class TimeWindowOptimizer:
         Returns:
             Dictionary with daily recommendations
         """
-        schedule = {}
+        return _run_coroutine(self.suggest_weekly_schedule_async(location, user_profile, runs_per_week))
+        
+    async def suggest_weekly_schedule_async(
+        self,
+        location: Tuple[float, float],
+        user_profile: UserProfile,
+        runs_per_week: int = 3
+    ) -> Dict[str, List[TimeWindow]]:
+        """suggest_weekly_schedule with the AQI and weather fetches running concurrently in worker threads"""
+        # Get 7-day forecast once
+        current_time = datetime.now()
+        aqi_forecast, weather_forecast = await asyncio.gather(
+            asyncio.to_thread(self.air_quality_service.get_forecast, location, 7 * 24),
+            asyncio.to_thread(self._get_weather_forecast, location, 7 * 24, start_time=current_time)
+        )
+        aqi = _forecast_to_arrays(aqi_forecast)['aqi']
         
-        # Get 7-day forecast
-        windows_per_day = []
+        return self._build_weekly_schedule(aqi, weather_forecast, user_profile, runs_per_week, current_time)
         
-        for day in range(7):
-            day_windows = self.find_optimal_windows(
-                location,
-                user_profile,
+    def suggest_weekly_schedules(
+        self,
+        locations: List[Tuple[float, float]],
+        user_profile: UserProfile,
+        runs_per_week: int = 3
+    ) -> List[Dict[str, List[TimeWindow]]]:
+        """
+        Suggest weekly schedules for several running locations at once
+        
+        Every location's forecasts are fetched concurrently, so the whole batch
+        takes about as long as the slowest location.
+        
+        Args:
+            locations: Running locations
+            user_profile: User profile
+            runs_per_week: Target number of runs
+            
+        Returns:
+            One schedule per location, in the same order as locations
+        """
+        if not locations:
+            return []
+        return _run_coroutine(self._suggest_weekly_schedules_async(locations, user_profile, runs_per_week))
+        
+    async def _suggest_weekly_schedules_async(
+        self,
+        locations: List[Tuple[float, float]],
+        user_profile: UserProfile,
+        runs_per_week: int
+    ) -> List[Dict[str, List[TimeWindow]]]:
+        """Gather suggest_weekly_schedule_async over all locations"""
+        return list(await asyncio.gather(
+            *(self.suggest_weekly_schedule_async(location, user_profile, runs_per_week) for location in locations)
+        ))
+        
+    def _build_weekly_schedule(
+        self,
+        aqi: np.ndarray,
+        weather_forecast: WeatherForecast,
+        user_profile: UserProfile,
+        runs_per_week: int,
+        current_time: datetime
+    ) -> Dict[str, List[TimeWindow]]:
+        """Pick the week's run days and windows from an already fetched 7-day forecast"""
+        schedule = {}
+        
+        # Search each day's 24-hour slice of the forecast
+        windows_per_day = [
+            self.find_optimal_windows_in_range(
+                aqi,
+                weather_forecast,
+                offset_hours=day * 24,
+                window_hours=24,
+                user_profile=user_profile,
                 duration_minutes=45,  # Standard run
-                lookahead_hours=24,
-                min_windows=2
+                min_windows=2,
+                current_time=current_time
             )
-            windows_per_day.append(day_windows)
-            
+            for day in range(7)
+        ]
+        
         # Distribute runs across week
         # Prefer non-consecutive days for recovery
         selected_days = []
         day_scores = []
         
         for day, windows in enumerate(windows_per_day):
-            best_window_score = max(w.factors['overall_score'] for w in windows)
-            day_scores.append((day, best_window_score))
+            # Days beyond the end of the forecast have no windows to offer
+            if windows:
+                best_window_score = max(w.factors['overall_score'] for w in windows)
+                day_scores.append((day, best_window_score))
             
         # Sort days by best window score
         day_scores.sort(key=lambda x: x[1], reverse=True)
@@ -427,8 +670,9 @@ class TimeWindowOptimizer:
                 selected_days.append(day)
                 
         # Fill schedule
+        today = current_time.date()
         for day in range(7):
-            date = datetime.now().date() + timedelta(days=day)
+            date = today + timedelta(days=day)
             if day in selected_days:
                 schedule[date.strftime('%A')] = windows_per_day[day][:1]  # Best window
             else:
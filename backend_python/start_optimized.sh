@@ -35,6 +35,9 @@ cd "$BACKEND_DIR" || exit 1
 # Install optimized requirements
 pip install -r requirements_optimized.txt
 
+# Ahead-of-time compile the Run Coach numeric kernels (skips first-request JIT)
+python3 -m run_coach.core.build_kernels || echo "⚠️ Kernel AOT build failed, falling back to JIT"
+
 # Step 3: Set memory limits and environment variables
 echo "⚙️ Setting environment variables for optimal performance..."
 
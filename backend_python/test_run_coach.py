@@ -3,13 +3,45 @@
 Test script for Run Coach API endpoints
 """
 
+import asyncio
+import sys
 import requests
 import json
+import orjson
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Base URL for the API
 BASE_URL = "http://localhost:5001/api/run-coach"
 
+# Pretty-print full response bodies only when run with -v
+VERBOSE = "-v" in sys.argv
+
+# Fail fast instead of hanging when the backend is down or stuck
+REQUEST_TIMEOUT = 5  # seconds
+
+# One session for every test so requests reuse kept-alive connections
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/json"})
+
+# Pool room for every concurrently running test, and retry transient gateway
+# errors with backoff so a flaky first attempt isn't counted as a failure
+# (POST is included: every endpoint under test is read-only). Read timeouts
+# are not retried: the server already has the request, and re-sending a slow
+# one just multiplies the wait
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"})
+    )
+))
+
 # Test location (Rice University, Houston)
 TEST_LOCATION = {"lat": 29.7174, "lon": -95.4018}
 
@@ -32,133 +64,135 @@ TEST_PREFERENCES = {
     "prioritize_parks": True
 }
 
+# POST bodies, serialized once up front (the session sets the JSON Content-Type)
+ROUTE_BODY = orjson.dumps({
+    "location": TEST_LOCATION,
+    "user_profile": TEST_USER_PROFILE,
+    "preferences": TEST_PREFERENCES
+})
+
+OPTIMAL_TIMES_BODY = orjson.dumps({
+    "location": TEST_LOCATION,
+    "user_profile": TEST_USER_PROFILE,
+    "duration_minutes": 45,
+    "lookahead_hours": 24
+})
+
+HEALTH_RISK_BODY = orjson.dumps({
+    "user_profile": TEST_USER_PROFILE,
+    "current_aqi": 75,
+    "activity_type": "running"
+})
 
-def test_health_check():
+
+def test_health_check(log=print):
     """Test the health check endpoint"""
-    print("\n1. Testing health check endpoint...")
+    log("\n1. Testing health check endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/health-check")
-        print(f"Status: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        response = SESSION.get(f"{BASE_URL}/health-check", timeout=REQUEST_TIMEOUT)
+        log(f"Status: {response.status_code}")
+        if VERBOSE:
+            log(f"Response: {json.dumps(response.json(), indent=2)}")
         return response.status_code == 200
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}")
         return False
 
 
-def test_route_recommendation():
+def test_route_recommendation(log=print):
     """Test the route recommendation endpoint"""
-    print("\n2. Testing route recommendation endpoint...")
+    log("\n2. Testing route recommendation endpoint...")
     try:
-        payload = {
-            "location": TEST_LOCATION,
-            "user_profile": TEST_USER_PROFILE,
-            "preferences": TEST_PREFERENCES
-        }
-        
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/recommend-route",
-            json=payload,
-            headers={"Content-Type": "application/json"}
+            data=ROUTE_BODY,
+            timeout=REQUEST_TIMEOUT
         )
         
-        print(f"Status: {response.status_code}")
+        log(f"Status: {response.status_code}")
         
         if response.status_code == 200:
             data = response.json()
-            print(f"Route ID: {data['route']['id']}")
-            print(f"Distance: {data['route']['distance_m']}m")
-            print(f"Duration: {data['route']['duration_min']} min")
-            print(f"Avg AQI: {data['route']['avg_aqi']}")
-            print(f"Green Coverage: {data['route']['green_coverage'] * 100:.1f}%")
-            print(f"Safety Score: {data['route']['safety_score'] * 100:.1f}%")
-            print(f"Time Windows: {len(data['time_windows'])} found")
+            log(f"Route ID: {data['route']['id']}")
+            log(f"Distance: {data['route']['distance_m']}m")
+            log(f"Duration: {data['route']['duration_min']} min")
+            log(f"Avg AQI: {data['route']['avg_aqi']}")
+            log(f"Green Coverage: {data['route']['green_coverage'] * 100:.1f}%")
+            log(f"Safety Score: {data['route']['safety_score'] * 100:.1f}%")
+            log(f"Time Windows: {len(data['time_windows'])} found")
             return True
         else:
-            print(f"Error: {response.text}")
+            log(f"Error: {response.text}")
             return False
             
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}")
         return False
 
 
-def test_optimal_times():
+def test_optimal_times(log=print):
     """Test the optimal times endpoint"""
-    print("\n3. Testing optimal times endpoint...")
+    log("\n3. Testing optimal times endpoint...")
     try:
-        payload = {
-            "location": TEST_LOCATION,
-            "user_profile": TEST_USER_PROFILE,
-            "duration_minutes": 45,
-            "lookahead_hours": 24
-        }
-        
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/optimal-times",
-            json=payload,
-            headers={"Content-Type": "application/json"}
+            data=OPTIMAL_TIMES_BODY,
+            timeout=REQUEST_TIMEOUT
         )
         
-        print(f"Status: {response.status_code}")
+        log(f"Status: {response.status_code}")
         
         if response.status_code == 200:
             data = response.json()
-            print(f"Personal AQI Threshold: {data['personalized_threshold']}")
-            print(f"\nOptimal Time Windows:")
+            log(f"Personal AQI Threshold: {data['personalized_threshold']}")
+            log(f"\nOptimal Time Windows:")
             for window in data['optimal_windows']:
-                start = datetime.fromisoformat(window['start'].replace('Z', '+00:00'))
-                print(f"  - {start.strftime('%H:%M')} | AQI: {window['avg_aqi']} | Quality: {window['quality_rating']}")
+                start = datetime.fromisoformat(window['start'])  # Accepts a 'Z' suffix natively on 3.11+
+                log(f"  - {start.strftime('%H:%M')} | AQI: {window['avg_aqi']} | Quality: {window['quality_rating']}")
             return True
         else:
-            print(f"Error: {response.text}")
+            log(f"Error: {response.text}")
             return False
             
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}")
         return False
 
 
-def test_health_risk_assessment():
+def test_health_risk_assessment(log=print):
     """Test the health risk assessment endpoint"""
-    print("\n4. Testing health risk assessment endpoint...")
+    log("\n4. Testing health risk assessment endpoint...")
     try:
-        payload = {
-            "user_profile": TEST_USER_PROFILE,
-            "current_aqi": 75,
-            "activity_type": "running"
-        }
-        
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/health-risk-assessment",
-            json=payload,
-            headers={"Content-Type": "application/json"}
+            data=HEALTH_RISK_BODY,
+            timeout=REQUEST_TIMEOUT
         )
         
-        print(f"Status: {response.status_code}")
+        log(f"Status: {response.status_code}")
         
         if response.status_code == 200:
             data = response.json()
-            print(f"Personal Threshold: {data['personal_threshold']} AQI")
-            print(f"Current Risk Level: {data['current_risk_level']}")
-            print(f"Exposure Budget:")
+            log(f"Personal Threshold: {data['personal_threshold']} AQI")
+            log(f"Current Risk Level: {data['current_risk_level']}")
+            log(f"Exposure Budget:")
             budget = data['exposure_budget']
-            print(f"  - Daily Limit: {budget['daily_limit']}")
-            print(f"  - Weekly Limit: {budget['weekly_limit']}")
-            print(f"  - Current Usage: {budget['usage_percentage']:.1f}%")
+            log(f"  - Daily Limit: {budget['daily_limit']}")
+            log(f"  - Weekly Limit: {budget['weekly_limit']}")
+            log(f"  - Current Usage: {budget['usage_percentage']:.1f}%")
             return True
         else:
-            print(f"Error: {response.text}")
+            log(f"Error: {response.text}")
             return False
             
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}")
         return False
 
 
-def test_pollution_heatmap():
+def test_pollution_heatmap(log=print):
     """Test the pollution heatmap endpoint"""
-    print("\n5. Testing pollution heatmap endpoint...")
+    log("\n5. Testing pollution heatmap endpoint...")
     try:
         params = {
             "lat": TEST_LOCATION["lat"],
@@ -167,29 +201,52 @@ def test_pollution_heatmap():
             "pollutant": "aqi"
         }
         
-        response = requests.get(
+        response = SESSION.get(
             f"{BASE_URL}/pollution-heatmap",
-            params=params
+            params=params,
+            timeout=REQUEST_TIMEOUT
         )
         
-        print(f"Status: {response.status_code}")
+        log(f"Status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
-            print(f"Pollutant: {data['pollutant']}")
-            print(f"Resolution: {data['resolution']}m")
-            print(f"Grid Points: {len(data['values'])}x{len(data['values'][0]) if data['values'] else 0}")
-            print(f"Timestamp: {data.get('timestamp', 'N/A')}")
+            data = orjson.loads(response.content)
+            log(f"Pollutant: {data['pollutant']}")
+            log(f"Resolution: {data['resolution']}m")
+            log(f"Grid Points: {len(data['values'])}x{len(data['values'][0]) if data['values'] else 0}")
+            log(f"Timestamp: {data.get('timestamp', 'N/A')}")
             return True
         else:
-            print(f"Error: {response.text}")
+            log(f"Error: {response.text}")
             return False
             
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}")
         return False
 
 
+async def _run_concurrently(tests):
+    """
+    Run the tests side by side in worker threads
+    
+    Each test logs into its own buffer so the outputs don't interleave, and a
+    test's output is printed as soon as it finishes; returns pass/fail per
+    test, in completion order.
+    """
+    async def run(test):
+        output = []
+        passed = await asyncio.to_thread(test, output.append)
+        return passed, output
+        
+    results = []
+    for finished in asyncio.as_completed([run(test) for test in tests]):
+        passed, output = await finished
+        print("\n".join(output))
+        print("-" * 60)
+        results.append(passed)
+    return results
+
+
 def main():
     """Run all tests"""
     print("=" * 60)
@@ -197,23 +254,26 @@ def main():
     print("=" * 60)
     
     tests = [
-        test_health_check,
         test_route_recommendation,
         test_optimal_times,
         test_health_risk_assessment,
         test_pollution_heatmap
     ]
     
-    results = []
-    for test in tests:
-        results.append(test())
-        print("-" * 60)
+    # A failed health check almost always means the backend is down, so skip
+    # the rest rather than wait on each of them to fail
+    results = [test_health_check()]
+    print("-" * 60)
+    if results[0]:
+        results += asyncio.run(_run_concurrently(tests))
+    else:
+        print("Backend down, skipping the remaining tests")
     
     # Summary
     print("\nTest Summary:")
     print("=" * 60)
     passed = sum(results)
-    total = len(results)
+    total = 1 + len(tests)
     print(f"Passed: {passed}/{total} ({passed/total*100:.0f}%)")
     
     if passed == total:
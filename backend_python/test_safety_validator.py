@@ -0,0 +1,107 @@
+"""
+Unit tests for the streaming health insight safety validator
+
+Runs without the Flask server: python test_safety_validator.py (or pytest)
+"""
+import random
+
+from insights.safety_validator import HealthInsightValidator
+
+validator = HealthInsightValidator()
+
+SAFE_TEXTS = [
+    "Your sleep was steady this week. Keep the same bedtime and add a short walk after dinner.",
+    "Your heart rate dipped overnight, which is a good sign of recovery.",
+    "Readings look abnormal compared to last month, with a possible sleep disorder pattern. "
+    "People suffering from poor sleep may see a disease-like pattern; a diagnosis is not possible here.",
+    "Your chest pain note and irregular heartbeat readings stand out this week.",
+    "This is wellness guidance, not medical advice. Your steps went up by 12%.",
+    "  Leading spaces and\nline breaks\nare kept   consistent  ",
+    "Your activity was high every day. " * 30,
+]
+
+# Each definitive statement, including multi-word ones that can straddle chunks
+UNSAFE_TEXTS = [
+    "Based on your data you have diabetes and should rest.",
+    "The diagnosis of asthma is clear from these readings.",
+    "Sadly, this indicates heart disease in your history.",
+    "I am sorry, but your condition is getting worse.",
+    "You Have insomnia according to these numbers.",
+]
+
+
+def _stream(chunks):
+    warnings = []
+    text = ''.join(validator.validate_stream(iter(chunks), warnings))
+    return text, warnings
+
+
+def _every_split(text):
+    for i in range(len(text) + 1):
+        yield [text[:i], text[i:]]
+
+
+def _random_splits(text, count=50, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 12))))
+        bounds = [0] + cuts + [len(text)]
+        yield [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def test_stream_matches_validate_insight_at_every_split():
+    """Streaming any split of the text yields exactly what validate_insight returns"""
+    for text in SAFE_TEXTS:
+        is_safe, expected, expected_warnings = validator.validate_insight(text)
+        assert is_safe
+        for chunks in list(_every_split(text)) + list(_random_splits(text)):
+            streamed, warnings = _stream(chunks)
+            assert streamed == expected, (chunks, streamed, expected)
+            assert warnings == expected_warnings
+
+
+def test_stream_word_by_word():
+    for text in SAFE_TEXTS:
+        expected = validator.validate_insight(text)[1]
+        chunks = [word + ' ' for word in text.split(' ')]
+        chunks[-1] = chunks[-1][:-1]
+        assert _stream(chunks)[0] == expected
+
+
+def test_definitive_statement_split_across_chunks_is_blocked():
+    """A definitive pattern is caught wherever the chunk boundaries fall"""
+    for text in UNSAFE_TEXTS:
+        assert not validator.validate_insight(text)[0]
+        for chunks in list(_every_split(text)) + list(_random_splits(text)):
+            streamed, warnings = _stream(chunks)
+            assert streamed.endswith(validator.STREAM_FALLBACK), (chunks, streamed)
+            assert any('CRITICAL' in w for w in warnings)
+            # Nothing from the definitive statement itself leaks out before the fallback
+            leaked = streamed[:-len(validator.STREAM_FALLBACK)].lower()
+            for pattern in validator.DEFINITIVE_PATTERNS:
+                assert not pattern.search(leaked), (chunks, leaked)
+            assert 'your data shows' not in leaked and 'observation' not in leaked
+
+
+def test_definitive_statement_held_back_until_ruled_out():
+    """A trailing phrase that may become a definitive statement is not emitted early"""
+    fragments = list(validator.validate_stream(iter(["Based on your data you have ", "diabetes."])))
+    assert fragments[0] == "Based on your data"
+    assert fragments[-1] == validator.STREAM_FALLBACK
+
+
+def test_empty_stream():
+    assert _stream([])[0] == validator.validate_insight('')[1]
+
+
+def main():
+    """Run all tests"""
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n=== All Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
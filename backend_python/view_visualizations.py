@@ -1,9 +1,31 @@
 #!/usr/bin/env python3
 """Quick viewer for pollution visualizations"""
 
-import webbrowser
 import os
-from PIL import Image
+import subprocess
+import sys
+import threading
+import webbrowser
+from pathlib import Path
+
+
+def open_native(path):
+    """Hand a file on disk straight to the OS default viewer"""
+    if sys.platform == "darwin":
+        subprocess.Popen(["open", str(path)])
+    elif os.name == "nt":
+        os.startfile(path)
+    else:
+        subprocess.Popen(["xdg-open", str(path)])
+
+
+def open_visualization(path):
+    """Open a visualization without waiting on it: HTML in a new browser tab, anything else natively"""
+    if path.suffix == ".html":
+        webbrowser.open(f"file://{path}", new=2)
+    else:
+        open_native(path)
+
 
 print("🌡️  HealthMap AI - Pollution Visualization Viewer\n")
 
@@ -14,9 +36,16 @@ files = {
     "3D Surface Plot": "pollution_heatmap_3d.html"
 }
 
+# Absolute path of each visualization, or None if it hasn't been generated;
+# checked once here and reused by every menu choice
+resolved = {
+    name: (Path(filename).resolve() if Path(filename).exists() else None)
+    for name, filename in files.items()
+}
+
 print("Available visualizations:")
-for i, (name, filename) in enumerate(files.items(), 1):
-    if os.path.exists(filename):
+for i, (name, path) in enumerate(resolved.items(), 1):
+    if path:
         print(f"  {i}. {name} ✅")
     else:
         print(f"  {i}. {name} ❌ (not found)")
@@ -31,24 +60,27 @@ print("  0 - Exit")
 choice = input("\nEnter your choice (0-4): ")
 
 if choice == "1":
-    if os.path.exists(files["Static Heatmap"]):
-        Image.open(files["Static Heatmap"]).show()
+    if resolved["Static Heatmap"]:
+        open_native(resolved["Static Heatmap"])
         print("✅ Opening static heatmap...")
 elif choice == "2":
-    if os.path.exists(files["Interactive Map"]):
-        webbrowser.open(f"file://{os.path.abspath(files['Interactive Map'])}")
+    if resolved["Interactive Map"]:
+        webbrowser.open(f"file://{resolved['Interactive Map']}")
         print("✅ Opening interactive map in browser...")
 elif choice == "3":
-    if os.path.exists(files["3D Surface Plot"]):
-        webbrowser.open(f"file://{os.path.abspath(files['3D Surface Plot'])}")
+    if resolved["3D Surface Plot"]:
+        webbrowser.open(f"file://{resolved['3D Surface Plot']}")
         print("✅ Opening 3D visualization in browser...")
 elif choice == "4":
     print("✅ Opening all visualizations...")
-    if os.path.exists(files["Static Heatmap"]):
-        Image.open(files["Static Heatmap"]).show()
-    if os.path.exists(files["Interactive Map"]):
-        webbrowser.open(f"file://{os.path.abspath(files['Interactive Map'])}")
-    if os.path.exists(files["3D Surface Plot"]):
-        webbrowser.open(f"file://{os.path.abspath(files['3D Surface Plot'])}")
+    # Launch every viewer at once so a slow one doesn't hold up the others
+    launchers = [
+        threading.Thread(target=open_visualization, args=(path,))
+        for path in resolved.values() if path
+    ]
+    for launcher in launchers:
+        launcher.start()
+    for launcher in launchers:
+        launcher.join()
 else:
     print("Exiting...")
\ No newline at end of file
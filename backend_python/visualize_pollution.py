@@ -1,14 +1,69 @@
 #!/usr/bin/env python3
 """Visualize pollution heatmap data"""
 
+import hashlib
+import sys
+import time
+from pathlib import Path
+
 import requests
 import numpy as np
-import json
+import orjson
+from numba import njit, prange
 
 # Rice University location
 TEST_LOCATION = {"lat": 29.7174, "lon": -95.4018}
 
-print("Fetching pollution heatmap data...")
+HEATMAP_URL = "http://localhost:5001/api/run-coach/pollution-heatmap"
+
+# Responses are reused across runs for an hour, keyed by the query params
+CACHE_DIR = Path(".cache")
+CACHE_TTL_SECONDS = 3600
+
+@njit(parallel=True, fastmath=True, cache=True)
+def summarize_grid(values, high, low):
+    """
+    Min, max, mean, population std and the counts of cells above high and
+    below low for a 2D grid, in a single pass split across rows by thread
+    """
+    n_rows, n_cols = values.shape
+    # Sums are taken around the first value to keep the variance well conditioned
+    shift = np.float64(values[0, 0])
+    row_min = np.empty(n_rows)
+    row_max = np.empty(n_rows)
+    row_sum = np.empty(n_rows)
+    row_sumsq = np.empty(n_rows)
+    row_high = np.empty(n_rows, dtype=np.int64)
+    row_low = np.empty(n_rows, dtype=np.int64)
+    
+    for r in prange(n_rows):
+        mn = np.float64(values[r, 0])
+        mx = mn
+        s = 0.0
+        ss = 0.0
+        nh = 0
+        nl = 0
+        for c in range(n_cols):
+            x = np.float64(values[r, c])
+            mn = min(mn, x)
+            mx = max(mx, x)
+            d = x - shift
+            s += d
+            ss += d * d
+            nh += x > high
+            nl += x < low
+        row_min[r] = mn
+        row_max[r] = mx
+        row_sum[r] = s
+        row_sumsq[r] = ss
+        row_high[r] = nh
+        row_low[r] = nl
+        
+    n = n_rows * n_cols
+    mean_d = row_sum.sum() / n
+    std = np.sqrt(max(row_sumsq.sum() / n - mean_d * mean_d, 0.0))
+    return row_min.min(), row_max.max(), shift + mean_d, std, row_high.sum(), row_low.sum()
+
 
 params = {
     "lat": TEST_LOCATION["lat"],
@@ -17,49 +72,69 @@ params = {
     "pollutant": "aqi"
 }
 
-response = requests.get(
-    "http://localhost:5001/api/run-coach/pollution-heatmap",
-    params=params
-)
+cache_key = hashlib.sha1(orjson.dumps(params, option=orjson.OPT_SORT_KEYS)).hexdigest()
+meta_path = CACHE_DIR / f"heatmap_{cache_key}.json"
+grid_path = CACHE_DIR / f"heatmap_{cache_key}.f32"
 
-if response.status_code == 200:
-    data = response.json()
-    
-    print(f"\nPollution Heatmap Summary:")
-    print(f"Bounds: ({data['bounds']['min_lat']:.4f}, {data['bounds']['min_lon']:.4f}) to ({data['bounds']['max_lat']:.4f}, {data['bounds']['max_lon']:.4f})")
-    print(f"Resolution: {data['resolution']}m")
-    print(f"Grid size: {len(data['values'])}x{len(data['values'][0])}")
-    
-    # Convert to numpy array for analysis
-    values = np.array(data['values'])
-    
-    print(f"\nAQI Statistics:")
-    print(f"Min AQI: {np.min(values):.1f}")
-    print(f"Max AQI: {np.max(values):.1f}")
-    print(f"Mean AQI: {np.mean(values):.1f}")
-    print(f"Std Dev: {np.std(values):.1f}")
-    
-    # Find high pollution zones (AQI > 80)
-    high_pollution = np.where(values > 80)
-    print(f"\nHigh pollution zones (AQI > 80): {len(high_pollution[0])} grid points")
-    
-    # Find clean zones (AQI < 40)
-    clean_zones = np.where(values < 40)
-    print(f"Clean zones (AQI < 40): {len(clean_zones[0])} grid points")
-    
-    # Sample some high pollution coordinates
-    if len(high_pollution[0]) > 0:
-        print("\nSample high pollution locations:")
-        for i in range(min(3, len(high_pollution[0]))):
-            row = high_pollution[0][i]
-            col = high_pollution[1][i]
-            lat = data['bounds']['min_lat'] + (row / len(values)) * (data['bounds']['max_lat'] - data['bounds']['min_lat'])
-            lon = data['bounds']['min_lon'] + (col / len(values[0])) * (data['bounds']['max_lon'] - data['bounds']['min_lon'])
-            print(f"  - ({lat:.4f}, {lon:.4f}): AQI = {values[row, col]:.1f}")
-    
-    print("\n✅ Synthetic pollution data successfully integrated!")
-    print("The algorithm should now avoid high-pollution areas when generating routes.")
-    
+if (meta_path.exists() and grid_path.exists()
+        and time.time() - meta_path.stat().st_mtime < CACHE_TTL_SECONDS):
+    print("Loading cached pollution heatmap data...")
+    meta = meta_path.read_bytes()
+    grid = grid_path.read_bytes()
 else:
-    print(f"Error: {response.status_code}")
-    print(response.text)
\ No newline at end of file
+    print("Fetching pollution heatmap data...")
+    # Binary format: the grid arrives as raw float32 bytes, the rest as JSON in a header
+    response = requests.get(HEATMAP_URL, params={**params, "format": "bin"})
+    
+    if response.status_code != 200:
+        print(f"Error: {response.status_code}")
+        print(response.text)
+        sys.exit(1)
+        
+    meta = response.headers["X-Heatmap-Meta"].encode()
+    grid = response.content
+    CACHE_DIR.mkdir(exist_ok=True)
+    grid_path.write_bytes(grid)
+    meta_path.write_bytes(meta)
+
+data = orjson.loads(meta)
+
+# Wrap the raw float32 grid as a numpy array without parsing or copying it
+values = np.frombuffer(grid, dtype='<f4').reshape(data['grid_shape'])
+rows, cols = values.shape
+bounds = data['bounds']
+lat_span = bounds['max_lat'] - bounds['min_lat']
+lon_span = bounds['max_lon'] - bounds['min_lon']
+
+print(f"\nPollution Heatmap Summary:")
+print(f"Bounds: ({bounds['min_lat']:.4f}, {bounds['min_lon']:.4f}) to ({bounds['max_lat']:.4f}, {bounds['max_lon']:.4f})")
+print(f"Resolution: {data['resolution']}m")
+print(f"Grid size: {rows}x{cols}")
+
+# AQI thresholds for high pollution and clean zones
+HIGH_AQI = 80
+CLEAN_AQI = 40
+
+min_aqi, max_aqi, mean_aqi, std_aqi, n_high, n_clean = summarize_grid(values, HIGH_AQI, CLEAN_AQI)
+print(f"\nAQI Statistics:")
+print(f"Min AQI: {min_aqi:.1f}")
+print(f"Max AQI: {max_aqi:.1f}")
+print(f"Mean AQI: {mean_aqi:.1f}")
+print(f"Std Dev: {std_aqi:.1f}")
+
+# High pollution and clean zones, counted in the summary pass
+print(f"\nHigh pollution zones (AQI > {HIGH_AQI}): {n_high} grid points")
+print(f"Clean zones (AQI < {CLEAN_AQI}): {n_clean} grid points")
+
+# Sample some high pollution coordinates
+if n_high > 0:
+    print("\nSample high pollution locations:")
+    # Project grid cells back to coordinates for all matches at once
+    high_rows, high_cols = np.nonzero(values > HIGH_AQI)
+    lats = bounds['min_lat'] + (high_rows / rows) * lat_span
+    lons = bounds['min_lon'] + (high_cols / cols) * lon_span
+    for lat, lon, aqi in zip(lats[:3], lons[:3], values[high_rows[:3], high_cols[:3]]):
+        print(f"  - ({lat:.4f}, {lon:.4f}): AQI = {aqi:.1f}")
+
+print("\n✅ Synthetic pollution data successfully integrated!")
+print("The algorithm should now avoid high-pollution areas when generating routes.")